@@ -1,15 +1,24 @@
 import json
 from core.llm import get_gemini_llm
+from core.metrics import instrument_agent
 from agents.schemas import CustomerOutput
 
-llm = get_gemini_llm()
+PROMPT = (
+    "You are a loan assistant. Identify loan_type (home/personal/car) and collect "
+    "income, value (property/car or loan amount), existing_debt, cibil_score. "
+    "Answer in JSON with keys: loan_type, income, value, existing_debt, cibil_score."
+)
 
+@instrument_agent("customer_agent")
 def customer_interaction_agent(user_query: str) -> dict:
-    prompt = (
-        "You are a loan assistant. Identify loan_type (home/personal/car) and collect "
-        "income, value (property/car or loan amount), existing_debt, cibil_score. "
-        "Answer in JSON with keys: loan_type, income, value, existing_debt, cibil_score."
-    )
+    llm = get_gemini_llm(cache_namespace="customer_agent")
     structured = llm.with_structured_output(CustomerOutput)
-    resp = structured.invoke(prompt + "\nUser: " + user_query)
+    resp = structured.invoke(PROMPT + "\nUser: " + user_query)
+    return resp.model_dump()
+
+@instrument_agent("customer_agent")
+async def acustomer_interaction_agent(user_query: str) -> dict:
+    llm = get_gemini_llm(cache_namespace="customer_agent")
+    structured = llm.with_structured_output(CustomerOutput)
+    resp = await structured.ainvoke(PROMPT + "\nUser: " + user_query)
     return resp.model_dump()
@@ -1,43 +1,49 @@
 # agents/decision_agent.py
 
 from core.llm import get_gemini_llm
-from core.rag import run_rag_query
+from core.metrics import instrument_agent
+from core.policy_digest import get_policy_digest, aget_policy_digest
+from core.affordability import (emi as affordable_emi, affordability_grid, amortization_schedule, recommend_loan,
+                                tenure_grid, yearly_schedule)
 from agents.schemas import DecisionOutput
 import json
-import math 
 
 
 def calculate_emi(principal: float, annual_interest_rate: float, tenure_months: int) -> float:
-    r = (annual_interest_rate / 12) / 100
-    n = tenure_months
-    if r == 0:
-        return principal / n
-    emi = (principal * r * ((1 + r) **   n)) / (((1 + r) ** n) - 1)
-    return round(emi, 2)
+    return round(float(affordable_emi(principal, annual_interest_rate, tenure_months)), 2)
 
-def decision_recommendation_agent(data) -> dict:
+# json_mode returns the fields as streamed JSON text, so the summary can be shown as it is generated
+@instrument_agent("decision_agent")
+def decision_recommendation_agent(data, policy_summary: str = None) -> dict:
+    llm = get_gemini_llm(cache_namespace="decision_agent")
+    if policy_summary is None:
+        policy_summary = get_policy_digest(data['loan_type'])["policy_summary"]
+    structured = llm.with_structured_output(DecisionOutput, method="json_mode")
+    summary = structured.invoke(_decision_prompt(data, policy_summary)).model_dump()
+    return _build_decision(data, summary)
 
-    loan_type = data['loan_type']
-    max_loan = data["max_loan"]
-    interest_rate = data["policy_info"]["interest_rate"]
-    max_dti = data["policy_info"]["max_dti"]
-    max_tenure = data['policy_info']['max_tenure']
-    # min_tenure = data['policy_sources']['min_tenure']
-    # req_loan_amount = data["req_loan_amount"]
-    llm = get_gemini_llm()
-    rag_res = run_rag_query(
-        llm=llm,
-        query=f"what is the policy of {loan_type} loan",
-    )
+@instrument_agent("decision_agent")
+async def adecision_recommendation_agent(data, policy_summary: str = None) -> dict:
+    llm = get_gemini_llm(cache_namespace="decision_agent")
+    if policy_summary is None:
+        policy_summary = (await aget_policy_digest(data['loan_type']))["policy_summary"]
+    structured = llm.with_structured_output(DecisionOutput, method="json_mode")
+    summary = (await structured.ainvoke(_decision_prompt(data, policy_summary))).model_dump()
+    return _build_decision(data, summary)
+
+# graph bookkeeping that adds nothing to the summary prompt
+_PROMPT_EXCLUDED_KEYS = ("policy_digest", "node_timings", "document_stats")
 
-    llm_query = f'''
+def _decision_prompt(data, policy_summary: str) -> str:
+    applicant = {k: v for k, v in data.items() if k not in _PROMPT_EXCLUDED_KEYS}
+    return f'''
     You are a loan application expert
     
     Given the below policy:
-    {rag_res['answer']}
+    {policy_summary}
      
     and also the follwing applicant data:
-    {json.dumps(data)}
+    {json.dumps(applicant)}
 
     Reveiw the data with the given policy and determine. Give a summary of the loan application. Also recommend the loan applicant about the next steps.
 
@@ -47,9 +53,14 @@ def decision_recommendation_agent(data) -> dict:
     {{'summary': (str, give overall summary),
       'recommendation': (str, just give the recommendation to get the loan)}}
 '''.strip()
-    
-    structured = llm.with_structured_output(DecisionOutput)
-    summary = structured.invoke(llm_query).model_dump()
+
+def _build_decision(data, summary: dict) -> dict:
+    max_loan = data["max_loan"]
+    interest_rate = data["policy_info"]["interest_rate"]
+    max_dti = data["policy_info"]["max_dti"]
+    max_tenure = data['policy_info']['max_tenure']
+    min_tenure = data['policy_info'].get('min_tenure')
+    # req_loan_amount = data["req_loan_amount"]
     if not data['eligible']:
         decision = {
             'summary': summary['summary'],
@@ -64,33 +75,36 @@ def decision_recommendation_agent(data) -> dict:
         }
         return decision
 
-    existing_debt = data['DTI']
+    # rupees per month, as the affordability functions expect (DTI is a percentage)
+    existing_debt = float(data.get('monthly_debt') or 0)
     income = data['income_monthly']
         
  
-    # Step 3: Adjust loan amount to respect DTI limits
-    emi = calculate_emi(max_loan, interest_rate, max_tenure)
-    total_dti = ((existing_debt + emi) / (income)) * 100 if income else 100
-    flag = 0
-    if existing_debt == 0:
-        total_dti = ((emi) / (income)) * 100 if income else 100
-        flag = 1
-
-    # Reduce loan if DTI exceeds allowed policy
-    if total_dti > max_dti:
-        allowed_emi = (max_dti * (income) / 100) - existing_debt
-        if allowed_emi > 0:
-            max_loan = math.floor(max_loan * (allowed_emi / emi))
-            emi = calculate_emi(max_loan, interest_rate, max_tenure)
-            total_dti = ((existing_debt + emi) / (income)) * 100
-            flag = 1
-        
+    # Step 3: Adjust loan amount to respect DTI limits (closed form on the allowed EMI)
+    plan = recommend_loan(max_loan, income, existing_debt, max_dti, interest_rate, max_tenure)
+
+    # Affordable loan and EMI for every tenure the policy allows
+    grid = affordability_grid(income, existing_debt, max_dti, data["max_loan"], interest_rate,
+                              tenure_grid(min_tenure, max_tenure))
+    tenure_options = [
+        {"tenure_months": int(t), "loan": float(p), "emi": round(float(e), 2)}
+        for t, p, e in zip(grid["tenures"], grid["principal"][0], grid["emi"][0])
+    ]
+
+    # year-by-year repayment of the recommended loan over the recommended tenure
+    yearly = yearly_schedule(amortization_schedule(plan["loan"], interest_rate, max_tenure))
+    schedule = [
+        {"year": int(y), "interest": round(float(i), 2), "principal": round(float(p), 2), "balance": round(float(b), 2)}
+        for y, i, p, b in zip(yearly["year"], yearly["interest"], yearly["principal"], yearly["balance"])
+    ]
 
     decision = {
         'summary': summary['summary'],
         'recommendation': summary['recommendation'],
-        'recommended_loan': max_loan,
-        'recommended_emi': emi,
+        'recommended_loan': plan["loan"],
+        'recommended_emi': plan["emi"],
+        'tenure_options': tenure_options,
+        'amortization_schedule': schedule,
         'applicable_rules': [
             f"Interest Rate: {interest_rate}%",
             f"Max DTI Allowed: {max_dti}%",
@@ -104,6 +118,6 @@ def decision_recommendation_agent(data) -> dict:
 
 
     }
-    if flag:
-        decision |= {"updated_DTI": total_dti}
+    if plan["adjusted"]:
+        decision |= {"updated_DTI": plan["updated_dti"]}
     return decision
@@ -1,14 +1,26 @@
+import asyncio
 import mimetypes
-from base64 import b64encode
+from functools import lru_cache
+from pydantic import create_model
 from langchain_core.messages import HumanMessage
 from core.llm import get_gemini_llm
+from core.metrics import instrument_agent
+from core.config import PREPROCESS_ENABLED, EXTRACTOR_MIN_CONFIDENCE, EXTRACTION_CACHE_ENABLED
+from core.preprocess import preprocess_document, summarise_stats
+from core.extractors import extract_field, record_llm_call
+from core.uploads import b64encode_stream
+from core.extraction_cache import extraction_key, get_cached_extraction, store_extraction
 from agents.schemas import DocumentExtraction
 
-def encode_file(file_bytes: bytes, filename: str) -> dict:
+# bump when the prompt, extractors or schema change so cached extractions are not reused;
+# PREPROCESS_ENABLED and EXTRACTOR_MIN_CONFIDENCE are keyed separately
+EXTRACTION_PROMPT_VERSION = "1"
+
+def encode_file(document, filename: str) -> dict:
     ext = filename.lower().split('.')[-1]
     mime = mimetypes.guess_type(filename)[0]
     content_type = "image" if ext in ["jpg", "jpeg", "png"] else "file"
-    data_b64 = b64encode(file_bytes).decode()
+    data_b64 = b64encode_stream(document)
     return {
         "type": content_type,
         "source_type": "base64",
@@ -16,35 +28,161 @@ def encode_file(file_bytes: bytes, filename: str) -> dict:
         "data": data_b64
     }
 
-def document_processing_agent(
-    salary_slips: dict,
-    cibil_pdf: dict,
-    asset_docs: dict,
-) -> DocumentExtraction:
-    
-    llm = get_gemini_llm()
+def _document_part(document, filename: str, stats: list):
+    if not PREPROCESS_ENABLED:
+        return encode_file(document, filename)
+    part, doc_stats = preprocess_document(document, filename)
+    stats.append(doc_stats)
+    if doc_stats["mode"] == "original":
+        return encode_file(document, filename)
+    return part
+
+# which uploads each extracted field is read from, and how Gemini is asked for it
+FIELD_SOURCES = {
+    "income_monthly": "salary_slips",
+    "cibil_score": "cibil_pdf",
+    "asset_value": "asset_docs",
+}
+FIELD_PROMPTS = {
+    "income_monthly": "- income_monthly (montly income in INR): Extract this based on attached payslips\n",
+    "cibil_score": "- cibil_score (integer): Extract this from the attached cibil document\n",
+    "asset_value": "- asset_value (property or car value in INR): Extract this from the attached asset docucment\n",
+}
 
+def _prepare(salary_slips: dict, cibil_pdf: dict, asset_docs: dict):
+    stats = []
+    prepared = {}
+    # pre-processing may replace a file by its text or drop it
+    for category, docs in (("salary_slips", salary_slips), ("cibil_pdf", cibil_pdf), ("asset_docs", asset_docs)):
+        parts = [_document_part(doc, doc_name, stats) for doc_name, doc in docs.items()]
+        prepared[category] = [part for part in parts if part is not None]
+    return prepared, stats
+
+def _text(part: dict) -> str:
+    return part["text"] if part["type"] == "text" else ""
+
+def _fast_path(prepared: dict, asset_docs: dict) -> dict:
+    """
+    Resolve fields locally from the text layer; only confident values are kept.
+    """
+    resolved = {}
+    # every payslip must yield a confident figure; monthly income is their mean
+    slips = [extract_field("income_monthly", _text(p)) for p in prepared["salary_slips"]]
+    if slips and all(f and f["confidence"] >= EXTRACTOR_MIN_CONFIDENCE for f in slips):
+        resolved["income_monthly"] = {
+            "value": sum(f["value"] for f in slips) / len(slips),
+            "confidence": min(f["confidence"] for f in slips),
+            "source": ",".join(sorted({f["source"] for f in slips})),
+        }
+    for field in ("cibil_score", "asset_value"):
+        found = [extract_field(field, _text(p)) for p in prepared[FIELD_SOURCES[field]]]
+        found = [f for f in found if f and f["confidence"] >= EXTRACTOR_MIN_CONFIDENCE]
+        if found:
+            resolved[field] = max(found, key=lambda f: f["confidence"])
+    if not asset_docs:
+        # personal loans carry no asset document
+        resolved["asset_value"] = {"value": 0.0, "confidence": 1.0, "source": "no_asset_documents"}
+    return resolved
+
+def _local_pass(salary_slips: dict, cibil_pdf: dict, asset_docs: dict):
+    # PDF text extraction, image re-encoding and base64 are CPU bound: the async agent runs this in a thread
+    prepared, stats = _prepare(salary_slips, cibil_pdf, asset_docs)
+    return prepared, stats, _fast_path(prepared, asset_docs)
+
+@lru_cache(maxsize=8)
+def _partial_schema(fields: tuple):
+    return create_model(
+        "DocumentExtraction",
+        **{f: (DocumentExtraction.model_fields[f].annotation, DocumentExtraction.model_fields[f]) for f in fields},
+    )
+
+def _llm_parts(prepared: dict, fields: list) -> list:
     parts = [
         {"type": "text", "text": (
             "Extract the following in JSON:\n"
-            "- income_monthly (montly income in INR): Extract this based on attached payslips\n"
-            "- cibil_score (integer): Extract this from the attached cibil document\n"
-            "- asset_value (property or car value in INR): Extract this from the attached asset docucment\n"
+            + "".join(FIELD_PROMPTS[f] for f in fields) +
             "Instructions\n"
             "- Always ignore special characters in output"
-
-            
         )}
     ]
+    # only attach the documents the unresolved fields are read from
+    for field in fields:
+        parts.extend(prepared[FIELD_SOURCES[field]])
+    return parts
+
+def _result(resolved: dict, llm_values: dict, stats: list) -> dict:
+    result = {field: resolved[field]["value"] for field in resolved} | llm_values
+    extraction = {
+        field: {"source": resolved[field]["source"], "confidence": resolved[field]["confidence"]}
+        if field in resolved else {"source": "llm", "confidence": None}
+        for field in FIELD_SOURCES
+    }
+    return DocumentExtraction(**result).model_dump() | {
+        "preprocessing": summarise_stats(stats),
+        "extraction": {"fields": extraction, "llm_called": bool(llm_values), "cached": False},
+    }
+
+def _cache_key(salary_slips: dict, cibil_pdf: dict, asset_docs: dict):
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    documents = {"salary_slips": salary_slips, "cibil_pdf": cibil_pdf, "asset_docs": asset_docs}
+    # the settings that change what is extracted are part of the key, not just the prompt version
+    version = f"{EXTRACTION_PROMPT_VERSION}:preprocess={PREPROCESS_ENABLED}:min_confidence={EXTRACTOR_MIN_CONFIDENCE}"
+    return extraction_key(documents, version)
+
+def _cached(key):
+    result = get_cached_extraction(key) if key else None
+    if result is not None:
+        result["extraction"]["cached"] = True
+    return result
+
+def _lookup(salary_slips: dict, cibil_pdf: dict, asset_docs: dict):
+    # hashes every upload and reads SQLite: the async agent runs this in a thread
+    key = _cache_key(salary_slips, cibil_pdf, asset_docs)
+    return key, _cached(key)
+
+@instrument_agent("document_agent")
+def document_processing_agent(
+    salary_slips: dict,
+    cibil_pdf: dict,
+    asset_docs: dict,
+) -> DocumentExtraction:
+    
+    key, cached = _lookup(salary_slips, cibil_pdf, asset_docs)
+    if cached is not None:
+        return cached
+    prepared, stats, resolved = _local_pass(salary_slips, cibil_pdf, asset_docs)
+    missing = [f for f in FIELD_SOURCES if f not in resolved]
+    record_llm_call(len(missing))
+    llm_values = {}
+    if missing:
+        llm = get_gemini_llm()
+        structured = llm.with_structured_output(_partial_schema(tuple(missing)))
+        llm_values = structured.invoke([HumanMessage(content=_llm_parts(prepared, missing))]).model_dump()
+    result = _result(resolved, llm_values, stats)
+    if key:
+        store_extraction(key, result)
+    return result
 
-    # Add all document parts
-    for slip_name, slip in salary_slips.items():
-        parts.append(encode_file(slip, slip_name))
-    for cibil_name, cibil in cibil_pdf.items():
-         parts.append(encode_file(cibil, cibil_name))
-    for doc_name, doc in asset_docs.items():
-        parts.append(encode_file(doc, doc_name))
-
-    structured = llm.with_structured_output(DocumentExtraction)
-    resp = structured.invoke([HumanMessage(content=parts)])
-    return resp.model_dump()
+@instrument_agent("document_agent")
+async def adocument_processing_agent(
+    salary_slips: dict,
+    cibil_pdf: dict,
+    asset_docs: dict,
+) -> DocumentExtraction:
+    
+    key, cached = await asyncio.to_thread(_lookup, salary_slips, cibil_pdf, asset_docs)
+    if cached is not None:
+        return cached
+    prepared, stats, resolved = await asyncio.to_thread(_local_pass, salary_slips, cibil_pdf, asset_docs)
+    missing = [f for f in FIELD_SOURCES if f not in resolved]
+    record_llm_call(len(missing))
+    llm_values = {}
+    if missing:
+        llm = get_gemini_llm()
+        structured = llm.with_structured_output(_partial_schema(tuple(missing)))
+        llm_values = (await structured.ainvoke([HumanMessage(content=_llm_parts(prepared, missing))])).model_dump()
+    result = _result(resolved, llm_values, stats)
+    if key:
+        await asyncio.to_thread(store_extraction, key, result)
+    return result
@@ -0,0 +1,75 @@
+from langchain_core.utils.json import parse_partial_json
+
+# decision fields forwarded token by token while the summary call streams
+STREAMED_NODE = "decision_node"
+STREAMED_FIELDS = ("summary", "recommendation")
+STREAM_MODES = ["updates", "messages"]
+
+
+def _public(update: dict) -> dict:
+    # the digest carries the retrieved policy text; clients only need the thresholds
+    if "policy_digest" in update:
+        digest = update["policy_digest"]
+        update = {**update, "policy_digest": {"loan_type": digest["loan_type"], "thresholds": digest["thresholds"]}}
+    return update
+
+
+class ProgressTracker:
+    """
+    Turns `stream_mode=["updates", "messages"]` chunks into progress events:
+    ("node", {node, update}) when a node finishes, ("token", {field, delta})
+    for the decision summary as it is generated, and the accumulated state.
+    """
+
+    def __init__(self, state: dict):
+        self.state = dict(state)
+        self._buffers = {}
+        self._sent = {}
+
+    def feed(self, mode: str, chunk) -> list:
+        if mode == "updates":
+            return [("node", {"node": node, "update": _public(self._apply(update))})
+                    for node, update in chunk.items() if update]
+        message, metadata = chunk
+        if metadata.get("langgraph_node") != STREAMED_NODE or not isinstance(message.content, str):
+            return []
+        # the structured output arrives as JSON text; emit what each field gained
+        text = self._buffers[message.id] = self._buffers.get(message.id, "") + message.content
+        try:
+            partial = parse_partial_json(text)
+        except Exception:
+            return []
+        events = []
+        for field in STREAMED_FIELDS:
+            value = partial.get(field) if isinstance(partial, dict) else None
+            sent = self._sent.get((message.id, field), 0)
+            if isinstance(value, str) and len(value) > sent:
+                events.append(("token", {"field": field, "delta": value[sent:]}))
+                self._sent[(message.id, field)] = len(value)
+        return events
+
+    def _apply(self, update: dict) -> dict:
+        for key, value in update.items():
+            if key == "node_timings":
+                self.state[key] = {**(self.state.get(key) or {}), **value}
+            else:
+                self.state[key] = value
+        return update
+
+
+def stream_progress(app_workflow, state: dict, config: dict):
+    """
+    Run the graph, yielding (event, data) pairs and finally ("done", state).
+    """
+    tracker = ProgressTracker(state)
+    for mode, chunk in app_workflow.stream(state, config=config, stream_mode=STREAM_MODES):
+        yield from tracker.feed(mode, chunk)
+    yield "done", tracker.state
+
+
+async def astream_progress(app_workflow, state: dict, config: dict):
+    tracker = ProgressTracker(state)
+    async for mode, chunk in app_workflow.astream(state, config=config, stream_mode=STREAM_MODES):
+        for event in tracker.feed(mode, chunk):
+            yield event
+    yield "done", tracker.state
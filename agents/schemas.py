@@ -21,12 +21,6 @@ class DocumentExtraction(BaseModel):
     asset_value: float = Field(..., description="Property or car value in INR")
 
 
-class PolicyThresholdsSchema(BaseModel):
-    min_cibil: int
-    max_dti: float
-    interest_rate: float
-    elegible_income: str
-    income_threshold: str
-    income_reasoning: str
-    max_tenure: int
-    min_tenure: int
\ No newline at end of file
+class PolicyDigestSchema(BaseModel):
+    # the eligibility thresholds live in policies/rules/; only the rate comes from the policy text
+    interest_rate: float = Field(..., description="Annual interest rate in percent")
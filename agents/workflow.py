@@ -0,0 +1,229 @@
+import inspect
+import time
+from typing import TypedDict, Any, List, Annotated
+from langchain_core.runnables import RunnableLambda, RunnableConfig
+from langgraph.graph import StateGraph, START, END
+from agents.customer_agent import customer_interaction_agent
+from agents.document_agent import document_processing_agent, adocument_processing_agent
+from agents.eligibility_agent import eligibility_risk_assessment_agent
+from agents.decision_agent import decision_recommendation_agent, adecision_recommendation_agent
+from core.policy_digest import get_policy_digest, aget_policy_digest
+
+
+def merge_dicts(left: dict, right: dict) -> dict:
+    return {**(left or {}), **(right or {})}
+
+
+class LoanState(TypedDict):
+    name: str
+    loan_type: str
+    req_loan_amount: float
+    cibil_score: Any
+    income_monthly: Any
+    asset_value: Any
+    monthly_debt: Any
+    document_stats: Any
+
+    # thresholds plus the retrieved policy chunks and answer, fetched once per request
+    policy_digest: Any
+    eligible: Any
+    reasons: Any
+    policy_info: Any
+    max_loan: Any
+    sources: List[str]
+    DTI: Any
+
+
+    recommendation: str
+    summary: str
+    recommended_loan: int
+    recommended_emi: Any
+    tenure_options: Any
+    amortization_schedule: Any
+    applicable_rules: Any
+    next_steps: Any
+    updated_DTI: Any
+
+    # node name -> {"start", "end", "seconds"}; merged across parallel branches
+    node_timings: Annotated[dict, merge_dicts]
+
+
+def customer_node(s: LoanState):
+    s["query"] = customer_interaction_agent(s["query"])
+    return s
+
+def _documents(config: RunnableConfig) -> dict:
+    # Uploaded files travel in the run config rather than the state so they are never serialised
+    return config["configurable"]["documents"]
+
+def _extracted(doc_data: dict) -> dict:
+    return {
+        "income_monthly": doc_data["income_monthly"],
+        "cibil_score": doc_data["cibil_score"],
+        "asset_value": doc_data["asset_value"],
+        "document_stats": {
+            "preprocessing": doc_data.get("preprocessing"),
+            "extraction": doc_data.get("extraction"),
+        },
+    }
+
+def document_node(s: LoanState, config: RunnableConfig):
+    return _extracted(document_processing_agent(**_documents(config)))
+
+async def adocument_node(s: LoanState, config: RunnableConfig):
+    return _extracted(await adocument_processing_agent(**_documents(config)))
+
+def policy_node(s: LoanState):
+    return {"policy_digest": get_policy_digest(s["loan_type"])}
+
+async def apolicy_node(s: LoanState):
+    return {"policy_digest": await aget_policy_digest(s["loan_type"])}
+
+def eligibility_node(s: LoanState):
+    applicant = {
+        "loan_type": s["loan_type"],
+        "income_monthly": s["income_monthly"],
+        "cibil_score": s["cibil_score"],
+        "monthly_debt": s["monthly_debt"],
+    }
+    if s['loan_type'] != 'personal':
+        applicant |= {"asset_value": s["asset_value"],}
+    # pure computation once the policy digest is in the state
+    return eligibility_risk_assessment_agent(applicant, digest=s["policy_digest"])
+
+def decision_node(s: LoanState):
+    return decision_recommendation_agent(s, policy_summary=s["policy_digest"]["policy_summary"])
+
+async def adecision_node(s: LoanState):
+    return await adecision_recommendation_agent(s, policy_summary=s["policy_digest"]["policy_summary"])
+
+
+def _timed(name: str, func, afunc=None) -> RunnableLambda:
+    """
+    Wrap a node so its wall-clock start/end are recorded in state["node_timings"].
+    """
+    afunc = afunc or func
+    wants_config = "config" in inspect.signature(func).parameters
+
+    def record(start: float, update: dict) -> dict:
+        end = time.time()
+        timing = {"start": start, "end": end, "seconds": round(end - start, 4)}
+        return {**update, "node_timings": {name: timing}}
+
+    def run(s: LoanState, config: RunnableConfig):
+        start = time.time()
+        update = func(s, config) if wants_config else func(s)
+        return record(start, update)
+
+    async def arun(s: LoanState, config: RunnableConfig):
+        start = time.time()
+        update = afunc(s, config) if wants_config else afunc(s)
+        if inspect.isawaitable(update):
+            update = await update
+        return record(start, update)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+graph = StateGraph(LoanState)
+
+# creating graph nodes; each runs its sync or async variant to match invoke()/ainvoke()
+graph.add_node("document_node", _timed("document_node", document_node, adocument_node))
+graph.add_node("policy_node", _timed("policy_node", policy_node, apolicy_node))
+graph.add_node("eligibility_node", _timed("eligibility_node", eligibility_node))
+graph.add_node("decision_node", _timed("decision_node", decision_node, adecision_node))
+
+# document extraction and policy lookup run in the same superstep;
+# eligibility_node runs once both have finished
+graph.add_edge(START, "document_node")
+graph.add_edge(START, "policy_node")
+graph.add_edge("document_node", "eligibility_node")
+graph.add_edge("policy_node", "eligibility_node")
+graph.add_edge("eligibility_node", "decision_node")
+graph.add_edge("decision_node", END)
+workflow = graph.compile()
+
+
+def compile_workflow(checkpointer=None):
+    """
+    The same graph, persisting its state per `thread_id` (the application id)
+    so an application can later be re-evaluated with reevaluate()/areevaluate().
+    """
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_config(salary_slips: dict, cibil_pdf: dict, asset_docs: dict, **configurable) -> dict:
+    documents = {"salary_slips": salary_slips, "cibil_pdf": cibil_pdf, "asset_docs": asset_docs}
+    return {"configurable": {"documents": documents, **configurable}}
+
+
+def application_config(application_id: str) -> dict:
+    return {"configurable": {"thread_id": application_id}}
+
+
+# first node reading each field that can be corrected after submission
+RESUME_NODES = {
+    "monthly_debt": "eligibility_node",
+    "req_loan_amount": "decision_node",
+    "name": "decision_node",
+}
+# the node a resumed run is applied "as", so the graph continues with the next one
+_PREDECESSORS = {"eligibility_node": "document_node", "decision_node": "eligibility_node"}
+# state written by each node, cleared when it re-runs so no stale values survive
+NODE_OUTPUTS = {
+    "eligibility_node": ("eligible", "reasons", "policy_info", "max_loan", "sources", "DTI"),
+    "decision_node": ("recommendation", "summary", "recommended_loan", "recommended_emi",
+                      "tenure_options", "amortization_schedule", "applicable_rules", "next_steps", "updated_DTI"),
+}
+_NODE_ORDER = ("eligibility_node", "decision_node")
+# written by document_node and policy_node
+_UPSTREAM_OUTPUTS = ("income_monthly", "cibil_score", "asset_value", "document_stats", "policy_digest")
+
+
+def submission_state(**fields) -> dict:
+    """
+    Input for a full run of an application. Every node output is cleared:
+    a checkpointed thread keeps any key a new run does not write, so a
+    resubmitted application id would otherwise carry over e.g. the old
+    `reasons` or `recommended_loan`.
+    """
+    cleared = {key: None for keys in NODE_OUTPUTS.values() for key in keys}
+    return {**dict.fromkeys(_UPSTREAM_OUTPUTS), **cleared, **fields}
+
+
+def resume_update(changes: dict):
+    """
+    State update and as_node for update_state(): the changed fields plus
+    cleared outputs of the first affected node and everything after it.
+    """
+    unsupported = sorted(set(changes) - set(RESUME_NODES))
+    if unsupported:
+        raise ValueError(f"Fields cannot be updated without resubmitting documents: {', '.join(unsupported)}")
+    if not changes:
+        raise ValueError("No fields to update")
+    first = min((RESUME_NODES[field] for field in changes), key=_NODE_ORDER.index)
+    cleared = {key: None for node in _NODE_ORDER[_NODE_ORDER.index(first):] for key in NODE_OUTPUTS[node]}
+    return cleared | changes, _PREDECESSORS[first]
+
+
+def reevaluate(app_workflow, application_id: str, changes: dict) -> dict:
+    """
+    Apply corrected input fields to a checkpointed application and re-run
+    only the nodes that read them; document extraction and the policy
+    digest are reused from the checkpoint.
+    """
+    config = application_config(application_id)
+    if not app_workflow.get_state(config).values:
+        raise KeyError(application_id)
+    values, as_node = resume_update(changes)
+    app_workflow.update_state(config, values, as_node=as_node)
+    return app_workflow.invoke(None, config)
+
+
+async def areevaluate(app_workflow, application_id: str, changes: dict) -> dict:
+    config = application_config(application_id)
+    if not (await app_workflow.aget_state(config)).values:
+        raise KeyError(application_id)
+    values, as_node = resume_update(changes)
+    await app_workflow.aupdate_state(config, values, as_node=as_node)
+    return await app_workflow.ainvoke(None, config)
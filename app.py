@@ -1,14 +1,55 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from langgraph.graph import StateGraph, END
-from agents.customer_agent import customer_interaction_agent
-from agents.document_agent import document_processing_agent
-from agents.eligibility_agent import eligibility_risk_assessment_agent
-from agents.decision_agent import decision_recommendation_agent
+from agents.workflow import (LoanState, workflow, run_config, compile_workflow, areevaluate, application_config,
+                             submission_state)
+from agents.progress import astream_progress
 from fastapi.middleware.cors import CORSMiddleware
-from typing import TypedDict, Any, List
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager, ExitStack
+from typing import List, Optional
+from pydantic import BaseModel
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from core.config import (
+    MAX_CONCURRENT_APPLICATIONS, CHECKPOINT_DB, REPORT_FETCH_WAIT_SECONDS, JOB_WAIT_MAX_SECONDS
+)
+from core.resources import warm_up, is_ready, readiness, get_resource
+from core.llm_cache import llm_cache_stats
+from core.extractors import extractor_stats
+from core.gemini_client import gemini_client_stats
+from core.metrics import observe_payload, render_metrics
+from core.extraction_cache import extraction_cache_stats
+from core.uploads import UploadBudget, UploadTooLarge, spool_upload
+from core.report_renderer import submit_report, get_report, pending_report
+from core.decision_store import get_decision_store
+from core.policy_digest import policy_fingerprint
+from core.job_queue import JobWorkerPool, QueueFull, get_job_queue
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build clients and warm caches in the background so /healthz answers immediately
+    warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    os.makedirs(os.path.dirname(CHECKPOINT_DB) or ".", exist_ok=True)
+    # application state is checkpointed per application id for later re-evaluation
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as checkpointer:
+        app.state.workflow = compile_workflow(checkpointer)
+        # background workers drain the job queue with the same checkpointed graph
+        app.state.job_workers = JobWorkerPool(get_job_queue(), _run_job)
+        app.state.job_workers.start()
+        try:
+            yield
+        finally:
+            await app.state.job_workers.stop()
+    warmup_task.cancel()
 
 
-app = FastAPI(title="Gemini Loan Processor")
+app = FastAPI(title="Gemini Loan Processor", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,87 +59,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class LoanState(TypedDict):
-    name: str
-    loan_type: str
-    req_loan_amount: float
-    cibil_score: Any
-    income_monthly: Any
-    asset_value: Any
-    monthly_debt: Any
-    
-    eligible: Any
-    reasons: Any
-    policy_info: Any
-    max_loan: Any
-    sources: List[str]
-    DTI: Any
-
-    
-    recommendation: str
-    summary: str
-    recommended_loan: int
-    recommended_emi: Any
-    applicable_rules: Any
-    next_steps: Any
-    updated_DTI: Any
-
-
-
-graph = StateGraph(LoanState)
-
-def customer_node(s: LoanState):
-    print("stypid lag", s.keys())
-    s["query"] = customer_interaction_agent(s["query"])
-    return s
-
-def eligibility_node(s: LoanState):
-    applicant = {
-        "loan_type": s["loan_type"],
-        "income_monthly": s["income_monthly"],
-        "cibil_score": s["cibil_score"],
-        "monthly_debt": s["monthly_debt"],
-    }
-    if s['loan_type'] != 'personal':
-        applicant |= {"asset_value": s["asset_value"],}
-    result = eligibility_risk_assessment_agent(applicant)
-    for key, value in result.items():
-        s[key] = value
-    return s
-
-def decision_node(s: LoanState):
-    # if not s["eligible"]:
-    #     s["recommendation"] = None
-    #     s["policy_sources"] = []
-    #     return s
-    res = decision_recommendation_agent(s)
-    for key, value in res.items():
-        s[key] = value
-    return s
-
-# creating graph nodes
-graph.add_node("eligibility_node", eligibility_node)
-graph.add_node("decision_node", decision_node)
-
-# adding entry point and edges
-graph.set_entry_point("eligibility_node")
-graph.add_edge("eligibility_node", "decision_node")
-graph.add_edge("decision_node", END)
-workflow = graph.compile()
+logger = logging.getLogger(__name__)
 
+_application_slots = asyncio.Semaphore(MAX_CONCURRENT_APPLICATIONS)
 
-# app
-@app.post("/process_loan/")
-async def process_loan(
-        name: str = Form(...),
-        loan_type: str = Form(...),
-        req_loan_amount: float = Form(...),
-        monthly_debt: float = Form(...),
-        cibil_report: UploadFile = File(...),
-        salary_slips: List[UploadFile] = File(...), 
-        property_doc: UploadFile = File(None),
-        car_doc: UploadFile = File(None)
-    ):
+
+def _workflow():
+    # the checkpointed graph once the lifespan has opened the checkpoint store
+    return getattr(app.state, "workflow", workflow)
+
+
+def _queue_report(state: dict):
+    # the PDF renders in the worker pool; clients fetch it from /reports/{report_id}
+    try:
+        return submit_report(state.get("name"), state)
+    except Exception as e:
+        logger.error("could not queue report: %s", e)
+        return None
+
+
+def _record_decision(application_id: str, state: dict) -> None:
+    # kept for decision queries and re-scoring after policy changes
+    try:
+        get_decision_store().record(application_id, state, policy_fingerprint())
+    except Exception as e:
+        logger.error("could not record decision %s: %s", application_id, e)
+
+
+def _record_outcome(application_id: str, state: dict):
+    # SQLite write and report cache lookup block: callers run this in a worker thread
+    _record_decision(application_id, state)
+    return _queue_report(state)
+
+
+async def _spool(upload: UploadFile, budget: UploadBudget, spooled: ExitStack):
+    # uploads stay in spooled temp files, closed when the request is done
+    return spooled.enter_context(await spool_upload(upload, budget))
+
+
+def _validate_application(loan_type: str, salary_slips: list, property_doc, car_doc) -> None:
     if loan_type not in ("home", "personal", "car"):
         raise HTTPException(status_code=400, detail="Invalid loan_type")
 
@@ -111,40 +110,294 @@ async def process_loan(
     if loan_type == "car" and car_doc is None:
         raise HTTPException(status_code=400, detail="Car document required for car loan")
 
-    salary_bytes = {slip.filename: await slip.read() for slip in salary_slips}
-    cibil_bytes = {cibil_report.filename: await cibil_report.read()}
-    asset_bytes = {}
-    if loan_type == "home":
-        asset_bytes = {property_doc.filename: await property_doc.read()}
-    elif loan_type == "car":
-        asset_bytes = {car_doc.filename: await car_doc.read()}
-
-    # Extract via document agent
-    doc_data = document_processing_agent(
-        salary_slips=salary_bytes,
-        cibil_pdf=cibil_bytes,
-        asset_docs=asset_bytes
-    )
 
-    state = LoanState()
-    state["name"] = name
-    state["loan_type"] = loan_type
-    state["income_monthly"] = doc_data["income_monthly"]
-    state["cibil_score"] = doc_data["cibil_score"]
-    state["asset_value"] = doc_data["asset_value"]
-    state['monthly_debt'] = monthly_debt
-    state['req_loan_amount'] = req_loan_amount
+async def _spool_documents(loan_type: str, cibil_report, salary_slips: list, property_doc, car_doc,
+                           spooled: ExitStack, endpoint: str) -> dict:
+    budget = UploadBudget()
+    try:
+        salary_files = {slip.filename: await _spool(slip, budget, spooled) for slip in salary_slips}
+        cibil_files = {cibil_report.filename: await _spool(cibil_report, budget, spooled)}
+        asset_files = {}
+        if loan_type == "home":
+            asset_files = {property_doc.filename: await _spool(property_doc, budget, spooled)}
+        elif loan_type == "car":
+            asset_files = {car_doc.filename: await _spool(car_doc, budget, spooled)}
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    observe_payload(endpoint, budget.used)
+    return {"salary_slips": salary_files, "cibil_pdf": cibil_files, "asset_docs": asset_files}
+
+
+def _initial_state(name: str, loan_type: str, monthly_debt: float, req_loan_amount: float) -> LoanState:
+    # clears any outputs left on the thread by an earlier submission with the same application id
+    return LoanState(**submission_state(name=name, loan_type=loan_type, monthly_debt=monthly_debt,
+                                        req_loan_amount=req_loan_amount))
+
+
+async def _run_job(job: dict) -> dict:
+    application = job["application"]
+    with ExitStack() as files:
+        documents = get_job_queue().open_documents(job["job_id"], files)
+        state = _initial_state(application["name"], job["loan_type"], application["monthly_debt"],
+                               application["req_loan_amount"])
+        config = run_config(**documents, thread_id=job["application_id"])
+        async with _application_slots:
+            state = await _workflow().ainvoke(state, config=config)
+    report_id = await asyncio.to_thread(_record_outcome, job["application_id"], state)
+    return {"report_id": report_id, "output": state}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-    state = workflow.invoke(state)
+
+# app
+@app.post("/process_loan/")
+async def process_loan(
+        name: str = Form(...),
+        loan_type: str = Form(...),
+        req_loan_amount: float = Form(...),
+        monthly_debt: float = Form(...),
+        cibil_report: UploadFile = File(...),
+        salary_slips: List[UploadFile] = File(...), 
+        property_doc: UploadFile = File(None),
+        car_doc: UploadFile = File(None),
+        application_id: Optional[str] = Form(None)
+    ):
+    _validate_application(loan_type, salary_slips, property_doc, car_doc)
+
+    with ExitStack() as spooled:
+        documents = await _spool_documents(loan_type, cibil_report, salary_slips, property_doc, car_doc, spooled,
+                                           "/process_loan/")
+        state = _initial_state(name, loan_type, monthly_debt, req_loan_amount)
+        application_id = application_id or uuid.uuid4().hex
+        config = run_config(**documents, thread_id=application_id)
+
+        # Bound the number of applications in flight against Gemini/Pinecone
+        async with _application_slots:
+            # document extraction runs inside the graph, in parallel with the policy lookup
+            state = await _workflow().ainvoke(state, config=config)
+    report_id = await asyncio.to_thread(_record_outcome, application_id, state)
 
     return {
         # "customer_name": name,
         # "eligibility": state["eligibility"],
         # "recommendation": state["recommendation"],
         # # "policy_sources": state["policy_sources"]
+        "application_id": application_id,
+        "report_id": report_id,
         "output": state
     }
 
+@app.post("/process_loan/stream")
+async def process_loan_stream(
+        name: str = Form(...),
+        loan_type: str = Form(...),
+        req_loan_amount: float = Form(...),
+        monthly_debt: float = Form(...),
+        cibil_report: UploadFile = File(...),
+        salary_slips: List[UploadFile] = File(...),
+        property_doc: UploadFile = File(None),
+        car_doc: UploadFile = File(None),
+        application_id: Optional[str] = Form(None)
+    ):
+    """
+    Same as /process_loan/, as Server-Sent Events: a `node` event per
+    finished node, `token` events while the decision summary is generated,
+    then `done` with the final state (or `error`).
+    """
+    _validate_application(loan_type, salary_slips, property_doc, car_doc)
+
+    # uploads are spooled before the response starts and closed when it ends
+    spooled = ExitStack()
+    try:
+        documents = await _spool_documents(loan_type, cibil_report, salary_slips, property_doc, car_doc, spooled,
+                                           "/process_loan/stream")
+    except BaseException:
+        spooled.close()
+        raise
+    state = _initial_state(name, loan_type, monthly_debt, req_loan_amount)
+    application_id = application_id or uuid.uuid4().hex
+    config = run_config(**documents, thread_id=application_id)
+
+    async def events():
+        with spooled:
+            yield _sse("accepted", {"application_id": application_id})
+            async with _application_slots:
+                try:
+                    async for event, data in astream_progress(_workflow(), state, config):
+                        if event == "done":
+                            report_id = await asyncio.to_thread(_record_outcome, application_id, data)
+                            data = {"application_id": application_id, "report_id": report_id, "output": data}
+                        yield _sse(event, data)
+                except Exception as e:
+                    logger.exception("streamed application %s failed", application_id)
+                    yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(spooled.close),
+    )
+
+@app.post("/jobs")
+async def submit_job(
+        name: str = Form(...),
+        loan_type: str = Form(...),
+        req_loan_amount: float = Form(...),
+        monthly_debt: float = Form(...),
+        cibil_report: UploadFile = File(...),
+        salary_slips: List[UploadFile] = File(...),
+        property_doc: UploadFile = File(None),
+        car_doc: UploadFile = File(None),
+        application_id: Optional[str] = Form(None),
+        timeout_seconds: Optional[float] = Form(None)
+    ):
+    """
+    Queue an application and answer at once with its job id; poll
+    /jobs/{job_id} for the result. Resubmitting an application_id returns
+    its existing job.
+    """
+    _validate_application(loan_type, salary_slips, property_doc, car_doc)
+    if timeout_seconds is not None and timeout_seconds <= 0:
+        raise HTTPException(status_code=400, detail="timeout_seconds must be positive")
+
+    with ExitStack() as spooled:
+        documents = await _spool_documents(loan_type, cibil_report, salary_slips, property_doc, car_doc, spooled,
+                                           "/jobs")
+        application = {"name": name, "loan_type": loan_type, "monthly_debt": monthly_debt,
+                       "req_loan_amount": req_loan_amount}
+        try:
+            job, created = await asyncio.to_thread(
+                get_job_queue().submit, application, documents, application_id, timeout_seconds
+            )
+        except QueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    workers = getattr(app.state, "job_workers", None)
+    if created and workers is not None:
+        workers.notify()
+    return JSONResponse(
+        status_code=202 if created else 200,
+        content={"job_id": job["job_id"], "application_id": job["application_id"], "status": job["status"],
+                 "position": job.get("position")},
+        headers={"Location": f"/jobs/{job['job_id']}"},
+    )
+
+@app.get("/jobs/depth")
+def job_queue_depth():
+    return get_job_queue().depth()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Job status, and the decision once done. `wait` long-polls up to
+    JOB_WAIT_MAX_SECONDS for the job to finish.
+    """
+    wait = min(max(wait, 0.0), JOB_WAIT_MAX_SECONDS)
+    workers = getattr(app.state, "job_workers", None)
+    if wait and workers is not None:
+        job = await workers.wait(job_id, wait)
+    else:
+        job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    job.pop("application")
+    return job
+
+class ApplicationUpdate(BaseModel):
+    monthly_debt: Optional[float] = None
+    req_loan_amount: Optional[float] = None
+    name: Optional[str] = None
+
+@app.get("/applications/{application_id}")
+async def get_application(application_id: str):
+    snapshot = await _workflow().aget_state(application_config(application_id))
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail="Unknown application")
+    return {"application_id": application_id, "output": snapshot.values}
+
+@app.post("/applications/{application_id}/reevaluate")
+async def reevaluate_application(application_id: str, update: ApplicationUpdate):
+    # only the nodes downstream of the changed fields run again
+    try:
+        async with _application_slots:
+            state = await areevaluate(_workflow(), application_id, update.model_dump(exclude_none=True))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown application")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    report_id = await asyncio.to_thread(_record_outcome, application_id, state)
+    return {"application_id": application_id, "report_id": report_id, "output": state}
+
+@app.get("/decisions")
+def list_decisions(loan_type: Optional[str] = None, eligible: Optional[bool] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   limit: int = 100, offset: int = 0):
+    # newest first; filters map onto the store's (loan_type|eligible, created_at) indexes
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    store = get_decision_store()
+    filters = {
+        "loan_type": loan_type,
+        "eligible": eligible,
+        "since": since.timestamp() if since else None,
+        "until": until.timestamp() if until else None,
+    }
+    return {"total": store.count(**filters), "decisions": store.query(**filters, limit=limit, offset=offset)}
+
+@app.get("/reports/{report_id}")
+async def fetch_report(report_id: str):
+    pdf = get_report(report_id)
+    if pdf is None:
+        future = pending_report(report_id)
+        if future is None:
+            raise HTTPException(status_code=404, detail="Unknown report")
+        try:
+            # shield: a timed-out fetch must not cancel the render itself
+            pdf = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), REPORT_FETCH_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            return JSONResponse(status_code=202, content={"status": "rendering"}, headers={"Retry-After": "1"})
+        except Exception:
+            raise HTTPException(status_code=500, detail="Report rendering failed")
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="loan_report_{report_id[:12]}.pdf"'},
+    )
+
 @app.get("/")
 def root():
     return {"message": "multi-agent home loan API running!"}
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    status = readiness()
+    return JSONResponse(status_code=200 if is_ready() else 503, content=status)
+
+@app.get("/cache/stats")
+def cache_stats():
+    embedder = get_resource("embedder") if readiness()["resources"].get("embedder") else None
+    return {
+        "llm": llm_cache_stats(),
+        "embeddings": getattr(embedder, "stats", None),
+        "extraction": extraction_cache_stats(),
+    }
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/llm/stats")
+def llm_stats():
+    return gemini_client_stats()
+
+@app.get("/extractors/stats")
+def extractors_stats():
+    return extractor_stats()
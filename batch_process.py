@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from contextlib import ExitStack
+
+import numpy as np
+
+from agents.workflow import LoanState, workflow, run_config
+from core.config import MAX_CONCURRENT_APPLICATIONS
+
+DOCUMENT_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+
+
+def classify_document(fname: str):
+    """
+    Upload category from the file name: cibil/credit -> cibil_pdf,
+    salary/payslip/slip -> salary_slips, property/car/asset/valuation -> asset_docs.
+    """
+    lower = fname.lower()
+    if not lower.endswith(DOCUMENT_EXTENSIONS):
+        return None
+    if "cibil" in lower or "credit" in lower:
+        return "cibil_pdf"
+    if "salary" in lower or "slip" in lower:
+        return "salary_slips"
+    if any(word in lower for word in ("property", "car", "asset", "valuation")):
+        return "asset_docs"
+    return None
+
+
+def load_applications(csv_path: str, docs_root: str) -> list:
+    """
+    Rows of the applications CSV (name, loan_type, monthly_debt and optional
+    application_id, req_loan_amount, folder); documents live in
+    <docs_root>/<folder or application_id>. Rows without an application_id
+    are keyed by their folder, which stays with the applicant when rows are
+    added or re-sorted; ids must be unique, since they key the checkpoint
+    and the output.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    applications = []
+    seen = {}
+    # line 1 is the header
+    for line, row in enumerate(rows, start=2):
+        application_id = (row.get("application_id") or "").strip()
+        if not application_id and not row.get("folder"):
+            raise ValueError(f"{csv_path} line {line}: application_id or folder is required")
+        # normalised so "asha/", "./asha" and "asha" are the same applicant on every platform
+        application_id = application_id or os.path.normpath(row["folder"].strip()).replace(os.sep, "/")
+        if application_id in seen:
+            raise ValueError(f"{csv_path} line {line}: duplicate application_id {application_id!r} "
+                             f"(first on line {seen[application_id]})")
+        seen[application_id] = line
+        applications.append({
+            "application_id": application_id,
+            "name": row["name"],
+            "loan_type": row["loan_type"].strip().lower(),
+            "monthly_debt": float(row.get("monthly_debt") or 0),
+            "req_loan_amount": float(row.get("req_loan_amount") or 0),
+            "folder": os.path.join(docs_root, row.get("folder") or application_id),
+        })
+    return applications
+
+
+def open_documents(folder: str, files: ExitStack) -> dict:
+    documents = {"salary_slips": {}, "cibil_pdf": {}, "asset_docs": {}}
+    for fname in sorted(os.listdir(folder)):
+        category = classify_document(fname)
+        if category:
+            documents[category][fname] = files.enter_context(open(os.path.join(folder, fname), "rb"))
+    return documents
+
+
+def _validate(application: dict, documents: dict) -> None:
+    # same rules as /process_loan/
+    if application["loan_type"] not in ("home", "personal", "car"):
+        raise ValueError("Invalid loan_type")
+    if not documents["salary_slips"]:
+        raise ValueError("At least 1 salary slip file is required")
+    if not documents["cibil_pdf"]:
+        raise ValueError("CIBIL report required")
+    if application["loan_type"] in ("home", "car") and not documents["asset_docs"]:
+        raise ValueError(f"Asset document required for {application['loan_type']} loan")
+    if application["loan_type"] == "personal":
+        documents["asset_docs"] = {}
+
+
+async def process_application(application: dict) -> dict:
+    with ExitStack() as files:
+        documents = open_documents(application["folder"], files)
+        _validate(application, documents)
+
+        state = LoanState()
+        state["name"] = application["name"]
+        state["loan_type"] = application["loan_type"]
+        state["monthly_debt"] = application["monthly_debt"]
+        state["req_loan_amount"] = application["req_loan_amount"]
+        return await workflow.ainvoke(state, config=run_config(**documents))
+
+
+def load_checkpoint(path: str) -> set:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+
+async def run_batch(applications: list, output_path: str, checkpoint_path: str,
+                    concurrency: int = MAX_CONCURRENT_APPLICATIONS) -> dict:
+    """
+    Run applications through the workflow with at most `concurrency` in
+    flight, appending one JSONL line per result. Successful ids go to the
+    checkpoint file, so a rerun skips them and retries only failures.
+    """
+    done = load_checkpoint(checkpoint_path)
+    pending = [a for a in applications if a["application_id"] not in done]
+    queue = asyncio.Queue()
+    for application in pending:
+        queue.put_nowait(application)
+    latencies, failed = [], 0
+
+    with open(output_path, "a", encoding="utf-8") as out, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        def record(line: dict) -> None:
+            out.write(json.dumps(line, default=str) + "\n")
+            out.flush()
+            if line["status"] == "ok":
+                checkpoint.write(line["application_id"] + "\n")
+                checkpoint.flush()
+
+        async def worker():
+            nonlocal failed
+            while not queue.empty():
+                application = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    state = await process_application(application)
+                    line = {"status": "ok", "output": state}
+                except Exception as e:
+                    failed += 1
+                    line = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+                seconds = time.perf_counter() - start
+                latencies.append(seconds)
+                record({"application_id": application["application_id"], "seconds": round(seconds, 3), **line})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(pending))))))
+        elapsed = time.perf_counter() - start
+
+    return summarise(latencies, failed, skipped=len(applications) - len(pending), elapsed=elapsed)
+
+
+def summarise(latencies: list, failed: int, skipped: int, elapsed: float) -> dict:
+    summary = {
+        "processed": len(latencies),
+        "failed": failed,
+        "skipped": skipped,
+        "seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary |= {"p50_seconds": round(p50, 3), "p95_seconds": round(p95, 3), "p99_seconds": round(p99, 3)}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process loan applications in bulk through the workflow")
+    parser.add_argument("csv", help="applications CSV: name, loan_type, monthly_debt[, application_id, req_loan_amount, folder]")
+    parser.add_argument("docs_root", help="directory holding one document folder per application")
+    parser.add_argument("--output", default="batch_results.jsonl")
+    parser.add_argument("--checkpoint", help="completed application ids (default: <output>.checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_APPLICATIONS)
+    args = parser.parse_args(argv)
+
+    applications = load_applications(args.csv, args.docs_root)
+    checkpoint = args.checkpoint or f"{args.output}.checkpoint"
+    summary = asyncio.run(run_batch(applications, args.output, checkpoint, concurrency=args.concurrency))
+
+    print(
+        f"Processed {summary['processed']} applications ({summary['failed']} failed, "
+        f"{summary['skipped']} already done) in {summary['seconds']}s "
+        f"- {summary['throughput_per_second']} applications/s."
+    )
+    if summary["processed"]:
+        print(f"Latency p50 {summary['p50_seconds']}s, p95 {summary['p95_seconds']}s, p99 {summary['p99_seconds']}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+
+# All functions broadcast: principals, rates (annual %, e.g. 8.5) and tenures
+# (months) may be scalars or arrays, e.g. one row per applicant.
+
+
+def _monthly_rate(annual_interest_rate):
+    return np.asarray(annual_interest_rate, dtype=float) / 12 / 100
+
+
+def emi(principal, annual_interest_rate, tenure_months):
+    r = _monthly_rate(annual_interest_rate)
+    n = np.asarray(tenure_months, dtype=float)
+    growth = np.power(1 + r, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortised = np.asarray(principal, dtype=float) * r * growth / (growth - 1)
+    return np.where(r == 0, np.asarray(principal, dtype=float) / n, amortised)
+
+
+def max_principal(allowed_emi, annual_interest_rate, tenure_months):
+    """
+    Largest principal whose EMI does not exceed `allowed_emi`: the EMI
+    formula solved for the principal, P = EMI * (1 - (1 + r)^-n) / r.
+    """
+    r = _monthly_rate(annual_interest_rate)
+    n = np.asarray(tenure_months, dtype=float)
+    allowed = np.clip(np.asarray(allowed_emi, dtype=float), 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = (1 - np.power(1 + r, -n)) / r
+    return allowed * np.where(r == 0, n, annuity)
+
+
+def tenure_grid(min_tenure: int, max_tenure: int, step: int = 12) -> np.ndarray:
+    """
+    Tenures from min_tenure to max_tenure (inclusive) every `step` months.
+    """
+    min_tenure = min(min_tenure or max_tenure, max_tenure)
+    return np.unique(np.append(np.arange(min_tenure, max_tenure, step), max_tenure)).astype(int)
+
+
+def affordability_grid(income, existing_debt, max_dti, loan_cap, rates, tenures) -> dict:
+    """
+    Affordable principal and EMI for every (applicant, rate, tenure) in one pass.
+    `income`, `existing_debt`, `max_dti` and `loan_cap` are scalars or arrays of
+    shape (A,); results have shape (A, len(rates), len(tenures)), with the
+    applicant axis dropped for scalar inputs.
+    """
+    income, existing_debt, max_dti, loan_cap = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (income, existing_debt, max_dti, loan_cap))
+    )
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))[:, None]
+    tenures = np.atleast_1d(np.asarray(tenures, dtype=float))[None, :]
+
+    allowed_emi = np.clip(max_dti * income / 100 - existing_debt, 0, None)[..., None, None]
+    principal = np.minimum(max_principal(allowed_emi, rates, tenures), loan_cap[..., None, None])
+    principal = np.floor(principal)
+    monthly = emi(principal, rates, tenures)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dti = np.where(income[..., None, None] > 0,
+                       (existing_debt[..., None, None] + monthly) / income[..., None, None] * 100, 100.0)
+    return {
+        "allowed_emi": allowed_emi[..., 0, 0],
+        "principal": principal,
+        "emi": monthly,
+        "dti": dti,
+        "rates": rates[:, 0],
+        "tenures": tenures[0].astype(int),
+    }
+
+
+def amortization_schedule(principal: float, annual_interest_rate: float, tenure_months: int) -> dict:
+    """
+    Month-by-month interest, principal repaid and closing balance, from the
+    closed-form outstanding balance B_k = P(1+r)^k - EMI((1+r)^k - 1)/r.
+    """
+    r = float(_monthly_rate(annual_interest_rate))
+    months = np.arange(1, int(tenure_months) + 1)
+    payment = float(emi(principal, annual_interest_rate, tenure_months))
+    if r == 0:
+        balance = principal - payment * months
+    else:
+        growth = np.power(1 + r, months)
+        balance = principal * growth - payment * (growth - 1) / r
+    balance = np.clip(balance, 0, None)
+    opening = np.concatenate(([principal], balance[:-1]))
+    interest = opening * r
+    return {
+        "month": months,
+        "emi": np.full(months.shape, payment),
+        "interest": interest,
+        "principal": payment - interest,
+        "balance": balance,
+    }
+
+
+def yearly_schedule(schedule: dict) -> dict:
+    """
+    The monthly schedule summed per loan year (the last year may be short);
+    `balance` is the balance at the end of each year.
+    """
+    starts = np.arange(0, len(schedule["month"]), 12)
+    return {
+        "year": starts // 12 + 1,
+        "interest": np.add.reduceat(schedule["interest"], starts),
+        "principal": np.add.reduceat(schedule["principal"], starts),
+        "balance": schedule["balance"][np.minimum(starts + 11, len(schedule["month"]) - 1)],
+    }
+
+
+def recommend_loan(max_loan: float, income: float, existing_debt: float, max_dti: float,
+                   annual_interest_rate: float, tenure_months: int) -> dict:
+    """
+    Largest loan up to `max_loan` whose EMI keeps the DTI within `max_dti`.
+    `updated_dti` is the DTI including the new EMI; `adjusted` is set when
+    the loan was reduced or the applicant had no existing debt.
+    """
+    payment = round(float(emi(max_loan, annual_interest_rate, tenure_months)), 2)
+    total_dti = (existing_debt + payment) / income * 100 if income else 100
+    adjusted = existing_debt == 0
+
+    if total_dti > max_dti:
+        allowed_emi = (max_dti * income / 100) - existing_debt
+        if allowed_emi > 0:
+            max_loan = math.floor(float(max_principal(allowed_emi, annual_interest_rate, tenure_months)))
+            payment = round(float(emi(max_loan, annual_interest_rate, tenure_months)), 2)
+            total_dti = (existing_debt + payment) / income * 100
+            adjusted = True
+    return {"loan": max_loan, "emi": payment, "updated_dti": total_dti, "adjusted": adjusted}
+
+
+def recommend_loans(max_loan, income, existing_debt, max_dti, annual_interest_rate, tenure_months) -> dict:
+    """
+    recommend_loan for arrays of applicants: same rules, one pass.
+    """
+    max_loan, income, existing_debt, max_dti, rate, tenure = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in
+          (max_loan, income, existing_debt, max_dti, annual_interest_rate, tenure_months))
+    )
+    payment = np.round(emi(max_loan, rate, tenure), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_dti = np.where(income > 0, (existing_debt + payment) / income * 100, 100.0)
+        allowed_emi = max_dti * income / 100 - existing_debt
+        reduce = (total_dti > max_dti) & (allowed_emi > 0)
+        loan = np.where(reduce, np.floor(max_principal(allowed_emi, rate, tenure)), max_loan)
+        payment = np.where(reduce, np.round(emi(loan, rate, tenure), 2), payment)
+        total_dti = np.where(reduce, (existing_debt + payment) / income * 100, total_dti)
+    return {"loan": loan, "emi": payment, "updated_dti": total_dti}
@@ -8,3 +8,103 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 # Pinecone config
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV")
+
+# Policy corpus and local cache locations
+POLICY_DIR = os.getenv("POLICY_DIR", "policies")
+CACHE_DIR = os.getenv("LOAN_CACHE_DIR", ".cache")
+
+# Declarative eligibility rules, one YAML file per loan type (see core/policy_rules.py)
+POLICY_RULES_DIR = os.getenv("POLICY_RULES_DIR", os.path.join(POLICY_DIR, "rules"))
+
+# Retrieval backend: "pinecone" (remote index) or "local" (memory-mapped NumPy index)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "vector_index")
+
+# Policy retrieval: "dense" (vector store), "lexical" (BM25 only, no embedding call) or
+# "hybrid" (both, merged by reciprocal rank fusion); the BM25 index is written at ingest
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", "lexical_index")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Upper bound on applications processed concurrently by one API process
+MAX_CONCURRENT_APPLICATIONS = int(os.getenv("MAX_CONCURRENT_APPLICATIONS", "32"))
+
+# Query/document embedding cache (in-memory LRU in front of an on-disk store)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite"))
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "4096"))
+
+# Response cache for deterministic (temperature 0) LLM calls; opted into per agent
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Local document pre-processing before the multimodal extraction call
+PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "true").lower() == "true"
+PREPROCESS_IMAGE_MAX_SIDE = int(os.getenv("PREPROCESS_IMAGE_MAX_SIDE", "1600"))
+PREPROCESS_JPEG_QUALITY = int(os.getenv("PREPROCESS_JPEG_QUALITY", "80"))
+PREPROCESS_MIN_PDF_TEXT_CHARS = int(os.getenv("PREPROCESS_MIN_PDF_TEXT_CHARS", "40"))
+
+# Pattern-based extractors must reach this confidence to skip the Gemini call for a field
+EXTRACTOR_MIN_CONFIDENCE = float(os.getenv("EXTRACTOR_MIN_CONFIDENCE", "0.8"))
+
+# Upload limits; uploads are spooled to disk past UPLOAD_SPOOL_MEMORY_BYTES
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+
+# Per-application graph checkpoints, used to re-evaluate corrected applications
+CHECKPOINT_DB = os.getenv("LOAN_CHECKPOINT_DB", os.path.join(CACHE_DIR, "checkpoints.sqlite"))
+
+# Every decided application (features, thresholds, outcome), for queries and bulk re-scoring
+DECISION_DB = os.getenv("LOAN_DECISION_DB", os.path.join(CACHE_DIR, "decisions.sqlite"))
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "50000"))
+
+# Job API: a durable SQLite queue of applications drained by background workers.
+# Lower JOB_PRIORITIES values run first; the default serves the quickest loan types first.
+JOB_DB = os.getenv("LOAN_JOB_DB", os.path.join(CACHE_DIR, "jobs.sqlite"))
+JOB_DIR = os.getenv("LOAN_JOB_DIR", os.path.join(CACHE_DIR, "jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_PRIORITIES = {
+    loan_type.strip(): int(priority)
+    for loan_type, priority in (item.split(":") for item in os.getenv("JOB_PRIORITIES", "personal:0,car:1,home:2").split(","))
+}
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "300"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "1000"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+JOB_WAIT_MAX_SECONDS = float(os.getenv("JOB_WAIT_MAX_SECONDS", "30"))
+
+# Content-addressed cache of document extraction results (resubmitted uploads skip Gemini)
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", os.path.join(CACHE_DIR, "extractions.sqlite"))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "5000"))
+EXTRACTION_CACHE_TTL_SECONDS = float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+EXTRACTION_CACHE_MEMORY_SIZE = int(os.getenv("EXTRACTION_CACHE_MEMORY_SIZE", "256"))
+
+# PDF reports: rendered by a pool of long-lived worker processes and cached by decision hash
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", os.path.join(CACHE_DIR, "reports.sqlite"))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "2000"))
+REPORT_FETCH_WAIT_SECONDS = float(os.getenv("REPORT_FETCH_WAIT_SECONDS", "10"))
+
+# Shared Gemini client: process-wide request budget, retry with jittered backoff, optional hedging
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_BURST = float(os.getenv("GEMINI_BURST", "10"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "20"))
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+
+# Offline stand-ins for benchmarks and tests: LLM_BACKEND / EMBEDDING_BACKEND "fake", VECTOR_BACKEND "fake"
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "gemini")
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0"))
+FAKE_EMBEDDING_LATENCY_SECONDS = float(os.getenv("FAKE_EMBEDDING_LATENCY_SECONDS", "0"))
+FAKE_VECTOR_LATENCY_SECONDS = float(os.getenv("FAKE_VECTOR_LATENCY_SECONDS", "0"))
+FAKE_FAILURE_RATE = float(os.getenv("FAKE_FAILURE_RATE", "0"))
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
@@ -0,0 +1,239 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+
+from core.affordability import recommend_loans
+from core.config import DECISION_DB, RESCORE_CHUNK_SIZE
+from core.policy_rules import get_policy_rules
+
+# Every finished application is kept here: the extracted applicant features,
+# the thresholds it was decided with and the outcome. Re-scoring replays the
+# numeric eligibility and EMI logic over the stored features, so a policy
+# change can be assessed without any LLM or document call.
+
+FEATURES = ("income_monthly", "cibil_score", "monthly_debt", "asset_value", "req_loan_amount")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+class DecisionStore:
+    """
+    SQLite table of decisions keyed by application id, indexed by loan type,
+    date and outcome. A re-evaluated application replaces its row but keeps
+    its original created_at.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            " application_id TEXT PRIMARY KEY, name TEXT, loan_type TEXT NOT NULL,"
+            " created_at REAL NOT NULL, decided_at REAL NOT NULL,"
+            " income_monthly REAL, cibil_score REAL, monthly_debt REAL, asset_value REAL, req_loan_amount REAL,"
+            " interest_rate REAL, max_dti REAL, max_tenure REAL, thresholds TEXT, policy_fingerprint TEXT,"
+            " eligible INTEGER NOT NULL, max_loan REAL, dti REAL, recommended_loan REAL, recommended_emi REAL,"
+            " reasons TEXT);"
+            "CREATE INDEX IF NOT EXISTS decisions_type_date ON decisions (loan_type, created_at);"
+            "CREATE INDEX IF NOT EXISTS decisions_outcome_date ON decisions (eligible, created_at);"
+            "CREATE INDEX IF NOT EXISTS decisions_date ON decisions (created_at);"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(application_id: str, state: dict, fingerprint: str = None, decided_at: float = None) -> dict:
+        policy_info = state.get("policy_info") or {}
+        decided_at = decided_at or time.time()
+        return {
+            "application_id": application_id,
+            "name": state.get("name"),
+            "loan_type": state["loan_type"],
+            "created_at": decided_at,
+            "decided_at": decided_at,
+            **{field: _number(state.get(field)) for field in FEATURES},
+            "interest_rate": _number(policy_info.get("interest_rate")),
+            "max_dti": _number(policy_info.get("max_dti")),
+            "max_tenure": _number(policy_info.get("max_tenure")),
+            "thresholds": json.dumps(policy_info, default=str),
+            "policy_fingerprint": fingerprint,
+            "eligible": int(bool(state.get("eligible"))),
+            "max_loan": _number(state.get("max_loan")),
+            "dti": _number(state.get("DTI")),
+            "recommended_loan": _number(state.get("recommended_loan")),
+            "recommended_emi": _number(state.get("recommended_emi")),
+            "reasons": json.dumps(state.get("reasons") or []),
+        }
+
+    def record_many(self, rows) -> int:
+        """
+        Upsert rows built by _row (or dicts with the same keys) in one transaction.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in ("application_id", "created_at"))
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO decisions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+                f" ON CONFLICT (application_id) DO UPDATE SET {updates}",
+                [tuple(row[c] for c in columns) for row in rows],
+            )
+        return len(rows)
+
+    def record(self, application_id: str, state: dict, fingerprint: str = None) -> None:
+        self.record_many([self._row(application_id, state, fingerprint)])
+
+    def get(self, application_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM decisions WHERE application_id = ?", (application_id,)).fetchone()
+        return _decode(row) if row else None
+
+    @staticmethod
+    def _where(loan_type: str = None, eligible: bool = None, since: float = None, until: float = None):
+        clauses, params = [], []
+        if loan_type is not None:
+            clauses.append("loan_type = ?")
+            params.append(loan_type)
+        if eligible is not None:
+            clauses.append("eligible = ?")
+            params.append(int(eligible))
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, loan_type: str = None, eligible: bool = None, since: float = None, until: float = None,
+              limit: int = 100, offset: int = 0) -> list:
+        """
+        Newest decisions first, filtered by loan type, outcome and a
+        created_at range (epoch seconds).
+        """
+        where, params = self._where(loan_type, eligible, since, until)
+        rows = self._conn().execute(
+            f"SELECT * FROM decisions{where} ORDER BY created_at DESC LIMIT ? OFFSET ?", (*params, limit, offset)
+        ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def count(self, loan_type: str = None, eligible: bool = None, since: float = None, until: float = None) -> int:
+        where, params = self._where(loan_type, eligible, since, until)
+        return self._conn().execute(f"SELECT COUNT(*) FROM decisions{where}", params).fetchone()[0]
+
+    def iter_chunks(self, loan_type: str = None, since: float = None, until: float = None,
+                    chunk_size: int = RESCORE_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Stored features and outcomes as column arrays, `chunk_size` rows at a
+        time, so memory stays flat however large the table is.
+        """
+        columns = ("application_id", "loan_type", *FEATURES, "interest_rate", "eligible", "max_loan")
+        where, params = self._where(loan_type, None, since, until)
+        # a dedicated connection: the read may run while this thread writes elsewhere
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM decisions{where}", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                values = list(zip(*rows))
+                chunk = {"application_id": np.array(values[0], dtype=object),
+                         "loan_type": np.array(values[1], dtype=object)}
+                for name, column in zip(columns[2:], values[2:]):
+                    chunk[name] = np.array(column, dtype=float)
+                yield chunk
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return self.count()
+
+
+def _decode(row: sqlite3.Row) -> dict:
+    decision = dict(row)
+    decision["eligible"] = bool(decision["eligible"])
+    decision["thresholds"] = json.loads(decision["thresholds"] or "{}")
+    decision["reasons"] = json.loads(decision["reasons"] or "[]")
+    return decision
+
+
+def get_decision_store() -> DecisionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DecisionStore(DECISION_DB)
+    return _store
+
+
+def rescore_chunk(chunk: dict) -> dict:
+    """
+    Re-decide one chunk of stored applications against the current rules
+    (policies/rules/), keeping each application's stored interest rate.
+    """
+    size = len(chunk["application_id"])
+    eligible = np.zeros(size, dtype=bool)
+    max_loan = np.zeros(size)
+    loan = np.full(size, np.nan)
+    payment = np.full(size, np.nan)
+    for loan_type in np.unique(chunk["loan_type"]):
+        rows = chunk["loan_type"] == loan_type
+        rules = get_policy_rules(loan_type)
+        income, debt = chunk["income_monthly"][rows], np.nan_to_num(chunk["monthly_debt"][rows])
+        batch = rules.evaluate_batch(income, np.nan_to_num(chunk["cibil_score"][rows]), debt,
+                                     chunk["asset_value"][rows] if rules.asset else None)
+        plan = recommend_loans(batch["max_loan"], income, debt, rules.max_dti,
+                               chunk["interest_rate"][rows], rules.max_tenure)
+        eligible[rows] = batch["eligible"]
+        max_loan[rows] = batch["max_loan"]
+        loan[rows] = np.where(batch["eligible"], plan["loan"], np.nan)
+        payment[rows] = np.where(batch["eligible"], plan["emi"], np.nan)
+
+    was_eligible = chunk["eligible"].astype(bool)
+    previous_max_loan = np.nan_to_num(chunk["max_loan"])
+    return {
+        "application_id": chunk["application_id"],
+        "loan_type": chunk["loan_type"],
+        "eligible_before": was_eligible,
+        "eligible": eligible,
+        "max_loan_before": previous_max_loan,
+        "max_loan": max_loan,
+        "recommended_loan": loan,
+        "recommended_emi": payment,
+        # a rupee of tolerance absorbs float round trips through SQLite
+        "changed": (eligible != was_eligible) | (np.abs(max_loan - previous_max_loan) >= 1),
+    }
+
+
+def rescore(store: DecisionStore = None, loan_type: str = None, since: float = None, until: float = None,
+            chunk_size: int = RESCORE_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Stream re-scored chunks of the stored decisions (see rescore_chunk).
+    """
+    store = store or get_decision_store()
+    for chunk in store.iter_chunks(loan_type, since, until, chunk_size):
+        yield rescore_chunk(chunk)
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import threading
+import time
+
+from core.cache_store import DiskCache, LRUCache
+from core.config import (
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_MEMORY_SIZE,
+    EXTRACTION_CACHE_PATH,
+    EXTRACTION_CACHE_TTL_SECONDS,
+)
+from core.uploads import open_document
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_memory = LRUCache(EXTRACTION_CACHE_MEMORY_SIZE)
+_store = None
+_store_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _get_store() -> DiskCache:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DiskCache(EXTRACTION_CACHE_PATH, max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+                               ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS)
+        return _store
+
+
+def content_hash(document) -> str:
+    digest = hashlib.sha256()
+    handle = open_document(document)
+    for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    handle.seek(0)
+    return digest.hexdigest()
+
+
+def extraction_key(documents: dict, version: str) -> str:
+    """
+    Key over the sorted content hashes of each upload category plus the
+    extraction prompt version; file names and upload order do not matter.
+    """
+    parts = [version]
+    for category in sorted(documents):
+        hashes = sorted(content_hash(doc) for doc in documents[category].values())
+        parts.append(f"{category}:{','.join(hashes)}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _record(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_cached_extraction(key: str):
+    entry = _memory.get(key)
+    # the memory front honours the same TTL as the disk store
+    if entry is not None and time.time() - entry[0] < EXTRACTION_CACHE_TTL_SECONDS:
+        _record("memory_hits")
+        return json.loads(entry[1])
+    raw = _get_store().get(key)
+    if raw is None:
+        _record("misses")
+        return None
+    _memory.set(key, (time.time(), raw))
+    _record("disk_hits")
+    return json.loads(raw)
+
+
+def store_extraction(key: str, result: dict) -> None:
+    raw = json.dumps(result).encode("utf-8")
+    _memory.set(key, (time.time(), raw))
+    _get_store().set(key, raw)
+
+
+def extraction_cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / max(lookups, 1), 4)
+    return stats
@@ -0,0 +1,140 @@
+import re
+import threading
+from typing import Callable, Optional, Tuple
+
+# Local, pattern-based extractors over the document text layer.
+# Each extractor returns (value, confidence) or None when it finds nothing.
+Extractor = Callable[[str], Optional[Tuple[float, float]]]
+
+EXTRACTORS = {"income_monthly": [], "cibil_score": [], "asset_value": []}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+_AMOUNT = r"(?:₹|INR|Rs\.?)?\s*([0-9][0-9,]*(?:\.[0-9]+)?)\s*(lakhs?|lacs?|crores?|cr)?"
+_MULTIPLIERS = {"lakh": 1e5, "lac": 1e5, "crore": 1e7, "cr": 1e7}
+# 31/03/2025, 2025-03-31, 31.03.25: masked before looking for amounts
+_DATE = re.compile(r"\b[0-9]{1,4}[/.-][0-9]{1,2}[/.-][0-9]{2,4}\b")
+# how far after a label its amount may appear, and the smallest plausible amount
+_WINDOW = 80
+_MIN_AMOUNT = 1000
+
+
+def register_extractor(field: str, name: str):
+    def decorator(fn: Extractor) -> Extractor:
+        fn.extractor_name = name
+        EXTRACTORS[field].append(fn)
+        return fn
+    return decorator
+
+
+def _amount(match) -> float:
+    value = float(match.group(1).replace(",", ""))
+    unit = (match.group(2) or "").lower().rstrip("s")
+    return value * _MULTIPLIERS.get(unit, 1)
+
+
+def _is_year(match) -> bool:
+    # "for March 2025": a bare four-digit year with no currency marker or unit
+    bare = match.group(0).lstrip()[:1].isdigit() and not match.group(2)
+    return bare and re.fullmatch(r"(?:19|20)[0-9]{2}", match.group(1)) is not None
+
+
+def _first_amount(pattern: str, text: str) -> Optional[float]:
+    """
+    First plausible amount within a short window after the label; dates,
+    years and bare numbers too small to be rupee amounts are skipped.
+    """
+    label = re.search(pattern, text, flags=re.IGNORECASE)
+    if not label:
+        return None
+    window = _DATE.sub(lambda m: " " * len(m.group(0)), text[label.end():label.end() + _WINDOW])
+    for match in re.finditer(_AMOUNT, window, flags=re.IGNORECASE):
+        if _is_year(match):
+            continue
+        value = _amount(match)
+        if value >= _MIN_AMOUNT:
+            return value
+    return None
+
+
+@register_extractor("cibil_score", "cibil_bureau_score")
+def _cibil_bureau_score(text: str):
+    match = re.search(r"(?:CIBIL|TransUnion)[^0-9]{0,40}score[^0-9]{0,20}([0-9]{3})\b", text, flags=re.IGNORECASE)
+    if match and 300 <= int(match.group(1)) <= 900:
+        return int(match.group(1)), 0.95
+    return None
+
+
+@register_extractor("cibil_score", "generic_credit_score")
+def _generic_credit_score(text: str):
+    match = re.search(r"credit\s+score[^0-9]{0,20}([0-9]{3})\b", text, flags=re.IGNORECASE)
+    if match and 300 <= int(match.group(1)) <= 900:
+        return int(match.group(1)), 0.85
+    return None
+
+
+@register_extractor("income_monthly", "payslip_net_pay")
+def _payslip_net_pay(text: str):
+    value = _first_amount(r"net\s+(?:pay|salary|amount\s+payable)", text)
+    return (value, 0.9) if value else None
+
+
+@register_extractor("income_monthly", "payslip_take_home")
+def _payslip_take_home(text: str):
+    value = _first_amount(r"take[\s-]*home(?:\s+(?:pay|salary))?", text)
+    return (value, 0.85) if value else None
+
+
+@register_extractor("income_monthly", "payslip_gross")
+def _payslip_gross(text: str):
+    # gross is an upper bound on income, not what the policy checks: low confidence
+    value = _first_amount(r"gross\s+(?:pay|salary|earnings)", text)
+    return (value, 0.5) if value else None
+
+
+@register_extractor("asset_value", "asset_valuation")
+def _asset_valuation(text: str):
+    value = _first_amount(r"(?:market|property|fair|assessed)\s+value", text)
+    return (value, 0.85) if value else None
+
+
+@register_extractor("asset_value", "vehicle_price")
+def _vehicle_price(text: str):
+    value = _first_amount(r"(?:on[\s-]*road|ex[\s-]*showroom)\s+price", text)
+    return (value, 0.85) if value else None
+
+
+def _record(name: str, hit: bool) -> None:
+    with _stats_lock:
+        counts = _stats.setdefault(name, {"attempts": 0, "hits": 0})
+        counts["attempts"] += 1
+        counts["hits"] += int(hit)
+
+
+def record_llm_call(fields_requested: int) -> None:
+    with _stats_lock:
+        counts = _stats.setdefault("llm", {"calls": 0, "calls_avoided": 0})
+        counts["calls" if fields_requested else "calls_avoided"] += 1
+
+
+def extract_field(field: str, text: str) -> Optional[dict]:
+    """
+    Best (highest-confidence) value from the registered extractors for one document.
+    """
+    best = None
+    for extractor in EXTRACTORS[field]:
+        found = extractor(text) if text else None
+        _record(extractor.extractor_name, found is not None)
+        if found and (best is None or found[1] > best["confidence"]):
+            best = {"value": found[0], "confidence": found[1], "source": extractor.extractor_name}
+    return best
+
+
+def extractor_stats() -> dict:
+    with _stats_lock:
+        stats = {name: dict(counts) for name, counts in _stats.items()}
+    for name, counts in stats.items():
+        if "attempts" in counts:
+            counts["hit_rate"] = round(counts["hits"] / max(counts["attempts"], 1), 4)
+    return stats
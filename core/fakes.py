@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, List
+
+import numpy as np
+from google.api_core import exceptions as google_exceptions
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from core.config import (
+    FAKE_LLM_LATENCY_SECONDS,
+    FAKE_EMBEDDING_LATENCY_SECONDS,
+    FAKE_VECTOR_LATENCY_SECONDS,
+    FAKE_FAILURE_RATE,
+    FAKE_SEED,
+)
+from core.gemini_client import ResilientChatMixin
+from core.local_index import LocalRetriever, LocalVectorIndex
+
+# Deterministic stand-ins for Gemini and Pinecone. Each injects a fixed latency
+# and fails a seeded fraction of calls with the transient error Gemini returns,
+# so benchmarks exercise the same waiting and retry paths as production.
+
+# plausible values for the structured outputs the agents ask for, by field name
+FAKE_FIELD_VALUES = {
+    "cibil_score": 760,
+    "income_monthly": 85000.0,
+    "asset_value": 6000000.0,
+    "min_cibil": 700,
+    "max_dti": 50.0,
+    "interest_rate": 9.0,
+    "income_threshold": "INR 25,000 per month",
+    "min_income_monthly": 25000.0,
+    "max_tenure": 240,
+    "min_tenure": 12,
+    "loan_type": "home",
+    "income": 1020000.0,
+    "value": 6000000.0,
+    "existing_debt": 15000.0,
+    "next_steps": ["Submit KYC documents", "Sign the loan agreement"],
+    "summary": "The applicant meets the credit score and income requirements of the policy and the "
+               "existing obligations keep the debt to income ratio within the allowed limit.",
+    "recommendation": "Proceed with the application at the recommended amount and tenure and keep "
+                      "the existing monthly obligations unchanged until disbursement.",
+}
+_TYPE_DEFAULTS = {int: 0, float: 0.0, str: "n/a", list: []}
+
+FAKE_POLICY_ANSWER = (
+    "Minimum CIBIL score 700. Maximum DTI 50. Maximum LTV 80 percent. Interest rate 9.0 percent per annum. "
+    "Minimum monthly income INR 25,000. Maximum tenure 240 months and minimum tenure 12 months."
+)
+
+
+class FaultInjector:
+    """
+    Seeded latency and failure source shared by one fake backend.
+    """
+
+    def __init__(self, name: str, latency: float, failure_rate: float, seed: int = FAKE_SEED):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(f"{seed}:{name}")
+        self._lock = threading.Lock()
+
+    def _should_fail(self) -> bool:
+        if self.failure_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+    def _fail(self) -> None:
+        raise google_exceptions.ServiceUnavailable(f"injected {self.name} failure")
+
+    def wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_fail():
+            self._fail()
+
+    async def await_(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._should_fail():
+            self._fail()
+
+
+LLM_FAULTS = FaultInjector("llm", FAKE_LLM_LATENCY_SECONDS, FAKE_FAILURE_RATE)
+EMBEDDING_FAULTS = FaultInjector("embedding", FAKE_EMBEDDING_LATENCY_SECONDS, FAKE_FAILURE_RATE)
+VECTOR_STORE_FAULTS = FaultInjector("vector_store", FAKE_VECTOR_LATENCY_SECONDS, FAKE_FAILURE_RATE)
+
+
+def fake_structured_output(schema) -> dict:
+    values = {}
+    for name, field in schema.model_fields.items():
+        origin = getattr(field.annotation, "__origin__", field.annotation)
+        values[name] = FAKE_FIELD_VALUES.get(name, _TYPE_DEFAULTS.get(origin, None))
+    return values
+
+
+def _prompt_text(messages) -> str:
+    parts = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(p.get("text", "") for p in content if isinstance(p, dict))
+    return "\n".join(parts)
+
+
+class _FakeChatBackend(BaseChatModel):
+    model: str = "fake-gemini"
+    structured_schema: Any = None
+    faults: Any = None
+
+    @property
+    def injector(self) -> FaultInjector:
+        return self.faults or LLM_FAULTS
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    @property
+    def _identifying_params(self) -> dict:
+        schema = self.structured_schema.__name__ if self.structured_schema else None
+        return {"model": self.model, "schema": schema}
+
+    def _respond(self, messages) -> AIMessage:
+        if self.structured_schema is not None:
+            text = json.dumps(fake_structured_output(self.structured_schema))
+        else:
+            text = FAKE_POLICY_ANSWER
+        # roughly four characters per token, like the Gemini tokenizer on English text
+        input_tokens = len(_prompt_text(messages)) // 4
+        output_tokens = len(text) // 4
+        return AIMessage(content=text, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.injector.wait()
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await self.injector.await_()
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _chunks(self, message: AIMessage):
+        words = re.findall(r"\S+\s*", message.content)
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word, usage_metadata=message.usage_metadata if last else None
+            ))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.injector.wait()
+        yield from self._chunks(self._respond(messages))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await self.injector.await_()
+        for chunk in self._chunks(self._respond(messages)):
+            yield chunk
+
+
+class FakeChatModel(ResilientChatMixin, _FakeChatBackend):
+    """
+    Chat model answering structured requests with FAKE_FIELD_VALUES and free
+    text with a fixed policy summary. Sits behind the same limiter and retry
+    policy as the Gemini client.
+    """
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        structured = self.model_copy(update={"structured_schema": schema})
+        return structured | PydanticOutputParser(pydantic_object=schema)
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Hashed bag-of-words vectors: deterministic, and texts sharing words land
+    close together, so retrieval over them still returns related chunks.
+    """
+
+    def __init__(self, dimension: int = 256, faults: FaultInjector = None):
+        self.dimension = dimension
+        self.injector = faults or EMBEDDING_FAULTS
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension)
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.injector.wait()
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.injector.wait()
+        return self._embed(text)
+
+    async def aembed_documents(self, texts):
+        await self.injector.await_()
+        return [self._embed(t) for t in texts]
+
+    async def aembed_query(self, text):
+        await self.injector.await_()
+        return self._embed(text)
+
+
+class FakeVectorIndex(LocalVectorIndex):
+    """
+    LocalVectorIndex held in memory, built from the policy folder at startup
+    instead of being read from an ingested index directory.
+    """
+
+    def __init__(self, texts: List[str], metadatas: List[dict], vectors):
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.path = None
+        self.matrix = matrix / norms
+        self.ids = [str(i) for i in range(len(texts))]
+        self.texts = texts
+        self.metadatas = metadatas
+        self._masks = {}
+
+    @classmethod
+    def from_folder(cls, folder: str, embeddings: Embeddings):
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        texts, metadatas = [], []
+        for fname in sorted(os.listdir(folder)):
+            if not fname.lower().endswith((".txt", ".md")):
+                continue
+            with open(os.path.join(folder, fname), encoding="utf-8") as f:
+                chunks = splitter.split_text(f.read())
+            loan_type = Path(fname).stem.split("_")[0]
+            texts.extend(chunks)
+            metadatas.extend({"loan_type": loan_type, "source_file": fname} for _ in chunks)
+        return cls(texts, metadatas, embeddings.embed_documents(texts) if texts else [])
+
+
+class FakeRetriever(LocalRetriever):
+    """
+    LocalRetriever with the vector store's network latency and failures injected.
+    """
+
+    faults: Any = None
+
+    @property
+    def injector(self) -> FaultInjector:
+        return self.faults or VECTOR_STORE_FAULTS
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        self.injector.wait()
+        return super()._get_relevant_documents(query, run_manager=run_manager)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        await self.injector.await_()
+        return await super()._aget_relevant_documents(query, run_manager=run_manager)
@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from google.api_core import exceptions as google_exceptions
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai import chat_models as genai_chat_models
+from pydantic import PrivateAttr
+
+from core.config import (
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_BURST,
+    GEMINI_MAX_RETRIES,
+    GEMINI_BACKOFF_BASE_SECONDS,
+    GEMINI_BACKOFF_MAX_SECONDS,
+    GEMINI_HEDGE_ENABLED,
+    GEMINI_HEDGE_PERCENTILE,
+    GEMINI_HEDGE_MIN_SAMPLES,
+)
+
+logger = logging.getLogger(__name__)
+
+# quota and transient server errors; anything else (bad request, auth) fails at once
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.Aborted,
+)
+
+_metrics = {
+    "requests": 0,
+    "failures": 0,
+    "retries": 0,
+    "quota_errors": 0,
+    "limiter_waits": 0,
+    "limiter_wait_seconds": 0.0,
+    "hedges": 0,
+    "hedge_wins": 0,
+}
+_latencies = deque(maxlen=500)
+_metrics_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-hedge")
+
+
+# ChatGoogleGenerativeAI wraps every request in its own tenacity retry (2 attempts,
+# 1-60 s waits) that bypasses LIMITER and the stats. Calls made through
+# ResilientChatMixin switch it off, so retries happen only in call_with_resilience.
+_library_retry_off = ContextVar("gemini_library_retry_off", default=False)
+_library_retry_decorator = genai_chat_models._create_retry_decorator
+_DONE = object()
+
+
+def _retry_decorator():
+    if _library_retry_off.get():
+        return lambda fn: fn
+    return _library_retry_decorator()
+
+
+genai_chat_models._create_retry_decorator = _retry_decorator
+
+
+@contextmanager
+def _single_attempt():
+    token = _library_retry_off.set(True)
+    try:
+        yield
+    finally:
+        _library_retry_off.reset(token)
+
+
+def _count(name: str, amount=1) -> None:
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+class TokenBucket:
+    """
+    Process-wide request limiter: `rate_per_second` tokens refill continuously
+    up to `capacity`. Callers reserve a token and sleep until it is theirs, so
+    waiters are served in order without polling.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            _count("limiter_waits")
+            _count("limiter_wait_seconds", delay)
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            _count("limiter_waits")
+            _count("limiter_wait_seconds", delay)
+            await asyncio.sleep(delay)
+
+
+LIMITER = TokenBucket(GEMINI_REQUESTS_PER_MINUTE / 60, GEMINI_BURST)
+
+
+def backoff_delay(attempt: int) -> float:
+    # "full jitter": spreads retries of concurrent callers instead of synchronising them
+    return random.uniform(0, min(GEMINI_BACKOFF_MAX_SECONDS, GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _should_retry(error: Exception, attempt: int) -> bool:
+    if isinstance(error, google_exceptions.TooManyRequests):
+        _count("quota_errors")
+    if attempt >= GEMINI_MAX_RETRIES:
+        _count("failures")
+        return False
+    _count("retries")
+    logger.warning("gemini call failed (%s), retry %d/%d", type(error).__name__, attempt + 1, GEMINI_MAX_RETRIES)
+    return True
+
+
+def hedge_delay():
+    """
+    Seconds after which a duplicate request is sent, or None when hedging is
+    off or there are too few latency samples to pick the percentile.
+    """
+    if not GEMINI_HEDGE_ENABLED:
+        return None
+    with _metrics_lock:
+        samples = list(_latencies)
+    if len(samples) < GEMINI_HEDGE_MIN_SAMPLES:
+        return None
+    return float(np.percentile(samples, GEMINI_HEDGE_PERCENTILE))
+
+
+def _attempt(fn):
+    LIMITER.acquire()
+    _count("requests")
+    start = time.perf_counter()
+    result = fn()
+    with _metrics_lock:
+        _latencies.append(time.perf_counter() - start)
+    return result
+
+
+async def _aattempt(afn):
+    await LIMITER.aacquire()
+    _count("requests")
+    start = time.perf_counter()
+    result = await afn()
+    with _metrics_lock:
+        _latencies.append(time.perf_counter() - start)
+    return result
+
+
+def _hedged(fn):
+    delay = hedge_delay()
+    if delay is None:
+        return _attempt(fn)
+    primary = _hedge_pool.submit(_attempt, fn)
+    if wait([primary], timeout=delay).done:
+        return primary.result()
+    _count("hedges")
+    hedge = _hedge_pool.submit(_attempt, fn)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # the slower thread cannot be interrupted; its result is discarded
+                if future is hedge:
+                    _count("hedge_wins")
+                return future.result()
+    return primary.result()
+
+
+async def _ahedged(afn):
+    delay = hedge_delay()
+    if delay is None:
+        return await _aattempt(afn)
+    primary = asyncio.ensure_future(_aattempt(afn))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    _count("hedges")
+    hedge = asyncio.ensure_future(_aattempt(afn))
+    pending = {primary, hedge}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                if task is hedge:
+                    _count("hedge_wins")
+                return task.result()
+    return primary.result()
+
+
+def call_with_resilience(fn):
+    """
+    Run `fn()` behind the shared limiter, retrying quota and transient
+    errors with jittered exponential backoff and hedging slow attempts.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _hedged(fn)
+        except RETRYABLE_ERRORS as e:
+            if not _should_retry(e, attempt):
+                raise
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
+async def acall_with_resilience(afn):
+    attempt = 0
+    while True:
+        try:
+            return await _ahedged(afn)
+        except RETRYABLE_ERRORS as e:
+            if not _should_retry(e, attempt):
+                raise
+        await asyncio.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
+def gemini_client_stats() -> dict:
+    with _metrics_lock:
+        stats = dict(_metrics)
+        samples = list(_latencies)
+    stats["limiter_wait_seconds"] = round(stats["limiter_wait_seconds"], 3)
+    if samples:
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        stats |= {"latency_p50": round(p50, 3), "latency_p95": round(p95, 3), "latency_p99": round(p99, 3)}
+    stats["hedge_delay"] = hedge_delay()
+    return stats
+
+
+class ResilientChatMixin:
+    """
+    Routes a chat model's calls through the shared limiter and retry/hedging
+    policy. Streams are retried only until their first chunk.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        generate = super()._generate
+
+        # set inside the attempt: hedged attempts run on pool threads
+        def attempt():
+            with _single_attempt():
+                return generate(messages, stop, run_manager, **kwargs)
+
+        return call_with_resilience(attempt)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        agenerate = super()._agenerate
+
+        async def attempt():
+            with _single_attempt():
+                return await agenerate(messages, stop, run_manager, **kwargs)
+
+        return await acall_with_resilience(attempt)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        stream = super()._stream
+        attempt = 0
+        while True:
+            LIMITER.acquire()
+            _count("requests")
+            started = False
+            try:
+                chunks = stream(messages, stop, run_manager, **kwargs)
+                # the flag is set per chunk only, never across a yield
+                while True:
+                    with _single_attempt():
+                        chunk = next(chunks, _DONE)
+                    if chunk is _DONE:
+                        return
+                    started = True
+                    yield chunk
+            except RETRYABLE_ERRORS as e:
+                if started or not _should_retry(e, attempt):
+                    raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        astream = super()._astream
+        attempt = 0
+        while True:
+            await LIMITER.aacquire()
+            _count("requests")
+            started = False
+            try:
+                chunks = astream(messages, stop, run_manager, **kwargs)
+                while True:
+                    with _single_attempt():
+                        chunk = await anext(chunks, _DONE)
+                    if chunk is _DONE:
+                        return
+                    started = True
+                    yield chunk
+            except RETRYABLE_ERRORS as e:
+                if started or not _should_retry(e, attempt):
+                    raise
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+
+class PooledChatGoogleGenerativeAI(ResilientChatMixin, ChatGoogleGenerativeAI):
+    """
+    Gemini chat model meant to be shared process-wide (see get_gemini_llm).
+    The gRPC async client is kept per event loop, since a client cannot be
+    used across loops.
+    """
+
+    _loop_clients: Any = PrivateAttr(default_factory=WeakKeyDictionary)
+    _client_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def async_client(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        client = self._loop_clients.get(loop)
+        if client is None:
+            with self._client_lock:
+                self.async_client_running = None
+                client = ChatGoogleGenerativeAI.async_client.fget(self)
+                self._loop_clients[loop] = client
+        return client
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from typing import Optional
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from core.config import (
+    JOB_DB,
+    JOB_DIR,
+    JOB_WORKERS,
+    JOB_PRIORITIES,
+    JOB_TIMEOUT_SECONDS,
+    JOB_QUEUE_MAX_DEPTH,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Applications submitted through the job API wait here instead of holding an
+# HTTP connection open. Jobs and their uploaded documents are on disk, so a
+# restart loses nothing: a job whose worker died is handed out again once its
+# lease (timeout plus LEASE_GRACE_SECONDS) has run out.
+
+FINISHED = ("done", "failed", "timed_out")
+LEASE_GRACE_SECONDS = 60
+DOCUMENT_CATEGORIES = ("salary_slips", "cibil_pdf", "asset_docs")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class JobQueue:
+    """
+    Durable priority queue on SQLite: lowest priority value first, then
+    oldest. Safe to share between API processes.
+    """
+
+    def __init__(self, path: str, documents_dir: str, max_depth: int = JOB_QUEUE_MAX_DEPTH):
+        self.path = path
+        self.documents_dir = documents_dir
+        self.max_depth = max_depth
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, application_id TEXT NOT NULL, loan_type TEXT NOT NULL,"
+            " priority INTEGER NOT NULL, status TEXT NOT NULL, application TEXT NOT NULL,"
+            " timeout_seconds REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, worker TEXT,"
+            " created_at REAL NOT NULL, started_at REAL, lease_until REAL, finished_at REAL,"
+            " result TEXT, error TEXT);"
+            "CREATE INDEX IF NOT EXISTS jobs_next ON jobs (status, priority, created_at);"
+            "CREATE INDEX IF NOT EXISTS jobs_application ON jobs (application_id);"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.documents_dir, job_id)
+
+    def _save_documents(self, job_id: str, documents: dict) -> None:
+        for category, files in documents.items():
+            folder = os.path.join(self._job_dir(job_id), category)
+            os.makedirs(folder, exist_ok=True)
+            for fname, handle in files.items():
+                handle.seek(0)
+                with open(os.path.join(folder, os.path.basename(fname)), "wb") as f:
+                    shutil.copyfileobj(handle, f, COPY_CHUNK_SIZE)
+
+    def open_documents(self, job_id: str, files: ExitStack) -> dict:
+        """
+        The job's uploads as {category: {filename: handle}}, closed with `files`.
+        """
+        documents = {}
+        for category in DOCUMENT_CATEGORIES:
+            folder = os.path.join(self._job_dir(job_id), category)
+            names = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+            documents[category] = {
+                fname: files.enter_context(open(os.path.join(folder, fname), "rb")) for fname in names
+            }
+        return documents
+
+    def submit(self, application: dict, documents: dict, application_id: str = None,
+               timeout_seconds: float = None) -> tuple:
+        """
+        Queue an application with its documents. Returns (job, created):
+        resubmitting an application id that is queued, running or done returns
+        the existing job instead of doing the work twice. Raises QueueFull past
+        max_depth queued jobs.
+        """
+        job_id = uuid.uuid4().hex
+        application_id = application_id or job_id
+        loan_type = application["loan_type"]
+        self._save_documents(job_id, documents)
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = conn.execute(
+                    "SELECT job_id FROM jobs WHERE application_id = ? AND status IN ('queued', 'running', 'done')"
+                    " ORDER BY created_at DESC LIMIT 1", (application_id,)
+                ).fetchone()
+                if existing is None:
+                    depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+                    if self.max_depth and depth >= self.max_depth:
+                        raise QueueFull(f"job queue is full ({depth} queued)")
+                    conn.execute(
+                        "INSERT INTO jobs (job_id, application_id, loan_type, priority, status, application,"
+                        " timeout_seconds, created_at) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                        (job_id, application_id, loan_type, JOB_PRIORITIES.get(loan_type, max(JOB_PRIORITIES.values()) + 1),
+                         json.dumps(application), timeout_seconds or JOB_TIMEOUT_SECONDS, time.time()),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except BaseException:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+            raise
+        if existing is not None:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+            return self.get(existing["job_id"]), False
+        return self.get(job_id), True
+
+    def _recover_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        # the worker holding these died: retry while attempts remain
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL"
+            " WHERE status = 'running' AND lease_until < ? AND attempts < ?", (now, JOB_MAX_ATTEMPTS)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'worker lost'"
+            " WHERE status = 'running' AND lease_until < ?", (now, now)
+        )
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """
+        Atomically take the next queued job, or None when the queue is empty.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._recover_expired(conn, now)
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1,"
+                " lease_until = ? + timeout_seconds + ?"
+                " WHERE job_id = (SELECT job_id FROM jobs WHERE status = 'queued'"
+                "                 ORDER BY priority, created_at LIMIT 1)"
+                " RETURNING *", (worker, now, now, LEASE_GRACE_SECONDS)
+            ).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return _decode(row) if row else None
+
+    def finish(self, job_id: str, status: str, result: dict = None, error: str = None) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, result = ?, error = ? WHERE job_id = ?",
+            (status, time.time(), json.dumps(result, default=str) if result is not None else None, error, job_id),
+        )
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def release(self, job_id: str) -> None:
+        """
+        Put a running job back at the head of its priority, e.g. on shutdown.
+        """
+        self._conn().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL, attempts = attempts - 1"
+            " WHERE job_id = ? AND status = 'running'", (job_id,)
+        )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = _decode(row)
+        if job["status"] == "queued":
+            job["position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND (priority < ? OR (priority = ? AND created_at < ?))",
+                (row["priority"], row["priority"], row["created_at"]),
+            ).fetchone()[0]
+        return job
+
+    def depth(self) -> dict:
+        """
+        Queued and running job counts, overall and per loan type.
+        """
+        rows = self._conn().execute(
+            "SELECT status, loan_type, COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            " GROUP BY status, loan_type"
+        ).fetchall()
+        depth = {"queued": 0, "running": 0, "by_loan_type": {}}
+        for status, loan_type, count in rows:
+            depth[status] += count
+            depth["by_loan_type"].setdefault(loan_type, {"queued": 0, "running": 0})[status] = count
+        depth["max_depth"] = self.max_depth
+        return depth
+
+
+def _decode(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["application"] = json.loads(job["application"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+class JobQueueCollector:
+    """
+    Exposes the queue depth on /metrics.
+    """
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+
+    def collect(self):
+        depth = self.queue.depth()
+        family = GaugeMetricFamily("loan_job_queue_depth", "Jobs waiting or running", labels=["status", "loan_type"])
+        for loan_type, counts in depth["by_loan_type"].items():
+            for status, count in counts.items():
+                family.add_metric([status, loan_type], count)
+        yield family
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(JOB_DB, JOB_DIR)
+                REGISTRY.register(JobQueueCollector(_queue))
+    return _queue
+
+
+class JobWorkerPool:
+    """
+    `workers` asyncio tasks draining the queue with `handler(job) -> result`,
+    each job bounded by its timeout. Idle workers wake on notify() from this
+    process and poll every `poll_seconds` for jobs queued by other processes.
+    """
+
+    def __init__(self, queue: JobQueue, handler, workers: int = JOB_WORKERS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._tasks = []
+        self._signal = None
+        self._finished = {}
+
+    def start(self) -> None:
+        self._signal = asyncio.Semaphore(0)
+        self._tasks = [asyncio.create_task(self._work(f"{os.getpid()}-{n}")) for n in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        if self._signal is not None:
+            self._signal.release()
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._signal.acquire(), self.poll_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _work(self, worker: str) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, worker)
+            except sqlite3.Error:
+                logger.exception("job worker %s could not claim a job", worker)
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict) -> None:
+        job_id, result, error = job["job_id"], None, None
+        try:
+            result = await asyncio.wait_for(self.handler(job), job["timeout_seconds"])
+            status = "done"
+        except asyncio.TimeoutError:
+            status, error = "timed_out", f"exceeded {job['timeout_seconds']:g}s"
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, job_id)
+            raise
+        except Exception as e:
+            logger.exception("job %s failed", job_id)
+            status, error = "failed", f"{type(e).__name__}: {e}"
+        await asyncio.to_thread(self.queue.finish, job_id, status, result, error)
+        event = self._finished.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """
+        The job once finished, or as it stands after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self.queue.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            event = self._finished.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, self.poll_seconds))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,145 @@
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+
+logger = logging.getLogger(__name__)
+
+LEXICAL_FILE = "bm25.json"
+
+# policy questions hinge on short exact terms (CIBIL, DTI, LTV, EMI), so nothing is stemmed
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from give has in is it its of on or per than that the their this to up "
+    "upto what when which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def write_lexical_index(path: str, texts: List[str], metadatas: List[dict], ids: Optional[List[str]] = None):
+    """
+    Write the chunks with their term counts, so loading skips tokenisation.
+    """
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, f"{LEXICAL_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "ids": ids or [str(i) for i in range(len(texts))],
+            "texts": texts,
+            "metadatas": metadatas,
+            "term_counts": [Counter(tokenize(t)) for t in texts],
+        }, f)
+    os.replace(tmp_path, os.path.join(path, LEXICAL_FILE))
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 index: one posting array per term, scored with NumPy.
+    """
+
+    def __init__(self, texts: List[str], metadatas: List[dict], ids: Optional[List[str]] = None,
+                 term_counts: Optional[List[dict]] = None, k1: float = 1.5, b: float = 0.75):
+        self.ids = ids or [str(i) for i in range(len(texts))]
+        self.texts = texts
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+        term_counts = term_counts or [Counter(tokenize(t)) for t in texts]
+
+        postings = {}
+        for doc, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc)
+                postings[term][1].append(count)
+        self.doc_lengths = np.array([sum(c.values()) for c in term_counts], dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if len(texts) else 0.0
+        n = len(texts)
+        self.postings = {
+            term: (np.array(docs), np.array(counts, dtype=np.float32),
+                   math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)))
+            for term, (docs, counts) in postings.items()
+        }
+        self._masks = {}
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        with open(os.path.join(path, LEXICAL_FILE), encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["texts"], data["metadatas"], data["ids"], data["term_counts"])
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _mask(self, key: str, value) -> np.ndarray:
+        if (key, value) not in self._masks:
+            self._masks[(key, value)] = np.fromiter(
+                (m.get(key) == value for m in self.metadatas), dtype=bool, count=len(self.metadatas)
+            )
+        return self._masks[(key, value)]
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self), dtype=np.float32)
+        if not len(self):
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (self.avg_length or 1.0))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, counts, idf = posting
+            scores[docs] += idf * counts * (self.k1 + 1) / (counts + norm[docs])
+        return scores
+
+    def search(self, query: str, k: int = 4, filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Top-k (Document, BM25 score) pairs with a non-zero score, optionally
+        restricted by metadata equality.
+        """
+        scores = self.scores(query)
+        if filter:
+            for key, value in filter.items():
+                scores = np.where(self._mask(key, value), scores, 0.0)
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (Document(page_content=self.texts[i], metadata=self.metadatas[i]), float(scores[i]))
+            for i in top
+        ]
+
+
+def load_lexical_index(path: str) -> LexicalIndex:
+    try:
+        return LexicalIndex.load(path)
+    except FileNotFoundError:
+        logger.warning("no lexical index at %s; run ingest_policies.py. Lexical retrieval returns nothing.", path)
+        return LexicalIndex([], [])
+
+
+class LexicalRetriever(BaseRetriever):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: LexicalIndex
+    k: int = 4
+    filter: Optional[dict] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.index.search(query, k=self.k, filter=self.filter)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return self._get_relevant_documents(query, run_manager=run_manager)
@@ -1,7 +1,26 @@
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from core.config import GOOGLE_API_KEY
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from core.config import (
+    GOOGLE_API_KEY,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MEMORY_SIZE,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_BACKEND,
+    EMBEDDING_BACKEND,
+)
+from core.resources import register_resource, get_resource
+from core.cache_store import DiskCache, LRUCache
+from core.llm_cache import LLMResponseCache
+from core.gemini_client import PooledChatGoogleGenerativeAI
+from core.metrics import TimedEmbeddings
 import asyncio
+import hashlib
 import threading
+import numpy as np
 
 # Ensure an event loop exists in the current thread
 def ensure_event_loop():
@@ -15,18 +34,162 @@ def ensure_event_loop():
         asyncio.set_event_loop(loop)
     return loop
 
-def get_gemini_llm(model="gemini-2.0-flash", **kwargs):
-    return ChatGoogleGenerativeAI(
+_llm_response_store = None
+
+def _get_llm_response_store() -> DiskCache:
+    global _llm_response_store
+    if _llm_response_store is None:
+        _llm_response_store = DiskCache(LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES,
+                                        ttl_seconds=LLM_CACHE_TTL_SECONDS)
+    return _llm_response_store
+
+_llm_pool = {}
+_llm_pool_lock = threading.Lock()
+
+def get_gemini_llm(model="gemini-2.0-flash", cache_namespace: str = None, **kwargs):
+    """
+    Pass `cache_namespace` (usually the agent name) to opt into the response
+    cache; identical prompts for the same model and schema are then answered
+    from disk and counted under that namespace.
+
+    Clients are shared process-wide per (model, namespace, options), so every
+    agent draws on one connection pool and one rate limit.
+    """
+    try:
+        key = (model, cache_namespace, tuple(sorted(kwargs.items())))
+        hash(key)
+    except TypeError:
+        key = None
+    with _llm_pool_lock:
+        llm = _llm_pool.get(key) if key is not None else None
+        if llm is None:
+            llm = _make_gemini_llm(model, cache_namespace, **kwargs)
+            if key is not None:
+                _llm_pool[key] = llm
+    return llm
+
+def _make_gemini_llm(model, cache_namespace, **kwargs):
+    if cache_namespace and LLM_CACHE_ENABLED:
+        kwargs.setdefault("cache", LLMResponseCache(_get_llm_response_store(), cache_namespace))
+    if LLM_BACKEND == "fake":
+        from core.fakes import FakeChatModel
+
+        return FakeChatModel(model=f"fake-{model}", **kwargs)
+    return PooledChatGoogleGenerativeAI(
         model=model,
         google_api_key=GOOGLE_API_KEY,
         temperature=0,
         **kwargs
     )
 
-def get_gemini_embedder():
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated texts from an in-memory LRU and a
+    persistent on-disk store keyed by model name, task type and text hash.
+    """
+
+    def __init__(self, embedder: Embeddings, model: str, task_type: str = None,
+                 store: DiskCache = None, memory_size: int = 4096):
+        self.embedder = embedder
+        self.model = model
+        self.task_type = task_type
+        self.store = store
+        self.memory = LRUCache(memory_size)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    def _key(self, text: str, kind: str) -> str:
+        # Gemini defaults to a different task type for queries and documents
+        task_type = self.task_type or ("RETRIEVAL_QUERY" if kind == "query" else "RETRIEVAL_DOCUMENT")
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model}:{task_type}:{digest}"
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _lookup(self, key: str):
+        vector = self.memory.get(key)
+        if vector is not None:
+            self._count("memory_hits")
+            return vector
+        if self.store is not None:
+            raw = self.store.get(key)
+            if raw is not None:
+                vector = np.frombuffer(raw, dtype=np.float64).tolist()
+                self.memory.set(key, vector)
+                self._count("disk_hits")
+                return vector
+        return None
+
+    def _save(self, key: str, vector) -> None:
+        self.memory.set(key, list(vector))
+        if self.store is not None:
+            self.store.set(key, np.asarray(vector, dtype=np.float64).tobytes())
+
+    def _split(self, texts, kind: str):
+        keys = [self._key(t, kind) for t in texts]
+        vectors = [self._lookup(k) for k in keys]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        self._count("misses", len(missing))
+        return keys, vectors, missing
+
+    def _fill(self, keys, vectors, missing, embedded):
+        for i, vector in zip(missing, embedded):
+            self._save(keys[i], vector)
+            vectors[i] = list(vector)
+        return vectors
+
+    def embed_documents(self, texts):
+        keys, vectors, missing = self._split(texts, "document")
+        embedded = self.embedder.embed_documents([texts[i] for i in missing]) if missing else []
+        return self._fill(keys, vectors, missing, embedded)
+
+    def embed_query(self, text):
+        keys, vectors, missing = self._split([text], "query")
+        if missing:
+            self._fill(keys, vectors, missing, [self.embedder.embed_query(text)])
+        return vectors[0]
+
+    async def aembed_documents(self, texts):
+        keys, vectors, missing = self._split(texts, "document")
+        embedded = await self.embedder.aembed_documents([texts[i] for i in missing]) if missing else []
+        return self._fill(keys, vectors, missing, embedded)
+
+    async def aembed_query(self, text):
+        keys, vectors, missing = self._split([text], "query")
+        if missing:
+            self._fill(keys, vectors, missing, [await self.embedder.aembed_query(text)])
+        return vectors[0]
+
+
+_embedding_store = None
+
+def _get_embedding_store() -> DiskCache:
+    global _embedding_store
+    if _embedding_store is None:
+        _embedding_store = DiskCache(EMBEDDING_CACHE_PATH)
+    return _embedding_store
+
+def make_gemini_embedder(model="gemini-embedding-001", task_type="RETRIEVAL_DOCUMENT") -> Embeddings:
     ensure_event_loop()
-    return GoogleGenerativeAIEmbeddings(
-        model="gemini-embedding-001",
-        google_api_key=GOOGLE_API_KEY,
-        task_type="RETRIEVAL_DOCUMENT",
-    )
+    if EMBEDDING_BACKEND == "fake":
+        from core.fakes import FakeEmbeddings
+
+        model, inner = f"fake-{model}", FakeEmbeddings()
+    else:
+        inner = GoogleGenerativeAIEmbeddings(model=model, google_api_key=GOOGLE_API_KEY, task_type=task_type)
+    # timed inside the cache, so only calls that reach the API are measured
+    embedder = TimedEmbeddings(inner)
+    if not EMBEDDING_CACHE_ENABLED:
+        return embedder
+    return CachedEmbeddings(embedder, model=model, task_type=task_type,
+                            store=_get_embedding_store(), memory_size=EMBEDDING_CACHE_MEMORY_SIZE)
+
+def _build_embedder():
+    return make_gemini_embedder()
+
+register_resource("embedder", _build_embedder)
+
+def get_gemini_embedder():
+    return get_resource("embedder")
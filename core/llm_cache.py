@@ -0,0 +1,70 @@
+import hashlib
+import json
+import threading
+from typing import Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from core.cache_store import DiskCache
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(namespace: str, hit: bool) -> None:
+    with _stats_lock:
+        counts = _stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+
+def llm_cache_stats() -> dict:
+    """
+    Hit/miss counts and hit rate per agent namespace.
+    """
+    with _stats_lock:
+        return {
+            namespace: {**counts, "hit_rate": round(counts["hits"] / max(counts["hits"] + counts["misses"], 1), 4)}
+            for namespace, counts in _stats.items()
+        }
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache over a shared DiskCache. The key covers the model
+    parameters (llm_string, including any bound structured-output schema)
+    and the prompt; `namespace` only labels the hit/miss counters.
+    """
+
+    def __init__(self, store: DiskCache, namespace: str):
+        self.store = store
+        self.namespace = namespace
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        raw = self.store.get(self._key(prompt, llm_string))
+        if raw is None:
+            _record(self.namespace, hit=False)
+            return None
+        try:
+            generations = [loads(g) for g in json.loads(raw)]
+        except Exception:
+            _record(self.namespace, hit=False)
+            return None
+        _record(self.namespace, hit=True)
+        # lets metrics tell replayed responses (and their token usage) from real calls
+        for generation in generations:
+            if hasattr(generation, "message"):
+                generation.message.response_metadata["cache_hit"] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        payload = json.dumps([dumps(g) for g in return_val])
+        self.store.set(self._key(prompt, llm_string), payload.encode("utf-8"))
+
+    def clear(self, **kwargs) -> None:
+        self.store.clear()
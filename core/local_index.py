@@ -0,0 +1,107 @@
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+
+def write_local_index(path: str, texts: List[str], metadatas: List[dict], vectors, ids: Optional[List[str]] = None):
+    """
+    Write chunk embeddings as a row-normalised float32 matrix plus a JSON metadata sidecar.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = matrix / norms
+
+    os.makedirs(path, exist_ok=True)
+    tmp_matrix = os.path.join(path, f"{EMBEDDINGS_FILE}.tmp")
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, matrix)
+    tmp_meta = os.path.join(path, f"{METADATA_FILE}.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump({
+            "ids": ids or [str(i) for i in range(len(texts))],
+            "texts": texts,
+            "metadatas": metadatas,
+        }, f)
+    os.replace(tmp_matrix, os.path.join(path, EMBEDDINGS_FILE))
+    os.replace(tmp_meta, os.path.join(path, METADATA_FILE))
+
+
+class LocalVectorIndex:
+    """
+    In-process cosine index over a memory-mapped embedding matrix.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.matrix = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        with open(os.path.join(path, METADATA_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids = meta["ids"]
+        self.texts = meta["texts"]
+        self.metadatas = meta["metadatas"]
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _mask(self, key: str, value) -> np.ndarray:
+        if (key, value) not in self._masks:
+            self._masks[(key, value)] = np.fromiter(
+                (m.get(key) == value for m in self.metadatas), dtype=bool, count=len(self.metadatas)
+            )
+        return self._masks[(key, value)]
+
+    def search(self, query_vector, k: int = 4, filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Top-k (Document, cosine score) pairs, optionally restricted by metadata equality.
+        """
+        if not len(self):
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = self.matrix @ q
+
+        if filter:
+            mask = np.ones(len(self), dtype=bool)
+            for key, value in filter.items():
+                mask &= self._mask(key, value)
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(mask.sum()))
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(page_content=self.texts[i], metadata=self.metadatas[i]), float(scores[i]))
+            for i in top
+        ]
+
+
+class LocalRetriever(BaseRetriever):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: LocalVectorIndex
+    embeddings: Embeddings
+    k: int = 4
+    filter: Optional[dict] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+        return [doc for doc, _ in self.index.search(vector, k=self.k, filter=self.filter)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        vector = await self.embeddings.aembed_query(query)
+        return [doc for doc, _ in self.index.search(vector, k=self.k, filter=self.filter)]
@@ -0,0 +1,238 @@
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.tracers.context import register_configure_hook
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from core.config import VECTOR_BACKEND
+from core.gemini_client import gemini_client_stats
+
+# seconds; graph nodes and LLM calls span milliseconds (cache hits) to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+PAYLOAD_BUCKETS = (10_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000)
+
+NODE_LATENCY = Histogram("loan_node_latency_seconds", "Graph node latency", ["node"], buckets=LATENCY_BUCKETS)
+AGENT_LATENCY = Histogram("loan_agent_latency_seconds", "Agent latency", ["agent"], buckets=LATENCY_BUCKETS)
+LLM_LATENCY = Histogram("loan_llm_latency_seconds", "LLM call latency", ["agent", "model", "cache"],
+                        buckets=LATENCY_BUCKETS)
+LLM_ERRORS = Counter("loan_llm_errors_total", "Failed LLM calls", ["agent", "model"])
+LLM_TOKENS = Counter("loan_llm_tokens_total", "Tokens used by LLM calls (cache hits excluded)",
+                     ["agent", "direction"])
+EMBEDDING_LATENCY = Histogram("loan_embedding_latency_seconds", "Embedding call latency", ["operation"],
+                              buckets=LATENCY_BUCKETS)
+EMBEDDING_TEXTS = Counter("loan_embedding_texts_total", "Texts sent to the embedding model", ["operation"])
+VECTOR_STORE_LATENCY = Histogram("loan_vector_store_latency_seconds", "Policy retrieval latency",
+                                 ["backend", "retriever"], buckets=LATENCY_BUCKETS)
+REQUEST_PAYLOAD = Histogram("loan_request_payload_bytes", "Uploaded bytes per request", ["endpoint"],
+                            buckets=PAYLOAD_BUCKETS)
+
+# agent the current call stack belongs to; LLM calls and tokens are attributed to it
+_current_agent: ContextVar[str] = ContextVar("loan_current_agent", default="unattributed")
+
+
+def instrument_agent(name: str):
+    """
+    Record the latency of an agent function (sync or async) and attribute
+    the LLM calls made inside it to `name`.
+    """
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def arun(*args, **kwargs):
+                token = _current_agent.set(name)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    AGENT_LATENCY.labels(name).observe(time.perf_counter() - start)
+                    _current_agent.reset(token)
+            return arun
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            token = _current_agent.set(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                AGENT_LATENCY.labels(name).observe(time.perf_counter() - start)
+                _current_agent.reset(token)
+        return run
+
+    return decorate
+
+
+def _usage(response) -> tuple:
+    """
+    (input, output) tokens of an LLMResult, or None for responses served from
+    the LLM cache, which cost nothing.
+    """
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is None:
+                continue
+            if message.response_metadata.get("cache_hit"):
+                return None
+            usage = getattr(message, "usage_metadata", None) or {}
+            input_tokens += usage.get("input_tokens", 0)
+            output_tokens += usage.get("output_tokens", 0)
+    return input_tokens, output_tokens
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Observes every LangChain/LangGraph run in the process: graph nodes,
+    chat model calls and retrievers. Attached globally (see below), so
+    callers do not need to pass it in their run config.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._runs = {}
+
+    def _start(self, run_id, *labels) -> None:
+        self._runs[run_id] = (time.perf_counter(), labels)
+
+    def _stop(self, run_id):
+        started = self._runs.pop(run_id, None)
+        if started is None:
+            return None, None
+        start, labels = started
+        return time.perf_counter() - start, labels
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, name=None,
+                       **kwargs):
+        # node runs carry their own name as langgraph_node; the runnable a node wraps
+        # repeats that name one level down and is not counted again
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and node == name and self._runs.get(parent_run_id, (None, ()))[1] != (node,):
+            self._start(run_id, node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        seconds, labels = self._stop(run_id)
+        if seconds is not None:
+            NODE_LATENCY.labels(*labels).observe(seconds)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.on_chain_end(None, run_id=run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, _current_agent.get(), (metadata or {}).get("ls_model_name", "unknown"))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, metadata=metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        seconds, labels = self._stop(run_id)
+        if seconds is None:
+            return
+        agent, model = labels
+        usage = _usage(response)
+        LLM_LATENCY.labels(agent, model, "miss" if usage is not None else "hit").observe(seconds)
+        if usage is not None:
+            LLM_TOKENS.labels(agent, "input").inc(usage[0])
+            LLM_TOKENS.labels(agent, "output").inc(usage[1])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        _, labels = self._stop(run_id)
+        if labels is not None:
+            LLM_ERRORS.labels(*labels).inc()
+
+    def on_retriever_start(self, serialized, query, *, run_id, name=None, **kwargs):
+        # hybrid retrieval shows up as the fused run plus one run per side
+        self._start(run_id, VECTOR_BACKEND, name or "retriever")
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        seconds, labels = self._stop(run_id)
+        if seconds is not None:
+            VECTOR_STORE_LATENCY.labels(*labels).observe(seconds)
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self.on_retriever_end(None, run_id=run_id)
+
+
+METRICS_HANDLER = MetricsCallbackHandler()
+# a context variable whose default is the handler makes LangChain add it to every run
+_metrics_handler_var: ContextVar[Optional[MetricsCallbackHandler]] = ContextVar(
+    "loan_metrics_handler", default=METRICS_HANDLER
+)
+register_configure_hook(_metrics_handler_var, True)
+
+
+class TimedEmbeddings(Embeddings):
+    """
+    Records the latency of the wrapped embedder's calls.
+    """
+
+    def __init__(self, embedder: Embeddings):
+        self.embedder = embedder
+
+    def _observe(self, operation: str, count: int, start: float) -> None:
+        EMBEDDING_LATENCY.labels(operation).observe(time.perf_counter() - start)
+        EMBEDDING_TEXTS.labels(operation).inc(count)
+
+    def embed_documents(self, texts):
+        start = time.perf_counter()
+        vectors = self.embedder.embed_documents(texts)
+        self._observe("documents", len(texts), start)
+        return vectors
+
+    def embed_query(self, text):
+        start = time.perf_counter()
+        vector = self.embedder.embed_query(text)
+        self._observe("query", 1, start)
+        return vector
+
+    async def aembed_documents(self, texts):
+        start = time.perf_counter()
+        vectors = await self.embedder.aembed_documents(texts)
+        self._observe("documents", len(texts), start)
+        return vectors
+
+    async def aembed_query(self, text):
+        start = time.perf_counter()
+        vector = await self.embedder.aembed_query(text)
+        self._observe("query", 1, start)
+        return vector
+
+
+class GeminiClientCollector:
+    """
+    Exposes the shared Gemini client's limiter, retry and hedging counters.
+    """
+
+    _COUNTERS = ("requests", "failures", "retries", "quota_errors", "limiter_waits", "hedges", "hedge_wins")
+
+    def collect(self):
+        stats = gemini_client_stats()
+        for name in self._COUNTERS:
+            yield CounterMetricFamily(f"loan_gemini_{name}", f"Gemini client {name.replace('_', ' ')}",
+                                      value=stats[name])
+        yield CounterMetricFamily("loan_gemini_limiter_wait_seconds", "Time spent waiting on the rate limiter",
+                                  value=stats["limiter_wait_seconds"])
+        if stats["hedge_delay"] is not None:
+            yield GaugeMetricFamily("loan_gemini_hedge_delay_seconds", "Current hedging threshold",
+                                    value=stats["hedge_delay"])
+
+
+REGISTRY.register(GeminiClientCollector())
+
+
+def observe_payload(endpoint: str, size: int) -> None:
+    REQUEST_PAYLOAD.labels(endpoint).observe(size)
+
+
+def render_metrics() -> tuple:
+    """
+    (body, content type) in the Prometheus text exposition format.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
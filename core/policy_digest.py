@@ -0,0 +1,170 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from core.config import POLICY_DIR, POLICY_RULES_DIR, CACHE_DIR
+from core.llm import get_gemini_llm
+from core.metrics import instrument_agent
+from core.rag import RetrievalContext
+from core.resources import register_warmup
+from agents.schemas import PolicyDigestSchema
+
+LOAN_TYPES = ("home", "personal", "car")
+POLICY_EXTENSIONS = (".pdf", ".txt", ".md")
+RULE_EXTENSIONS = (".yaml", ".yml")
+DIGEST_PATH = os.path.join(CACHE_DIR, "policy_digest.json")
+
+# _lock guards _store; builds are serialised per loan type by _build_locks
+_lock = threading.Lock()
+_build_locks = {}
+_fingerprint_cache = {"stats": None, "fingerprint": None}
+_store = {"fingerprint": None, "digests": {}}
+
+
+def _files(folder: str, extensions: tuple) -> list:
+    folder = Path(folder)
+    if not folder.is_dir():
+        return []
+    return sorted(p for p in folder.iterdir() if p.suffix.lower() in extensions)
+
+
+def _policy_files() -> list:
+    # the eligibility rules decide as much as the policy text does
+    return _files(POLICY_DIR, POLICY_EXTENSIONS) + _files(POLICY_RULES_DIR, RULE_EXTENSIONS)
+
+
+def policy_fingerprint() -> str:
+    """
+    Content hash of every file in the policy folder and the rules folder.
+    File contents are only re-hashed when a file's size or mtime changes.
+    """
+    files = _policy_files()
+    stats = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in files)
+    if stats != _fingerprint_cache["stats"]:
+        h = hashlib.sha256()
+        for p in files:
+            h.update(f"{p.parent.name}/{p.name}".encode())
+            h.update(p.read_bytes())
+        _fingerprint_cache["stats"] = stats
+        _fingerprint_cache["fingerprint"] = h.hexdigest()
+    return _fingerprint_cache["fingerprint"]
+
+
+@instrument_agent("policy_digest")
+def _build_digest(loan_type: str) -> dict:
+    llm = get_gemini_llm(cache_namespace="policy_digest")
+    # one retrieval and one policy answer feed both the interest rate and the summary
+    context = RetrievalContext(llm, loan_type=loan_type)
+
+    rag_query = f'''
+    You are a loan application expert
+
+    Summarise the {loan_type} loan policy for a loan officer: who it is for, the interest rate, fees, and any conditions or exceptions.
+
+    Instructions:
+    - Give the interest rate as a number in percent.
+'''.strip()
+
+    policy_answer = context.answer(rag_query)
+
+    llm_query = f'''
+    You are a loan application expert
+
+    Extract the annual interest_rate in percent from below policy:
+    {policy_answer}
+
+    Instructions:
+    - When the policy gives a range, use the lower bound.
+    - Always ignore special characters in output.
+
+    Example output:
+    {{'interest_rate': float}}
+'''.strip()
+
+    # CIBIL, DTI, income and tenure thresholds come from the rule files, not the LLM
+    structured = llm.with_structured_output(PolicyDigestSchema)
+    thresholds = structured.invoke(llm_query).model_dump()
+
+    return {
+        "loan_type": loan_type,
+        "thresholds": thresholds,
+        "policy_summary": policy_answer,
+        "sources": context.sources,
+    }
+
+
+def _load_store(fingerprint: str) -> dict:
+    try:
+        with open(DIGEST_PATH, encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    if stored.get("fingerprint") != fingerprint:
+        return {"fingerprint": fingerprint, "digests": {}}
+    return stored
+
+
+def _save_store(store: dict) -> None:
+    os.makedirs(os.path.dirname(DIGEST_PATH) or ".", exist_ok=True)
+    tmp_path = f"{DIGEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2)
+    os.replace(tmp_path, DIGEST_PATH)
+
+
+def _cached_digest(loan_type: str, fingerprint: str):
+    global _store
+    with _lock:
+        if _store["fingerprint"] != fingerprint:
+            _store = _load_store(fingerprint)
+        return _store["digests"].get(loan_type)
+
+
+def _build_lock(loan_type: str) -> threading.Lock:
+    with _lock:
+        return _build_locks.setdefault(loan_type, threading.Lock())
+
+
+def get_policy_digest(loan_type: str) -> dict:
+    """
+    Thresholds, policy summary and sources for a loan type.
+    Served from memory, then from the on-disk store, and only built with
+    RAG + LLM when the policy files changed since the last build.
+    """
+    fingerprint = policy_fingerprint()
+    digest = _cached_digest(loan_type, fingerprint)
+    if digest is None:
+        # one build per loan type at a time; other loan types and cache hits are not held up
+        with _build_lock(loan_type):
+            digest = _cached_digest(loan_type, fingerprint)
+            if digest is None:
+                digest = _build_digest(loan_type)
+                with _lock:
+                    if _store["fingerprint"] == fingerprint:
+                        _store["digests"][loan_type] = digest
+                        _save_store(_store)
+    return copy.deepcopy(digest)
+
+
+async def aget_policy_digest(loan_type: str) -> dict:
+    # Hot path answers from memory; builds and disk reloads go to a worker thread
+    digest = _store["digests"].get(loan_type)
+    if digest is not None and _store["fingerprint"] == policy_fingerprint():
+        return copy.deepcopy(digest)
+    return await asyncio.to_thread(get_policy_digest, loan_type)
+
+
+def build_policy_digests(loan_types=LOAN_TYPES) -> dict:
+    return {loan_type: get_policy_digest(loan_type) for loan_type in loan_types}
+
+
+register_warmup("policy_digests", build_policy_digests)
+
+
+if __name__ == "__main__":
+    for loan_type, digest in build_policy_digests().items():
+        print(loan_type, json.dumps(digest["thresholds"]))
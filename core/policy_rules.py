@@ -0,0 +1,187 @@
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import yaml
+
+from core.config import POLICY_RULES_DIR
+
+# Eligibility rules are data, not prompts: each loan type has a YAML file in
+# POLICY_RULES_DIR (CIBIL floor, DTI cap, income floor, tenure bounds and the
+# loan cap), compiled once into arrays so one applicant or a whole batch is
+# checked with the same vectorised code.
+
+# checks in the order their reasons are reported
+CHECKS = ("cibil", "dti", "asset", "income", "tenure")
+
+_lock = threading.Lock()
+_compiled = {}
+
+
+def _require(spec: dict, path: str, source: str):
+    value = spec
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            raise ValueError(f"{source}: missing '{path}'")
+        value = value[key]
+    return value
+
+
+class PolicyRules:
+    """
+    Compiled eligibility rules for one loan type.
+    """
+
+    def __init__(self, spec: dict, source: str = "<rules>"):
+        self.source = source
+        self.loan_type = _require(spec, "loan_type", source)
+        self.min_cibil = int(_require(spec, "cibil.min", source))
+        self.max_dti = float(_require(spec, "dti.max", source))
+        self.min_income = float(_require(spec, "income.min_monthly", source))
+        self.income_label = str(spec["income"].get("label", f"INR {self.min_income:,.0f} per month"))
+        self.min_tenure = int(_require(spec, "tenure.min_months", source))
+        self.max_tenure = int(_require(spec, "tenure.max_months", source))
+        if self.min_tenure > self.max_tenure:
+            raise ValueError(f"{source}: tenure.min_months > tenure.max_months")
+
+        cap = _require(spec, "loan_cap", source)
+        self.asset = cap.get("asset")
+        if self.asset:
+            tiers = _require(spec, "loan_cap.ltv_tiers", source)
+            uppers = [float(t.get("up_to", np.inf)) for t in tiers]
+            if not tiers or uppers[-1] != np.inf or any(a >= b for a, b in zip(uppers, uppers[1:])):
+                raise ValueError(f"{source}: ltv_tiers must ascend by 'up_to' and end with an unbounded tier")
+            self.tier_upper = np.array(uppers)
+            self.tier_lower = np.concatenate(([0.0], self.tier_upper[:-1]))
+            self.tier_ratio = np.array([float(t["ratio"]) for t in tiers])
+            self.income_ratio = None
+        else:
+            self.income_ratio = float(_require(spec, "loan_cap.annual_income_ratio", source))
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyRules":
+        with open(path, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f) or {}, source=path)
+
+    def thresholds(self) -> dict:
+        """
+        The rule values under the policy digest's threshold names.
+        """
+        thresholds = {
+            "min_cibil": self.min_cibil,
+            "max_dti": self.max_dti,
+            "min_income_monthly": self.min_income,
+            "income_threshold": self.income_label,
+            "min_tenure": self.min_tenure,
+            "max_tenure": self.max_tenure,
+        }
+        if self.asset:
+            thresholds["ltv_tiers"] = [
+                {"up_to": None if np.isinf(u) else float(u), "ratio": float(r)}
+                for u, r in zip(self.tier_upper, self.tier_ratio)
+            ]
+        return thresholds
+
+    def max_loan(self, income_monthly, asset_value=None) -> np.ndarray:
+        """
+        Loan cap per applicant. With LTV tiers, each tier allows
+        min(value * ratio, tier upper bound) when that exceeds the tier's lower
+        bound, and the best tier wins.
+        """
+        if not self.asset:
+            return np.asarray(income_monthly, dtype=float) * 12 * self.income_ratio
+        value = np.atleast_1d(np.asarray(asset_value, dtype=float))[:, None]
+        financed = value * self.tier_ratio
+        allowed = np.where(financed > self.tier_lower, np.minimum(financed, self.tier_upper), 0.0)
+        return allowed.max(axis=1).reshape(np.shape(asset_value))
+
+    def evaluate_batch(self, income_monthly, cibil_score, monthly_debt, asset_value=None,
+                       tenure_months=None) -> dict:
+        """
+        Check many applicants in one pass. Inputs are arrays of shape (A,) or
+        scalars; NaN tenures are not checked. Returns per-applicant `eligible`,
+        `dti` and `max_loan` (0 when ineligible) and `failed`, a (A, len(CHECKS))
+        boolean matrix of the checks each applicant failed.
+        """
+        income, cibil, debt = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (income_monthly, cibil_score, monthly_debt))
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dti = np.where(income > 0, debt / income * 100, 100.0)
+
+        failed = np.zeros((len(income), len(CHECKS)), dtype=bool)
+        failed[:, 0] = cibil < self.min_cibil
+        failed[:, 1] = dti > self.max_dti
+        if self.asset:
+            value = np.broadcast_to(np.asarray(0.0 if asset_value is None else asset_value, dtype=float),
+                                    income.shape)
+            failed[:, 2] = ~(value > 0)
+            cap = self.max_loan(income, value)
+        else:
+            cap = self.max_loan(income)
+        failed[:, 3] = income < self.min_income
+        if tenure_months is not None:
+            tenure = np.broadcast_to(np.asarray(tenure_months, dtype=float), income.shape)
+            failed[:, 4] = (tenure < self.min_tenure) | (tenure > self.max_tenure)
+
+        eligible = ~failed.any(axis=1)
+        return {
+            "eligible": eligible,
+            "dti": dti,
+            "max_loan": np.where(eligible, cap, 0.0),
+            "failed": failed,
+        }
+
+    def _reason(self, check: str, income: float, cibil: int, dti: float, tenure) -> str:
+        if check == "cibil":
+            return f"CIBIL {cibil} < required minimum {self.min_cibil}"
+        if check == "dti":
+            return f"DTI {dti:.1f}% > allowed {self.max_dti}%"
+        if check == "asset":
+            return f"No {self.asset} value provided"
+        if check == "income":
+            return f"Monthly income {income:.0f} < required minimum {self.min_income:.0f} ({self.income_label})"
+        return f"Tenure {tenure:.0f} months outside {self.min_tenure}-{self.max_tenure} months"
+
+    def evaluate(self, income_monthly: float, cibil_score: int, monthly_debt: float = 0.0,
+                 asset_value: Optional[float] = None, tenure_months: Optional[float] = None) -> dict:
+        """
+        Decision for one applicant: eligible, the reason for every failed check,
+        DTI (percent) and the maximum loan.
+        """
+        batch = self.evaluate_batch(income_monthly, cibil_score, monthly_debt, asset_value, tenure_months)
+        dti = float(batch["dti"][0])
+        reasons = [
+            self._reason(check, income_monthly, cibil_score, dti, tenure_months)
+            for check, failed in zip(CHECKS, batch["failed"][0]) if failed
+        ]
+        return {
+            "eligible": bool(batch["eligible"][0]),
+            "reasons": reasons,
+            "DTI": round(dti, 2),
+            "max_loan": float(batch["max_loan"][0]),
+        }
+
+
+def rules_path(loan_type: str) -> str:
+    return os.path.join(POLICY_RULES_DIR, f"{loan_type}.yaml")
+
+
+def get_policy_rules(loan_type: str) -> PolicyRules:
+    """
+    Compiled rules for a loan type; recompiled when its YAML file changes.
+    """
+    path = rules_path(loan_type)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise ValueError(f"no eligibility rules for loan type {loan_type!r} ({path})") from None
+    cached = _compiled.get(path)
+    if cached is None or cached[0] != mtime:
+        with _lock:
+            cached = _compiled.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, PolicyRules.load(path))
+                _compiled[path] = cached
+    return cached[1]
@@ -0,0 +1,135 @@
+import io
+import logging
+import math
+import re
+from base64 import b64encode
+
+from core.uploads import open_document, document_size
+from core.config import (
+    PREPROCESS_IMAGE_MAX_SIDE,
+    PREPROCESS_JPEG_QUALITY,
+    PREPROCESS_MIN_PDF_TEXT_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png")
+# Gemini bills ~258 tokens per PDF page and per 768x768 image tile; text is ~4 chars/token
+TOKENS_PER_TILE = 258
+CHARS_PER_TOKEN = 4
+_DIGITS = re.compile(r"\d")
+_DROP = object()
+
+
+def _ext(filename: str) -> str:
+    return filename.lower().split('.')[-1]
+
+
+def _image_tokens(width: int, height: int) -> int:
+    if width <= 384 and height <= 384:
+        return TOKENS_PER_TILE
+    return math.ceil(width / 768) * math.ceil(height / 768) * TOKENS_PER_TILE
+
+
+def extract_pdf_pages(document) -> list:
+    """
+    Text layer of every page ('' for pages without one), or [] when unreadable.
+    """
+    try:
+        from pypdf import PdfReader
+
+        reader = PdfReader(open_document(document))
+        return [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        logger.warning("pdf text extraction failed: %s", e)
+        return []
+
+
+def _preprocess_pdf(document, filename: str, size: int):
+    pages = extract_pdf_pages(document)
+    tokens_before = max(len(pages), 1) * TOKENS_PER_TILE
+    # blank pages and pages without a single figure cannot carry income, score or value
+    kept = [p.strip() for p in pages if p.strip() and _DIGITS.search(p)]
+    text = "\n\n".join(kept)
+    if len(text) < PREPROCESS_MIN_PDF_TEXT_CHARS:
+        return None, tokens_before, tokens_before
+
+    part = {"type": "text", "text": f"Document '{filename}' (text layer, {len(kept)}/{len(pages)} pages):\n{text}"}
+    return part, tokens_before, math.ceil(len(part["text"]) / CHARS_PER_TOKEN)
+
+
+def _preprocess_image(document, filename: str, size: int):
+    from PIL import Image, ImageStat
+
+    image = Image.open(open_document(document))
+    tokens_before = _image_tokens(*image.size)
+    image = image.convert("RGB")
+    # near-uniform images (blank scans) carry nothing to extract
+    if max(ImageStat.Stat(image.convert("L")).stddev) < 2.0:
+        return _DROP, tokens_before, 0
+
+    image.thumbnail((PREPROCESS_IMAGE_MAX_SIDE, PREPROCESS_IMAGE_MAX_SIDE))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=PREPROCESS_JPEG_QUALITY, optimize=True)
+    data = out.getvalue()
+    if len(data) >= size:
+        return None, tokens_before, tokens_before
+
+    part = {
+        "type": "image",
+        "source_type": "base64",
+        "mime_type": "image/jpeg",
+        "data": b64encode(data).decode(),
+    }
+    return part, tokens_before, _image_tokens(*image.size)
+
+
+def preprocess_document(document, filename: str):
+    """
+    Shrink one upload before it is sent to Gemini: PDFs with a text layer are
+    replaced by their text, images are downscaled and recompressed, blank
+    content is dropped. `document` is raw bytes or a seekable binary file.
+    Returns (message part or None, stats); the part is
+    None when stats["mode"] is "dropped" or "original" (send the file as is).
+    """
+    ext = _ext(filename)
+    size = document_size(document)
+    part, tokens_before, tokens_after = None, 0, 0
+    try:
+        if ext == "pdf":
+            part, tokens_before, tokens_after = _preprocess_pdf(document, filename, size)
+        elif ext in IMAGE_EXTENSIONS:
+            part, tokens_before, tokens_after = _preprocess_image(document, filename, size)
+    except Exception as e:
+        logger.warning("preprocessing %s failed, sending original: %s", filename, e)
+        part, tokens_after = None, tokens_before
+
+    if part is _DROP:
+        part, sent_bytes, mode = None, 0, "dropped"
+    elif part is None:
+        sent_bytes, mode = size, "original"
+    elif part["type"] == "text":
+        sent_bytes, mode = len(part["text"].encode()), "text"
+    else:
+        sent_bytes, mode = len(part["data"]) * 3 // 4, "downscaled"
+
+    stats = {
+        "filename": filename,
+        "mode": mode,
+        "original_bytes": size,
+        "sent_bytes": sent_bytes,
+        "estimated_tokens_saved": max(tokens_before - tokens_after, 0),
+    }
+    return part, stats
+
+
+def summarise_stats(stats: list) -> dict:
+    original = sum(s["original_bytes"] for s in stats)
+    sent = sum(s["sent_bytes"] for s in stats)
+    return {
+        "documents": stats,
+        "original_bytes": original,
+        "sent_bytes": sent,
+        "bytes_saved": original - sent,
+        "estimated_tokens_saved": sum(s["estimated_tokens_saved"] for s in stats),
+    }
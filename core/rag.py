@@ -1,28 +1,202 @@
+import asyncio
 import os
-from pinecone import Pinecone, ServerlessSpec
-from langchain_pinecone import PineconeVectorStore
+from typing import List
 from langchain.chains import RetrievalQA
+from langchain.chains.question_answering import load_qa_chain
 from core.llm import get_gemini_embedder
-from core.config import PINECONE_API_KEY, PINECONE_ENV
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from core.config import (
+    PINECONE_API_KEY,
+    PINECONE_ENV,
+    VECTOR_BACKEND,
+    LOCAL_INDEX_DIR,
+    POLICY_DIR,
+    RETRIEVAL_MODE,
+    LEXICAL_INDEX_DIR,
+    HYBRID_CANDIDATES,
+    RRF_K,
+)
+from core.lexical_index import LexicalIndex, LexicalRetriever, load_lexical_index
+from core.resources import register_resource, get_resource
 
-pc = Pinecone(api_key=PINECONE_API_KEY)
 INDEX_NAME = os.getenv("PINECONE_INDEX", "loan-policy-index")
-if INDEX_NAME not in pc.list_indexes().names():
-    pc.create_index(name=INDEX_NAME, dimension=3072, metric="cosine",
-                    spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV))
-index = pc.Index(INDEX_NAME)
 
-embeddings = get_gemini_embedder()
-vector_store = PineconeVectorStore(index=index, embedding=embeddings, text_key="text")
 
-def run_rag_query(llm, query: str):
-    qa = RetrievalQA.from_chain_type(
+def _build_vector_store():
+    if VECTOR_BACKEND == "fake":
+        from core.fakes import FakeVectorIndex
+
+        return FakeVectorIndex.from_folder(POLICY_DIR, get_gemini_embedder())
+    if VECTOR_BACKEND == "local":
+        from core.local_index import LocalVectorIndex
+
+        return LocalVectorIndex(LOCAL_INDEX_DIR)
+
+    from pinecone import Pinecone, ServerlessSpec
+    from langchain_pinecone import PineconeVectorStore
+
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    if INDEX_NAME not in pc.list_indexes().names():
+        pc.create_index(name=INDEX_NAME, dimension=3072, metric="cosine",
+                        spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV))
+    index = pc.Index(INDEX_NAME)
+    return PineconeVectorStore(index=index, embedding=get_gemini_embedder(), text_key="text")
+
+
+register_resource("vector_store", _build_vector_store)
+
+
+def get_vector_store():
+    return get_resource("vector_store")
+
+
+def _build_lexical_index():
+    if VECTOR_BACKEND == "fake":
+        # the fake store is built from the policy folder at startup; index the same chunks
+        store = get_vector_store()
+        return LexicalIndex(store.texts, store.metadatas, store.ids)
+    return load_lexical_index(LEXICAL_INDEX_DIR)
+
+
+register_resource("lexical_index", _build_lexical_index)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = RRF_K) -> List[Document]:
+    """
+    Merge ranked lists by summing 1 / (k + rank); chunks are matched by content.
+    """
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense and BM25 retrieval, fused by reciprocal rank. Each side returns
+    `candidates` chunks; the fused list is cut to `k`.
+    """
+
+    dense: BaseRetriever
+    lexical: BaseRetriever
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        config = {"callbacks": run_manager.get_child()}
+        rankings = [self.lexical.invoke(query, config), self.dense.invoke(query, config)]
+        return reciprocal_rank_fusion(rankings)[:self.k]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        config = {"callbacks": run_manager.get_child()}
+        rankings = await asyncio.gather(self.lexical.ainvoke(query, config), self.dense.ainvoke(query, config))
+        return reciprocal_rank_fusion(list(rankings))[:self.k]
+
+
+def get_retriever(k: int = 4, loan_type: str = None, mode: str = None):
+    """
+    Policy retriever for `mode` (default RETRIEVAL_MODE): "dense", "lexical"
+    (BM25 only, no embedding call) or "hybrid".
+    """
+    mode = mode or RETRIEVAL_MODE
+    metadata_filter = {"loan_type": loan_type} if loan_type else None
+    if mode == "lexical":
+        return LexicalRetriever(index=get_resource("lexical_index"), k=k, filter=metadata_filter)
+    if mode == "hybrid":
+        candidates = max(k, HYBRID_CANDIDATES)
+        return HybridRetriever(
+            dense=_dense_retriever(candidates, metadata_filter),
+            lexical=LexicalRetriever(index=get_resource("lexical_index"), k=candidates, filter=metadata_filter),
+            k=k,
+        )
+    return _dense_retriever(k, metadata_filter)
+
+
+def _dense_retriever(k: int, metadata_filter: dict = None):
+    vector_store = get_vector_store()
+    if VECTOR_BACKEND == "fake":
+        from core.fakes import FakeRetriever
+
+        return FakeRetriever(index=vector_store, embeddings=get_gemini_embedder(), k=k, filter=metadata_filter)
+    if VECTOR_BACKEND == "local":
+        from core.local_index import LocalRetriever
+
+        return LocalRetriever(index=vector_store, embeddings=get_gemini_embedder(), k=k, filter=metadata_filter)
+    search_kwargs = {"k": k}
+    if metadata_filter:
+        search_kwargs["filter"] = metadata_filter
+    return vector_store.as_retriever(search_kwargs=search_kwargs)
+
+
+def _qa_chain(llm, loan_type: str = None):
+    return RetrievalQA.from_chain_type(
         llm=llm, chain_type="stuff",
-        retriever=vector_store.as_retriever(search_kwargs={"k": 4}),
+        retriever=get_retriever(k=4, loan_type=loan_type),
         return_source_documents=True
     )
-    res = qa.invoke({"query": query})
+
+
+def _format_result(res: dict) -> dict:
     return {
         "answer": res["result"],
         "sources": [{"text": d.page_content, "metadata": d.metadata} for d in res["source_documents"]]
     }
+
+
+def run_rag_query(llm, query: str, loan_type: str = None):
+    res = _qa_chain(llm, loan_type).invoke({"query": query})
+    return _format_result(res)
+
+
+async def arun_rag_query(llm, query: str, loan_type: str = None):
+    res = await _qa_chain(llm, loan_type).ainvoke({"query": query})
+    return _format_result(res)
+
+
+class RetrievalContext:
+    """
+    Per-request retrieval state. Policy chunks are retrieved at most once
+    (one embedding + one vector query) and each question is answered at most
+    once from those chunks, however many callers ask.
+    """
+
+    def __init__(self, llm, loan_type: str = None, k: int = 4):
+        self.llm = llm
+        self.loan_type = loan_type
+        self.k = k
+        self.chunks = None
+        self.answers = {}
+
+    def _answer_chain(self):
+        return load_qa_chain(self.llm, chain_type="stuff")
+
+    def documents(self, query: str):
+        if self.chunks is None:
+            self.chunks = get_retriever(k=self.k, loan_type=self.loan_type).invoke(query)
+        return self.chunks
+
+    async def adocuments(self, query: str):
+        if self.chunks is None:
+            self.chunks = await get_retriever(k=self.k, loan_type=self.loan_type).ainvoke(query)
+        return self.chunks
+
+    def answer(self, query: str) -> str:
+        if query not in self.answers:
+            res = self._answer_chain().invoke({"input_documents": self.documents(query), "question": query})
+            self.answers[query] = res["output_text"]
+        return self.answers[query]
+
+    async def aanswer(self, query: str) -> str:
+        if query not in self.answers:
+            docs = await self.adocuments(query)
+            res = await self._answer_chain().ainvoke({"input_documents": docs, "question": query})
+            self.answers[query] = res["output_text"]
+        return self.answers[query]
+
+    @property
+    def sources(self) -> list:
+        return [{"text": d.page_content, "metadata": d.metadata} for d in self.chunks or []]
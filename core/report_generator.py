@@ -1,67 +1,60 @@
-def generate_markdown_report(applicant_name: str, decision: dict) -> str:
-    """
-    Generates a customer-friendly markdown loan approval report.
-    """
+import os
+import re
 
-    md = f"""
-# 🏦 Loan Report
+import markdown
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-**Applicant:** {applicant_name}  
-**Loan Type:** {decision.get('loan_type', 'N/A')}  
-"""
-    if decision['eligible']:
-        md += """**Status:** Approved"""
-    else:
-        md += """**Status:** Rejected"""
-        
-    md +=f"""
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
-**Summary:** {decision.get('summary', '')}  
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(enabled_extensions=("html.j2",)),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+_env.filters["money"] = lambda value: f"{value or 0:,.2f}"
 
----
+# compiled once at import; rendering only evaluates the template code
+MARKDOWN_TEMPLATE = _env.get_template("report.md.j2")
+HTML_TEMPLATE = _env.get_template("report.html.j2")
 
-"""
-    if not decision['eligible']:
-        md += """## ❌ Loan Rejection Details
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002700-\U000027BF"  # other symbols
+    "\U0001F900-\U0001F9FF"  # supplemental symbols
+    "\U00002600-\U000026FF"  # misc symbols
+    "\U00002B00-\U00002BFF"  # arrows
+    "]+",
+    flags=re.UNICODE
+)
 
-        """
-        for reason in decision.get("reasons", []):
-            md += f"- {reason}\n"
-    else:
-        md += f"""
-## ✅ Loan Details
 
-- **Recommended Loan Amount:** ₹{decision.get('recommended_loan', 0):,.2f}  
-- **Tenure:** {decision["policy_info"]["max_tenure"]} months  
-- **Interest Rate:** {decision.get('applicable_rules', [])[0] if decision.get('applicable_rules') else 'N/A'}  
-- **Recommended EMI:** ₹{decision.get('recommended_emi', 0):,.2f}
-"""
-        if "updated_DTI" in decision.keys():
-             md += f"""- **DTI (Debt-to-Income):** {decision.get('updated_DTI', 0):.2f}%
+def remove_emojis(text: str) -> str:
+    return EMOJI_PATTERN.sub(r'', text)
 
----
 
-"""
-        else:
-             md += f"""- **DTI (Debt-to-Income):** {decision.get('dti_percent', 0):.2f}%  
+def fix_encoding(text: str) -> str:
+    try:
+        return text.encode('latin1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
 
----
 
-"""
-    md += """
-## 📜 Policy Rules Considered
+def generate_markdown_report(applicant_name: str, decision: dict) -> str:
+    """
+    Generates a customer-friendly markdown loan approval report.
+    """
+    return MARKDOWN_TEMPLATE.render(applicant_name=applicant_name, decision=decision)
+
 
-"""
-    for rule in decision.get("applicable_rules", []):
-        md += f"- {rule}\n"
-    if decision['eligible']:
-        md += "\n---\n## 📝 Next Steps\n"
-        for step in decision.get("next_steps", []):
-            md += f"- {step}\n"
-    else:
-        md += """\n---\n## 📝 Recommendation
-        
-        """
-        md += str(decision.get("recommendation",[]))
-    md += "\n---\n**This report is system-generated based on current loan policies.**"
-    return md
\ No newline at end of file
+def generate_html_report(applicant_name: str, decision: dict) -> str:
+    """
+    Printable HTML version of the markdown report, without emojis (PDF fonts lack them).
+    """
+    body = markdown.markdown(generate_markdown_report(applicant_name, decision), extensions=["tables"])
+    return fix_encoding(remove_emojis(HTML_TEMPLATE.render(body=body)))
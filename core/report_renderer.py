@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.cache_store import DiskCache
+from core.config import REPORT_CACHE_PATH, REPORT_CACHE_MAX_ENTRIES, REPORT_RENDER_WORKERS
+from core.resources import register_resource, register_warmup, get_resource
+
+logger = logging.getLogger(__name__)
+
+# bump when the report templates change so cached PDFs are re-rendered
+REPORT_TEMPLATE_VERSION = "1"
+# state that does not appear in the report and must not change its hash
+_IGNORED_KEYS = ("node_timings", "document_stats", "policy_digest", "sources")
+
+_store = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _warm_worker() -> None:
+    # pay the WeasyPrint import and font setup once per worker, not per report
+    try:
+        import weasyprint  # noqa: F401
+    except Exception as e:
+        logger.warning("weasyprint unavailable in renderer worker: %s", e)
+
+
+def _render_pdf(applicant_name: str, decision: dict) -> bytes:
+    from weasyprint import HTML
+    from core.report_generator import generate_html_report
+
+    return HTML(string=generate_html_report(applicant_name, decision)).write_pdf()
+
+
+def _build_pool() -> ProcessPoolExecutor:
+    # long-lived workers; spawn keeps them clear of the parent's threads and sockets
+    return ProcessPoolExecutor(
+        max_workers=REPORT_RENDER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+
+def _start_workers() -> None:
+    get_resource("report_renderer").submit(int).result()
+
+register_resource("report_renderer", _build_pool)
+register_warmup("report_renderer", _start_workers)
+
+
+def _get_store() -> DiskCache:
+    global _store
+    with _lock:
+        if _store is None:
+            _store = DiskCache(REPORT_CACHE_PATH, max_entries=REPORT_CACHE_MAX_ENTRIES)
+        return _store
+
+
+def report_id(applicant_name: str, decision: dict) -> str:
+    """
+    Hash of everything the report shows, plus the template version.
+    """
+    shown = {k: v for k, v in decision.items() if k not in _IGNORED_KEYS}
+    payload = json.dumps([REPORT_TEMPLATE_VERSION, applicant_name, shown], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def submit_report(applicant_name: str, decision: dict) -> str:
+    """
+    Queue the PDF for rendering in the worker pool and return its id at once.
+    Identical decisions share one render and one cached PDF.
+    """
+    rid = report_id(applicant_name, decision)
+    with _lock:
+        if rid in _pending:
+            return rid
+    if _get_store().get(rid) is not None:
+        return rid
+
+    with _lock:
+        if rid in _pending:
+            return rid
+        future = get_resource("report_renderer").submit(_render_pdf, applicant_name, dict(decision))
+        _pending[rid] = future
+    future.add_done_callback(lambda f: _finish(rid, f))
+    return rid
+
+
+def _finish(rid: str, future) -> None:
+    try:
+        _get_store().set(rid, future.result())
+    except Exception as e:
+        logger.error("report %s failed to render: %s", rid, e)
+    finally:
+        with _lock:
+            _pending.pop(rid, None)
+
+
+def pending_report(rid: str):
+    """
+    The in-flight render future for `rid`, or None.
+    """
+    with _lock:
+        return _pending.get(rid)
+
+
+def get_report(rid: str):
+    """
+    The cached PDF bytes, or None when it is still rendering or unknown.
+    """
+    return _get_store().get(rid)
+
+
+def render_report(applicant_name: str, decision: dict, timeout: float = None) -> bytes:
+    """
+    Blocking variant for callers without a fetch endpoint (Streamlit).
+    """
+    rid = submit_report(applicant_name, decision)
+    future = pending_report(rid)
+    if future is not None:
+        return future.result(timeout=timeout)
+    return get_report(rid)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+# Registry of lazily-built external clients (embedder, vector store, ...).
+# Nothing here touches the network until a resource is first requested.
+_factories = {}
+_instances = {}
+_warmups = {}
+_lock = threading.RLock()
+_status = {"ready": False, "warmup_seconds": None, "errors": {}}
+
+
+def register_resource(name: str, factory) -> None:
+    _factories[name] = factory
+
+
+def register_warmup(name: str, fn) -> None:
+    """
+    Register a cache-warming step run by warm_up() after all resources are built.
+    """
+    _warmups[name] = fn
+
+
+def get_resource(name: str):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            if name not in _instances:
+                _instances[name] = _factories[name]()
+            instance = _instances[name]
+    return instance
+
+
+def reset_resources() -> None:
+    with _lock:
+        _instances.clear()
+        _status.update(ready=False, warmup_seconds=None, errors={})
+
+
+def warm_up() -> dict:
+    """
+    Build every registered resource and run the warm-up steps.
+    The process is marked ready only when all of them succeeded.
+    """
+    start = time.perf_counter()
+    errors = {}
+    for name in list(_factories):
+        try:
+            get_resource(name)
+        except Exception as e:
+            errors[name] = repr(e)
+    if not errors:
+        for name, fn in list(_warmups.items()):
+            try:
+                fn()
+            except Exception as e:
+                errors[name] = repr(e)
+    _status.update(
+        ready=not errors,
+        warmup_seconds=round(time.perf_counter() - start, 3),
+        errors=errors,
+    )
+    return readiness()
+
+
+def is_ready() -> bool:
+    return _status["ready"]
+
+
+def readiness() -> dict:
+    return {
+        "ready": _status["ready"],
+        "warmup_seconds": _status["warmup_seconds"],
+        "resources": {name: name in _instances for name in _factories},
+        "errors": dict(_status["errors"]),
+    }
@@ -0,0 +1,82 @@
+import base64
+import io
+import os
+import tempfile
+
+from core.config import UPLOAD_MAX_FILE_BYTES, UPLOAD_MAX_REQUEST_BYTES, UPLOAD_SPOOL_MEMORY_BYTES
+
+READ_CHUNK_SIZE = 1024 * 1024
+# base64 maps 3 input bytes to 4 characters, so 3-aligned chunks concatenate cleanly
+B64_CHUNK_SIZE = 3 * 256 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UploadBudget:
+    """
+    Running byte total across all files of one request.
+    """
+
+    def __init__(self, limit: int = UPLOAD_MAX_REQUEST_BYTES):
+        self.limit = limit
+        self.used = 0
+
+    def consume(self, size: int, filename: str) -> None:
+        self.used += size
+        if self.used > self.limit:
+            raise UploadTooLarge(f"Request exceeds {self.limit} bytes of uploads (at '{filename}')")
+
+
+async def spool_upload(upload, budget: UploadBudget, max_file_bytes: int = UPLOAD_MAX_FILE_BYTES):
+    """
+    Copy an upload chunk by chunk into a spooled temporary file (kept in
+    memory up to UPLOAD_SPOOL_MEMORY_BYTES, on disk beyond), enforcing the
+    per-file and per-request limits as it goes. The caller closes the file.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    size = 0
+    try:
+        while chunk := await upload.read(READ_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_file_bytes:
+                raise UploadTooLarge(f"'{upload.filename}' exceeds {max_file_bytes} bytes")
+            budget.consume(len(chunk), upload.filename)
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+
+def open_document(document):
+    """
+    Seekable binary handle, rewound, for raw bytes or an already open file.
+    """
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        return io.BytesIO(document)
+    document.seek(0)
+    return document
+
+
+def document_size(document) -> int:
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        return len(document)
+    document.seek(0, os.SEEK_END)
+    size = document.tell()
+    document.seek(0)
+    return size
+
+
+def b64encode_stream(document) -> str:
+    """
+    Base64 of a document, encoded chunk by chunk from its handle so the raw
+    bytes are never held in memory as a whole.
+    """
+    handle = open_document(document)
+    return "".join(
+        base64.b64encode(chunk).decode("ascii")
+        for chunk in iter(lambda: handle.read(B64_CHUNK_SIZE), b"")
+    )
@@ -0,0 +1,57 @@
+import argparse
+import json
+import subprocess
+import sys
+
+
+def measure_import(module: str) -> list:
+    """
+    Run `python -X importtime -c "import <module>"` in a fresh interpreter and
+    parse the per-module self/cumulative times (microseconds) from stderr.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import time breakdown")
+    parser.add_argument("modules", nargs="*", default=["app", "streamlit_app"])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="write the full breakdown to this file")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for module in args.modules:
+        rows = measure_import(module)
+        total = max((r["cumulative_us"] for r in rows if r["module"] == module), default=0)
+        report[module] = {"total_us": total, "modules": rows}
+
+        print(f"\n{module}: {total / 1000:.1f} ms total")
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for r in sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:args.top]:
+            print(f"{r['cumulative_us'] / 1000:>14.1f} {r['self_us'] / 1000:>9.1f}  {r['module']}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
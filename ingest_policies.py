@@ -1,53 +1,220 @@
-from pinecone import Pinecone, ServerlessSpec
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_pinecone import PineconeVectorStore
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from core.config import PINECONE_API_KEY, PINECONE_ENV, GOOGLE_API_KEY
-
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-
-# load documents from given folder
-def load_documents_from_folder(folder_path: str):
-    docs = []
-    for fname in os.listdir(folder_path):
-        full = os.path.join(folder_path, fname)
-        if fname.lower().endswith(".pdf"):
-            loader = PyPDFLoader(full)
-        elif fname.lower().endswith((".txt", ".md")):
-            loader = TextLoader(full)
-        else:
-            continue
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-
-        chunks = splitter.split_documents(loader.load())
-
-        # ✅ Inject loan_type metadata based on filename (home_loan_policy.txt → "home")
-        loan_type = Path(fname).stem.split("_")[0]
-        for c in chunks:
-            c.metadata["loan_type"] = loan_type
-            c.metadata["source_file"] = fname.split('/')[-1]
-        docs.extend(chunks)
-    return docs
-
-index_name = os.getenv("PINECONE_INDEX", "loan-policy-index")
-if not pc.list_indexes().names():
-    print(PINECONE_ENV)
-    pc.create_index(
-        name=index_name,
-        dimension=3072,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
+from core.config import (
+    PINECONE_API_KEY, PINECONE_ENV, VECTOR_BACKEND, LOCAL_INDEX_DIR, LEXICAL_INDEX_DIR, CACHE_DIR, POLICY_DIR
+)
+from core.llm import make_gemini_embedder
+from core.lexical_index import write_lexical_index
+
+INDEX_NAME = os.getenv("PINECONE_INDEX", "loan-policy-index")
+
+
+def _load_file(folder_path: str, fname: str):
+    full = os.path.join(folder_path, fname)
+    if fname.lower().endswith(".pdf"):
+        loader = PyPDFLoader(full)
+    elif fname.lower().endswith((".txt", ".md")):
+        loader = TextLoader(full)
+    else:
+        return []
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+
+    chunks = splitter.split_documents(loader.load())
+
+    # ✅ Inject loan_type metadata based on filename (home_loan_policy.txt → "home")
+    loan_type = Path(fname).stem.split("_")[0]
+    for c in chunks:
+        c.metadata["loan_type"] = loan_type
+        c.metadata["source_file"] = fname.split('/')[-1]
+        c.metadata["chunk_hash"] = hashlib.sha256(c.page_content.encode("utf-8")).hexdigest()
+    return chunks
+
+
+# load documents from given folder, one file per worker
+def load_documents_from_folder(folder_path: str, max_workers: int = 8):
+    fnames = sorted(os.listdir(folder_path))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        per_file = pool.map(lambda fname: _load_file(folder_path, fname), fnames)
+    return [chunk for chunks in per_file for chunk in chunks]
+
+
+def chunk_id(doc) -> str:
+    """
+    Stable vector id derived from the chunk's source file and content hash.
+    """
+    key = f"{doc.metadata['source_file']}\x00{doc.metadata['chunk_hash']}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"chunks": {}}
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def embed_in_batches(embeddings, texts, batch_size: int):
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + batch_size]))
+    return vectors
+
+
+def _pinecone_index():
+    from pinecone import Pinecone, ServerlessSpec
+
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    if INDEX_NAME not in pc.list_indexes().names():
+        pc.create_index(
+            name=INDEX_NAME,
+            dimension=3072,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
+        )
+    return pc.Index(INDEX_NAME)
+
+
+def _pinecone_ids(index) -> set:
+    # every id in the index, including vectors written outside this script's manifest
+    return {cid for page in index.list() for cid in page}
+
+
+def sync_pinecone(index, new_docs, new_ids, vectors, stale_ids, batch_size: int):
+    records = [
+        (cid, vector, {**doc.metadata, "text": doc.page_content})
+        for cid, vector, doc in zip(new_ids, vectors, new_docs)
+    ]
+    for start in range(0, len(records), batch_size):
+        index.upsert(vectors=records[start:start + batch_size])
+    for start in range(0, len(stale_ids), 1000):
+        index.delete(ids=stale_ids[start:start + 1000])
+    return f"index '{INDEX_NAME}'"
+
+
+def sync_local(docs, ids, new_ids, vectors, path: str = LOCAL_INDEX_DIR):
+    import numpy as np
+    from core.local_index import LocalVectorIndex, write_local_index
+
+    # reuse stored rows for unchanged chunks; only new chunks carry fresh vectors
+    rows = dict(zip(new_ids, vectors))
+    if os.path.exists(os.path.join(path, "metadata.json")):
+        existing = LocalVectorIndex(path)
+        for row, cid in enumerate(existing.ids):
+            if cid not in rows:
+                rows[cid] = np.asarray(existing.matrix[row])
+    write_local_index(
+        path,
+        [d.page_content for d in docs],
+        [d.metadata for d in docs],
+        [rows[cid] for cid in ids],
+        ids=ids,
     )
-index = pc.Index(index_name)
+    return f"local index '{path}'"
+
+
+def _local_ids(path: str = LOCAL_INDEX_DIR) -> set:
+    try:
+        with open(os.path.join(path, "metadata.json"), encoding="utf-8") as f:
+            return set(json.load(f)["ids"])
+    except (OSError, ValueError, KeyError):
+        return set()
+
 
-embeddings = GoogleGenerativeAIEmbeddings(model="gemini-embedding-001", google_api_key=GOOGLE_API_KEY)
-vector_store = PineconeVectorStore(index=index, embedding=embeddings, text_key="text")
+def ingest(folder: str, backend: str, manifest_path: str, batch_size: int = 64,
+           max_workers: int = 8, full: bool = False, local_index_dir: str = LOCAL_INDEX_DIR,
+           lexical_index_dir: str = LEXICAL_INDEX_DIR) -> dict:
+    """
+    Bring the vector store in line with the policy folder: embed and upsert
+    only chunks whose content hash is not both in the manifest and in the
+    store, delete every stored vector that is not a current chunk, and
+    record the new manifest. The BM25 index is rebuilt from
+    all current chunks; it needs no embeddings.
+    """
+    start = time.perf_counter()
+    docs = load_documents_from_folder(folder, max_workers=max_workers)
+    ids = [chunk_id(d) for d in docs]
+    # identical chunks within one file collapse to a single vector
+    unique = dict(zip(ids, docs))
+    ids, docs = list(unique), list(unique.values())
+
+    known = {} if full else load_manifest(manifest_path)["chunks"]
+    if backend == "local":
+        # the local index itself is the source of truth for which vectors exist
+        stored = _local_ids(local_index_dir)
+    else:
+        index = _pinecone_index()
+        stored = _pinecone_ids(index)
+    known = {cid: entry for cid, entry in known.items() if cid in stored}
+    new = [(cid, doc) for cid, doc in zip(ids, docs) if cid not in known]
+    # anything stored that is not a current chunk goes, whether or not the manifest knew it
+    stale_ids = sorted(cid for cid in stored if cid not in unique)
+    new_ids = [cid for cid, _ in new]
+    new_docs = [doc for _, doc in new]
+
+    embeddings = make_gemini_embedder(task_type=None)
+    vectors = embed_in_batches(embeddings, [d.page_content for d in new_docs], batch_size)
+
+    if backend == "local":
+        target = sync_local(docs, ids, new_ids, vectors, path=local_index_dir)
+    else:
+        target = sync_pinecone(index, new_docs, new_ids, vectors, stale_ids, batch_size)
+    write_lexical_index(lexical_index_dir, [d.page_content for d in docs], [d.metadata for d in docs], ids=ids)
+
+    save_manifest(manifest_path, {
+        "backend": backend,
+        "chunks": {
+            cid: {"source_file": doc.metadata["source_file"], "chunk_hash": doc.metadata["chunk_hash"]}
+            for cid, doc in zip(ids, docs)
+        },
+    })
+    elapsed = time.perf_counter() - start
+    return {
+        "target": target,
+        "total": len(ids),
+        "embedded": len(new_ids),
+        "unchanged": len(ids) - len(new_ids),
+        "deleted": len(stale_ids),
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(len(new_ids) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally ingest loan policy documents into the vector store")
+    parser.add_argument("--folder", default=POLICY_DIR)
+    parser.add_argument("--backend", choices=["pinecone", "local"], default=VECTOR_BACKEND)
+    parser.add_argument("--manifest", help="chunk manifest path (default: per-backend file under the cache dir)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8, help="parallel file loaders")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-embed everything")
+    args = parser.parse_args(argv)
+
+    manifest_path = args.manifest or os.path.join(CACHE_DIR, f"ingest_manifest_{args.backend}.json")
+    report = ingest(args.folder, args.backend, manifest_path, batch_size=args.batch_size,
+                    max_workers=args.workers, full=args.full)
+
+    print(
+        f"Ingested into {report['target']}: {report['embedded']} new, {report['unchanged']} unchanged, "
+        f"{report['deleted']} deleted ({report['total']} chunks) in {report['seconds']}s "
+        f"- {report['chunks_per_second']} chunks/s."
+    )
 
-docs = load_documents_from_folder("policies/")
-vector_store.add_documents(docs)
 
-print(f"Ingested {len(docs)} document chunks into index '{index_name}'.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
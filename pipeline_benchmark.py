@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Offline benchmarks of the loan pipeline. Gemini and the vector store are replaced
+# by the deterministic fakes in core/fakes.py; set their latency and failure rate
+# with the flags below. Config is read at import, so the environment is prepared
+# before anything from core/ or agents/ is imported.
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "pipeline_baseline.json")
+BENCHMARKS = ("workflow", "endpoint", "ingest", "report")
+
+
+def _configure(args, cache_dir: str) -> None:
+    os.environ |= {
+        "LLM_BACKEND": "fake",
+        "EMBEDDING_BACKEND": "fake",
+        "VECTOR_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(args.llm_latency),
+        "FAKE_EMBEDDING_LATENCY_SECONDS": str(args.embedding_latency),
+        "FAKE_VECTOR_LATENCY_SECONDS": str(args.vector_latency),
+        "FAKE_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_SEED": str(args.seed),
+        # fresh caches, so every run starts cold and runs do not share state
+        "LOAN_CACHE_DIR": cache_dir,
+        "LOAN_CHECKPOINT_DB": os.path.join(cache_dir, "checkpoints.sqlite"),
+        # the limiter would measure the quota, not the pipeline
+        "GEMINI_REQUESTS_PER_MINUTE": "0",
+        "GEMINI_BACKOFF_BASE_SECONDS": "0.01",
+    }
+
+
+def _latency_summary(seconds: list, failed: int = 0, elapsed: float = None) -> dict:
+    summary = {"runs": len(seconds), "failed": failed}
+    if seconds:
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) * 1000
+        summary |= {"mean_ms": round(float(np.mean(seconds)) * 1000, 2),
+                    "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+    if elapsed:
+        summary["throughput_per_second"] = round(len(seconds) / elapsed, 2)
+    return summary
+
+
+def _application(rng: random.Random, i: int) -> tuple:
+    # distinct applicants and scans, so the extraction and LLM caches do not hide the work
+    loan_type = ("home", "car", "personal")[i % 3]
+    state = {"name": f"Applicant {i}", "loan_type": loan_type,
+             "req_loan_amount": float(rng.randrange(200_000, 8_000_000, 1000)),
+             "monthly_debt": float(rng.randrange(0, 40_000, 100))}
+    scan = lambda: rng.randbytes(20_000)  # noqa: E731
+    documents = {
+        "salary_slips": {f"slip_{i}_{m}.pdf": scan() for m in range(3)},
+        "cibil_pdf": {f"cibil_{i}.pdf": scan()},
+        "asset_docs": {f"asset_{i}.pdf": scan()} if loan_type != "personal" else {},
+    }
+    return state, documents
+
+
+def bench_workflow(runs: int, seed: int) -> dict:
+    from agents.workflow import workflow, run_config
+
+    rng = random.Random(seed)
+    seconds, nodes, failed = [], {}, 0
+    for i in range(runs):
+        state, documents = _application(rng, i)
+        start = time.perf_counter()
+        try:
+            out = workflow.invoke(state, config=run_config(**documents))
+        except Exception:
+            failed += 1
+            continue
+        seconds.append(time.perf_counter() - start)
+        for node, timing in out["node_timings"].items():
+            nodes.setdefault(node, []).append(timing["seconds"])
+    summary = _latency_summary(seconds, failed)
+    summary["node_p50_ms"] = {node: round(float(np.median(s)) * 1000, 2) for node, s in sorted(nodes.items())}
+    return summary
+
+
+async def _post_application(client, state: dict, documents: dict):
+    files = [("salary_slips", (name, data, "application/pdf")) for name, data in documents["salary_slips"].items()]
+    files += [("cibil_report", (name, data, "application/pdf")) for name, data in documents["cibil_pdf"].items()]
+    field = {"home": "property_doc", "car": "car_doc"}.get(state["loan_type"])
+    if field:
+        files += [(field, (name, data, "application/pdf")) for name, data in documents["asset_docs"].items()]
+    return await client.post("/process_loan/", data={k: str(v) for k, v in state.items()}, files=files)
+
+
+async def _endpoint_load(requests: int, concurrency: int, seed: int) -> dict:
+    import httpx
+    from app import app
+    from core.resources import is_ready
+
+    rng = random.Random(seed)
+    applications = [_application(rng, i) for i in range(requests)]
+    seconds, statuses = [], {}
+    queue = asyncio.Queue()
+    for application in applications:
+        queue.put_nowait(application)
+
+    async def worker(client):
+        while not queue.empty():
+            state, documents = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = (await _post_application(client, state, documents)).status_code
+            except Exception as e:
+                status = type(e).__name__
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                seconds.append(time.perf_counter() - start)
+
+    async with app.router.lifespan_context(app):
+        while not is_ready():
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    summary = _latency_summary(seconds, requests - len(seconds), elapsed)
+    return summary | {"concurrency": concurrency, "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)}}
+
+
+def bench_endpoint(requests: int, concurrency: int, seed: int) -> dict:
+    return asyncio.run(_endpoint_load(requests, concurrency, seed))
+
+
+def _policy_corpus(folder: str, copies: int) -> str:
+    # the shipped policies are a handful of chunks; copies give ingestion real work
+    from core.config import POLICY_DIR
+
+    os.makedirs(folder)
+    for fname in sorted(os.listdir(POLICY_DIR)):
+        if not os.path.isfile(os.path.join(POLICY_DIR, fname)):
+            continue
+        stem, ext = os.path.splitext(fname)
+        with open(os.path.join(POLICY_DIR, fname), encoding="utf-8") as f:
+            text = f.read()
+        for i in range(copies):
+            with open(os.path.join(folder, f"{stem}_{i}{ext}"), "w", encoding="utf-8") as f:
+                f.write(f"Revision {i}.\n{text}")
+    return folder
+
+
+def bench_ingest(runs: int, copies: int, cache_dir: str) -> dict:
+    from ingest_policies import ingest
+
+    corpus = _policy_corpus(os.path.join(cache_dir, "policies"), copies)
+    full, incremental = [], []
+    for i in range(runs):
+        target = os.path.join(cache_dir, f"ingest_{i}")
+        manifest = os.path.join(target, "manifest.json")
+        start = time.perf_counter()
+        report = ingest(corpus, "local", manifest, local_index_dir=target, full=True)
+        full.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        ingest(corpus, "local", manifest, local_index_dir=target)
+        incremental.append(time.perf_counter() - start)
+    return {
+        "chunks": report["total"],
+        "full": _latency_summary(full),
+        "incremental": _latency_summary(incremental),
+    }
+
+
+def bench_report(runs: int, seed: int) -> dict:
+    from agents.workflow import workflow, run_config
+    from core.report_generator import generate_html_report, generate_markdown_report
+    from core.report_renderer import _render_pdf
+
+    # a complete final state, as the API hands it to the renderer
+    state, documents = _application(random.Random(seed), 0)
+    decision = workflow.invoke(state, config=run_config(**documents))
+    results = {}
+    for name, render in (("markdown", generate_markdown_report), ("html", generate_html_report)):
+        seconds = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            render("Applicant", decision)
+            seconds.append(time.perf_counter() - start)
+        results[name] = _latency_summary(seconds)
+    try:
+        seconds = []
+        for _ in range(max(1, runs // 10)):
+            start = time.perf_counter()
+            _render_pdf("Applicant", decision)
+            seconds.append(time.perf_counter() - start)
+        results["pdf"] = _latency_summary(seconds)
+    except OSError as e:
+        # WeasyPrint needs Pango; not every benchmark host has it
+        results["pdf"] = {"unavailable": type(e).__name__}
+    return results
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat |= _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Metrics that regressed by more than `tolerance` (a fraction) against the
+    baseline: latencies (`*_ms`) that grew, throughputs that shrank.
+    """
+    current, previous = _flatten(results), _flatten(baseline)
+    regressions = []
+    for key, value in sorted(current.items()):
+        before = previous.get(key)
+        if not before:
+            continue
+        if key.endswith("_ms") and value > before * (1 + tolerance):
+            regressions.append({"metric": key, "baseline": before, "current": value})
+        elif key.endswith("per_second") and value < before * (1 - tolerance):
+            regressions.append({"metric": key, "baseline": before, "current": value})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the loan pipeline against fake backends")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--runs", type=int, default=30, help="iterations per benchmark")
+    parser.add_argument("--requests", type=int, default=60, help="requests sent to /process_loan/")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ingest-copies", type=int, default=20, help="copies of each policy file to ingest")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument("--vector-latency", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of fake calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    cache_dir = tempfile.mkdtemp(prefix="loan-bench-")
+    _configure(args, cache_dir)
+    try:
+        results = {}
+        if "workflow" in args.only:
+            results["workflow"] = bench_workflow(args.runs, args.seed)
+        if "endpoint" in args.only:
+            results["endpoint"] = bench_endpoint(args.requests, args.concurrency, args.seed)
+        if "ingest" in args.only:
+            results["ingest"] = bench_ingest(max(3, args.runs // 10), args.ingest_copies, cache_dir)
+        if "report" in args.only:
+            results["report"] = bench_report(args.runs, args.seed)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "settings": {k: v for k, v in vars(args).items()
+                         if k not in ("only", "baseline", "save_baseline", "json_path")},
+        },
+        "results": results,
+    }
+    print(json.dumps(results, indent=2))
+
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['current']}")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
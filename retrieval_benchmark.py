@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Recall and latency of dense, lexical (BM25) and hybrid policy retrieval on a
+# fixed question set. Both indexes are built here from the same chunks of the
+# policy folder, so the modes are compared on equal footing.
+
+MODES = ("dense", "lexical", "hybrid")
+
+# (loan type, question, pattern a chunk must contain to answer it)
+QUESTIONS = [
+    ("home", "What is the minimum CIBIL score for a home loan?", r"cibil"),
+    ("home", "What LTV ratio applies to a home loan of 50 lakh?", r"ltv"),
+    ("home", "What DTI is allowed for a home loan?", r"dti"),
+    ("home", "What is the maximum tenure of a home loan?", r"tenure"),
+    ("home", "Is there a prepayment penalty on a home loan?", r"prepayment"),
+    ("home", "What monthly income is needed for a home loan?", r"income"),
+    ("car", "What CIBIL score does a car loan need?", r"cibil"),
+    ("car", "What LTV is financed for a used car?", r"ltv"),
+    ("car", "What tenure is available for a new car loan?", r"tenure"),
+    ("car", "How much of the monthly income may the car loan EMI take?", r"emi"),
+    ("car", "What interest rate applies to a car loan?", r"interest"),
+    ("personal", "What is the interest rate of a personal loan?", r"interest"),
+    ("personal", "What CIBIL score is required for a personal loan?", r"cibil"),
+    ("personal", "What is the DTI limit for a personal loan?", r"dti"),
+    ("personal", "What tenure can a personal loan have?", r"tenure"),
+    ("personal", "Is collateral required for a personal loan?", r"collateral"),
+]
+
+
+def _configure(args, index_dir: str) -> None:
+    os.environ["VECTOR_BACKEND"] = "local"
+    os.environ["LOCAL_INDEX_DIR"] = os.path.join(index_dir, "vector")
+    os.environ["LEXICAL_INDEX_DIR"] = os.path.join(index_dir, "lexical")
+    if args.offline:
+        os.environ["EMBEDDING_BACKEND"] = "fake"
+        os.environ["FAKE_EMBEDDING_LATENCY_SECONDS"] = str(args.embedding_latency)
+    # every query pays its embedding round trip unless the cache is asked for
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "true" if args.cache else "false"
+
+
+def _build_indexes(folder: str, chunk_size: int, index_dir: str) -> list:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from core.llm import make_gemini_embedder
+    from core.local_index import write_local_index
+    from core.lexical_index import write_lexical_index
+    import ingest_policies
+
+    docs = ingest_policies.load_documents_from_folder(folder)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_size // 5)
+    chunks = splitter.split_documents(docs)
+    texts, metadatas = [c.page_content for c in chunks], [c.metadata for c in chunks]
+    vectors = make_gemini_embedder(task_type=None).embed_documents(texts)
+    write_local_index(os.path.join(index_dir, "vector"), texts, metadatas, vectors)
+    write_lexical_index(os.path.join(index_dir, "lexical"), texts, metadatas)
+    return chunks
+
+
+def _relevant(chunks: list, loan_type: str, pattern: str) -> set:
+    return {c.page_content for c in chunks
+            if c.metadata["loan_type"] == loan_type and re.search(pattern, c.page_content, re.I)}
+
+
+def evaluate(mode: str, chunks: list, k: int, filtered: bool) -> dict:
+    from core.metrics import EMBEDDING_TEXTS
+    from core.rag import get_retriever
+
+    embedded_before = EMBEDDING_TEXTS.labels("query")._value.get()
+    recalls, hits, wrong_type, seconds = [], 0, 0, []
+    returned = 0
+    for loan_type, question, pattern in QUESTIONS:
+        relevant = _relevant(chunks, loan_type, pattern)
+        retriever = get_retriever(k=k, loan_type=loan_type if filtered else None, mode=mode)
+        start = time.perf_counter()
+        docs = retriever.invoke(question)
+        seconds.append(time.perf_counter() - start)
+        found = {d.page_content for d in docs} & relevant
+        recalls.append(len(found) / min(k, len(relevant)) if relevant else 1.0)
+        hits += bool(found) or not relevant
+        wrong_type += sum(d.metadata.get("loan_type") != loan_type for d in docs)
+        returned += len(docs)
+
+    p50, p95 = np.percentile(seconds, [50, 95]) * 1000
+    return {
+        "recall_at_k": round(float(np.mean(recalls)), 3),
+        "hit_rate": round(hits / len(QUESTIONS), 3),
+        "wrong_loan_type_share": round(wrong_type / returned, 3) if returned else 0.0,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "embedding_calls": int(EMBEDDING_TEXTS.labels("query")._value.get() - embedded_before),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dense vs BM25 vs hybrid policy retrieval: recall and latency")
+    parser.add_argument("--folder", default=None, help="policy folder (default: POLICY_DIR)")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="ingest uses 1000")
+    parser.add_argument("--offline", action="store_true", help="fake embeddings instead of Gemini")
+    parser.add_argument("--embedding-latency", type=float, default=0.15,
+                        help="seconds per fake embedding call (--offline)")
+    parser.add_argument("--cache", action="store_true", help="serve repeated query embeddings from the cache")
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        _configure(args, index_dir)
+        from core.config import POLICY_DIR
+
+        chunks = _build_indexes(args.folder or POLICY_DIR, args.chunk_size, index_dir)
+        report = {"chunks": len(chunks), "questions": len(QUESTIONS), "k": args.k, "filtered": {}, "unfiltered": {}}
+        for filtered in (True, False):
+            for mode in MODES:
+                report["filtered" if filtered else "unfiltered"][mode] = evaluate(mode, chunks, args.k, filtered)
+
+    print(f"{report['chunks']} chunks, {report['questions']} questions, k={args.k}")
+    for scope in ("filtered", "unfiltered"):
+        for mode, r in report[scope].items():
+            print(f"{scope:>10} {mode:>8}: recall {r['recall_at_k']:.3f}, hit rate {r['hit_rate']:.3f}, "
+                  f"wrong loan type {r['wrong_loan_type_share']:.3f}, p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,90 +1,8 @@
 import streamlit as st
-import tempfile
-import pdfkit
-import markdown
 from core.report_generator import generate_markdown_report
-from langgraph.graph import StateGraph, END
-from agents.customer_agent import customer_interaction_agent
-from agents.document_agent import document_processing_agent
-from agents.eligibility_agent import eligibility_risk_assessment_agent
-from agents.decision_agent import decision_recommendation_agent
-from typing import TypedDict, Any, List
-
-import re
-
-def remove_emojis(text: str) -> str:
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002700-\U000027BF"  # other symbols
-        "\U0001F900-\U0001F9FF"  # supplemental symbols
-        "\U00002600-\U000026FF"  # misc symbols
-        "\U00002B00-\U00002BFF"  # arrows
-        "]+",
-        flags=re.UNICODE
-    )
-    return emoji_pattern.sub(r'', text)
-
-def fix_encoding(text: str) -> str:
-    try:
-        return text.encode('latin1').decode('utf-8')
-    except:
-        return text
-
-class LoanState(TypedDict):
-    name: str
-    loan_type: str
-    cibil_score: Any
-    income_monthly: Any
-    asset_value: Any
-    monthly_debt: Any
-    eligible: Any
-    reasons: Any
-    policy_info: Any
-    max_loan: Any
-    sources: List[str]
-    DTI: Any
-    recommendation: str
-    summary: str
-    recommended_loan: int
-    recommended_emi: Any
-    applicable_rules: Any
-    next_steps: Any
-    updated_DTI: Any
-
-# Initialize the workflow graph
-graph = StateGraph(LoanState)
-
-def eligibility_node(s: LoanState):
-    applicant = {
-        "loan_type": s["loan_type"],
-        "income_monthly": s["income_monthly"],
-        "cibil_score": s["cibil_score"],
-        "monthly_debt": s["monthly_debt"],
-    }
-    if s['loan_type'] != 'personal':
-        applicant |= {"asset_value": s["asset_value"]}
-    result = eligibility_risk_assessment_agent(applicant)
-    for key, value in result.items():
-        s[key] = value
-    return s
-
-def decision_node(s: LoanState):
-    res = decision_recommendation_agent(s)
-    for key, value in res.items():
-        s[key] = value
-    return s
-
-# Create graph nodes and edges
-graph.add_node("eligibility_node", eligibility_node)
-graph.add_node("decision_node", decision_node)
-graph.set_entry_point("eligibility_node")
-graph.add_edge("eligibility_node", "decision_node")
-graph.add_edge("decision_node", END)
-workflow = graph.compile()
+from core.report_renderer import render_report
+from agents.workflow import LoanState, workflow, run_config
+from agents.progress import stream_progress
 
 def process_loan(
     name: str,
@@ -93,7 +11,8 @@ def process_loan(
     cibil_report,
     salary_slips,
     property_doc=None,
-    car_doc=None
+    car_doc=None,
+    on_event=None
 ):
     # Input validation
     if loan_type not in ("home", "personal", "car"):
@@ -118,23 +37,19 @@ def process_loan(
     elif loan_type == "car" and car_doc:
         asset_bytes = {car_doc.name: car_doc.getvalue()}
 
-    # Process documents
-    doc_data = document_processing_agent(
-        salary_slips=salary_bytes,
-        cibil_pdf=cibil_bytes,
-        asset_docs=asset_bytes
-    )
-
-    # Initialize and process loan state
+    # Initialize and process loan state; documents are extracted inside the graph
     state = LoanState()
     state["name"] = name
     state["loan_type"] = loan_type
-    state["income_monthly"] = doc_data["income_monthly"]
-    state["cibil_score"] = doc_data["cibil_score"]
-    state["asset_value"] = doc_data["asset_value"]
     state['monthly_debt'] = monthly_debt
-
-    state = workflow.invoke(state)
+    config = run_config(salary_slips=salary_bytes, cibil_pdf=cibil_bytes, asset_docs=asset_bytes)
+
+    # nodes report progress as they finish; the last event carries the final state
+    for event, data in stream_progress(workflow, state, config):
+        if event == "done":
+            state = data
+        elif on_event:
+            on_event(event, data)
     return {"output": state}
 
 # Streamlit UI
@@ -181,7 +96,40 @@ with right:
     preview_placeholder = st.empty()
 
 # Submit action
+def show_progress(progress, summary_placeholder):
+    """
+    Render graph events as they arrive: extracted fields, the eligibility
+    verdict, then the decision summary token by token.
+    """
+    summary = {"summary": "", "recommendation": ""}
+
+    def on_event(event, data):
+        if event == "token":
+            summary[data["field"]] += data["delta"]
+            summary_placeholder.markdown(f"**Summary:** {summary['summary']}\n\n{summary['recommendation']}")
+            return
+        update = data["update"]
+        if data["node"] == "document_node":
+            progress.write(
+                f"📄 Documents read: income ₹{update['income_monthly']:,.0f}/month, "
+                f"CIBIL {update['cibil_score']}, asset ₹{update['asset_value']:,.0f}"
+            )
+        elif data["node"] == "policy_node":
+            progress.write(f"📚 Policy loaded for {update['policy_digest']['loan_type']} loans")
+        elif data["node"] == "eligibility_node":
+            verdict = "eligible ✅" if update["eligible"] else "not eligible ❌"
+            progress.write(f"⚖️ Applicant is {verdict} (DTI {update['DTI']}%)")
+            for reason in update.get("reasons") or []:
+                progress.write(f"- {reason}")
+        elif data["node"] == "decision_node":
+            progress.update(label="Decision ready", state="complete")
+
+    return on_event
+
 if submitted:
+    with right:
+        progress = st.status("Processing application...", expanded=True)
+        summary_placeholder = st.empty()
     result = process_loan(
         name=name,
         loan_type=loan_type,
@@ -189,39 +137,27 @@ if submitted:
         cibil_report=cibil_report,
         salary_slips=salary_slips,
         property_doc=property_doc,
-        car_doc=car_doc
+        car_doc=car_doc,
+        on_event=show_progress(progress, summary_placeholder)
     )
 
     if result:
         decision = result["output"]
+        summary_placeholder.empty()
         md_report = generate_markdown_report(name, decision)
         preview_placeholder.markdown(md_report, unsafe_allow_html=True)
 
-        # Generate PDF
-        html_body = markdown.markdown(md_report)
-        html_report = fix_encoding(remove_emojis(f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; color: #333; }}
-                h1 {{ color: #0B5394; }}
-                h2 {{ color: #1C4587; border-bottom:1px solid #ccc; padding-bottom:4px; }}
-            </style>
-        </head>
-        <body>
-            {html_body}
-        </body>
-        </html>
-        """))
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            pdfkit.from_string(html_report, tmp_pdf.name)
-            with open(tmp_pdf.name, "rb") as pdf_file:
-                st.download_button(
-                    label="📥 Download Loan Approval Report (PDF)",
-                    data=pdf_file,
-                    file_name=f"{name}_loan_report.pdf",
-                    mime="application/pdf"
-                )
-
-        st.json(decision)
\ No newline at end of file
+        st.json(decision)
+
+        # Rendered by the report worker pool and cached by decision hash
+        with st.spinner("Preparing PDF report..."):
+            pdf = render_report(name, decision)
+        if pdf:
+            st.download_button(
+                label="📥 Download Loan Approval Report (PDF)",
+                data=pdf,
+                file_name=f"{name}_loan_report.pdf",
+                mime="application/pdf"
+            )
+        else:
+            st.warning("The PDF report could not be generated.")
\ No newline at end of file
@@ -0,0 +1,35 @@
+# test_affordability.py
+import numpy as np
+from core.affordability import (affordability_grid, amortization_schedule, emi, max_principal, recommend_loan,
+                                tenure_grid, yearly_schedule)
+
+
+def test_max_principal_inverts_emi():
+    principal = max_principal(25_000, 8.5, 240)
+    assert np.isclose(emi(principal, 8.5, 240), 25_000)
+    assert max_principal(1_000, 0, 12) == 12_000
+
+
+def test_schedule_repays_principal():
+    schedule = amortization_schedule(1_000_000, 9.0, 120)
+    assert np.isclose(schedule["principal"].sum(), 1_000_000)
+    assert np.isclose(schedule["balance"][-1], 0, atol=1e-4)
+
+    yearly = yearly_schedule(amortization_schedule(1_000_000, 9.0, 126))
+    assert list(yearly["year"]) == list(range(1, 12))
+    assert np.isclose(yearly["principal"].sum(), 1_000_000)
+    assert np.isclose(yearly["balance"][0], 1_000_000 - yearly["principal"][0])
+
+
+def test_grid_over_applicants():
+    grid = affordability_grid([100_000, 50_000], [10_000, 0], 50, [3_000_000, 10**9], [8.0, 10.0], tenure_grid(60, 240))
+    assert grid["principal"].shape == (2, 2, 16)
+    assert (grid["principal"][0] <= 3_000_000).all()
+    assert (np.diff(grid["principal"][1], axis=1) > 0).all()
+    assert (grid["dti"] <= 50 + 1e-9).all()
+
+
+def test_recommend_loan_reduces_to_dti_limit():
+    plan = recommend_loan(5_000_000, 80_000, 5_000, 40, 9.0, 240)
+    assert plan["adjusted"] and plan["loan"] < 5_000_000
+    assert plan["updated_dti"] <= 40
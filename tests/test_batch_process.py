@@ -0,0 +1,60 @@
+# test_batch_process.py
+import asyncio
+import json
+
+import pytest
+
+import batch_process
+
+
+class CountingWorkflow:
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, state, config):
+        documents = config["configurable"]["documents"]
+        self.calls.append(state["name"])
+        return {**state, "documents": {k: sorted(v) for k, v in documents.items()}}
+
+
+def test_batch_resumes_from_checkpoint(tmp_path, monkeypatch):
+    for app_id in ("a1", "a2"):
+        folder = tmp_path / "docs" / app_id
+        folder.mkdir(parents=True)
+        for fname in ("salary_slip_jan.pdf", "cibil_report.pdf", "property_deed.pdf", "notes.txt"):
+            (folder / fname).write_bytes(b"%PDF")
+    (tmp_path / "apps.csv").write_text(
+        "application_id,name,loan_type,monthly_debt\na1,Asha,home,1000\na2,Ravi,personal,0\na3,Meena,car,0\n"
+    )
+    fake = CountingWorkflow()
+    monkeypatch.setattr(batch_process, "workflow", fake)
+    applications = batch_process.load_applications(str(tmp_path / "apps.csv"), str(tmp_path / "docs"))
+    output, checkpoint = str(tmp_path / "out.jsonl"), str(tmp_path / "out.checkpoint")
+
+    summary = asyncio.run(batch_process.run_batch(applications, output, checkpoint, concurrency=2))
+    assert (summary["processed"], summary["failed"], summary["skipped"]) == (3, 1, 0)
+    lines = {line["application_id"]: line for line in map(json.loads, open(output))}
+    assert lines["a1"]["output"]["documents"]["asset_docs"] == ["property_deed.pdf"]
+    assert lines["a2"]["output"]["documents"]["asset_docs"] == []
+    assert lines["a3"]["status"] == "error"
+
+    summary = asyncio.run(batch_process.run_batch(applications, output, checkpoint, concurrency=2))
+    assert (summary["processed"], summary["skipped"]) == (1, 2)
+    assert sorted(fake.calls) == ["Asha", "Ravi"]
+
+
+def test_ids_fall_back_to_the_folder_and_must_be_unique(tmp_path):
+    csv_path = tmp_path / "apps.csv"
+    csv_path.write_text("application_id,name,loan_type,monthly_debt,folder\n"
+                        ",Asha,home,0,./asha/\n,Asha,car,0,2024/asha-car\n")
+    ids = [a["application_id"] for a in batch_process.load_applications(str(csv_path), "docs")]
+    assert ids == ["asha", "2024/asha-car"]
+
+    # re-sorting the CSV keeps each id with its applicant
+    csv_path.write_text("application_id,name,loan_type,monthly_debt,folder\n"
+                        ",Asha,car,0,2024/asha-car\n,Asha,home,0,asha\n")
+    assert [a["application_id"] for a in batch_process.load_applications(str(csv_path), "docs")] == ids[::-1]
+
+    csv_path.write_text("application_id,name,loan_type,monthly_debt\na1,Asha,home,0\na1,Ravi,car,0\n")
+    with pytest.raises(ValueError, match="duplicate application_id 'a1'"):
+        batch_process.load_applications(str(csv_path), "docs")
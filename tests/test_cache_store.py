@@ -0,0 +1,61 @@
+# test_cache_store.py
+from langchain_core.embeddings import Embeddings
+from core.cache_store import DiskCache
+from core.llm import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_disk_cache_lru_and_ttl(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+
+    expiring = DiskCache(str(tmp_path / "t.sqlite"), ttl_seconds=-1)
+    expiring.set("k", b"v")
+    assert expiring.get("k") is None
+
+
+def test_cached_embeddings_hit_memory_then_disk(tmp_path):
+    store = DiskCache(str(tmp_path / "emb.sqlite"))
+    inner = CountingEmbeddings()
+    cached = CachedEmbeddings(inner, model="m", task_type="RETRIEVAL_DOCUMENT", store=store)
+
+    assert cached.embed_query("home loan") == [9.0, 1.0]
+    assert cached.embed_query("home loan") == [9.0, 1.0]
+    assert cached.embed_documents(["home loan", "car"]) == [[9.0, 1.0], [3.0, 1.0]]
+    assert inner.texts == ["home loan", "car"]
+    assert cached.stats == {"memory_hits": 2, "disk_hits": 0, "misses": 2}
+
+    # a new process only has the on-disk store
+    restarted = CachedEmbeddings(inner, model="m", task_type="RETRIEVAL_DOCUMENT", store=store)
+    assert restarted.embed_query("car") == [3.0, 1.0]
+    assert restarted.stats["disk_hits"] == 1
+    assert inner.texts == ["home loan", "car"]
+
+
+def test_llm_response_cache_replays_identical_prompts(tmp_path):
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from core.llm_cache import LLMResponseCache, llm_cache_stats
+
+    store = DiskCache(str(tmp_path / "llm.sqlite"))
+    first = FakeListChatModel(responses=["cached", "fresh"], cache=LLMResponseCache(store, "test_agent"))
+    assert first.invoke("summarise").content == "cached"
+
+    assert first.invoke("summarise").content == "cached"
+    assert llm_cache_stats()["test_agent"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
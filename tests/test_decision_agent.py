@@ -1,35 +1,55 @@
 # test_decision_agent.py
-from core.llm import get_gemini_llm
-from core.rag import run_rag_query
-from agents.decision_agent import decision_recommendation_agent
-
-def test_retrieval_and_recommendation():
-    llm = get_gemini_llm()
-    
-    # Test case: Home loan scenario
-    context = "income: 1200000, value: 5000000, cibil_score: 740"
-    loan_type = "home"
-    
-    # Step 1: Test retrieval
-    rag_res = run_rag_query(llm, query=f"{loan_type} loan policy context: {context}")
+import pytest
+from core import rag, resources
+from core.fakes import FAKE_FIELD_VALUES, FakeChatModel, FakeEmbeddings, FakeVectorIndex
+from core.lexical_index import LexicalIndex
+from core.config import POLICY_DIR
+from agents import decision_agent
+from agents.eligibility_agent import eligibility_risk_assessment_agent
+
+
+@pytest.fixture
+def fake_backends(monkeypatch):
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(rag, "VECTOR_BACKEND", "fake")
+    monkeypatch.setitem(resources._instances, "embedder", embeddings)
+    store = FakeVectorIndex.from_folder(POLICY_DIR, embeddings)
+    monkeypatch.setitem(resources._instances, "vector_store", store)
+    monkeypatch.setitem(resources._instances, "lexical_index", LexicalIndex(store.texts, store.metadatas))
+    monkeypatch.setattr(decision_agent, "get_gemini_llm", lambda **kwargs: FakeChatModel())
+
+
+def test_retrieval_and_recommendation(fake_backends):
+    # Step 1: retrieval is restricted to the loan type's policy
+    rag_res = rag.run_rag_query(FakeChatModel(), query="home loan policy: CIBIL, DTI, LTV", loan_type="home")
     assert rag_res["sources"], "No policy sources retrieved for home loan!"
-    print("Retrieved sources for home loan:", [src["metadata"].get("loan_type") for src in rag_res["sources"]])
-    
-    # Step 2: Test summarization
-    dec_res = decision_recommendation_agent(context, loan_type)
-    print("🔹 Recommendation:", dec_res["recommendation"])
-    assert "recommended_loan" in dec_res["recommendation"], "Recommendation missing key field!"
-    
-    # # Test case: Personal loan scenario
-    # context2 = "income: 600000, value: 500000, cibil_score: 720"
-    # loan_type2 = "personal"
-    
-    # rag_res2 = run_rag_query(llm, query=f"{loan_type2} loan policy context: {context2}")
-    # assert rag_res2["sources"], "No policy sources retrieved for personal loan!"
-    # print("✅ Retrieved sources for personal loan:", [src["metadata"].get("loan_type") for src in rag_res2["sources"]])
-    
-    # dec_res2 = decision_recommendation_agent(context2, loan_type2)
-    # print("🔹 Recommendation:", dec_res2["recommendation"])
-
-if __name__ == "__main__":
-    test_retrieval_and_recommendation()
+    assert {src["metadata"]["loan_type"] for src in rag_res["sources"]} == {"home"}
+
+    # Step 2: eligibility, then the summary and recommended loan
+    thresholds = {"interest_rate": FAKE_FIELD_VALUES["interest_rate"]}
+    digest = {"loan_type": "home", "thresholds": thresholds, "policy_summary": rag_res["answer"],
+              "sources": [src["text"] for src in rag_res["sources"]]}
+    applicant = {"loan_type": "home", "income_monthly": 120000, "cibil_score": 740,
+                 "monthly_debt": 10000, "asset_value": 5000000}
+    data = {**applicant, "req_loan_amount": 3000000,
+            **eligibility_risk_assessment_agent(dict(applicant), digest=digest)}
+    assert data["eligible"]
+
+    dec_res = decision_agent.decision_recommendation_agent(
+        data, policy_summary=digest["policy_summary"])
+    assert dec_res["summary"] == FAKE_FIELD_VALUES["summary"]
+    assert 0 < dec_res["recommended_loan"] <= data["max_loan"]
+    assert dec_res["tenure_options"], "Recommendation missing tenure options!"
+
+    # the new EMI plus existing debt stays within the DTI cap, for every tenure offered
+    max_dti = data["policy_info"]["max_dti"]
+    income, debt = applicant["income_monthly"], applicant["monthly_debt"]
+    assert (debt + dec_res["recommended_emi"]) / income * 100 <= max_dti + 1e-6
+    for option in dec_res["tenure_options"]:
+        assert (debt + option["emi"]) / income * 100 <= max_dti + 1e-6
+
+    # the recommended loan is repaid in full over the schedule
+    schedule = dec_res["amortization_schedule"]
+    assert len(schedule) == data["policy_info"]["max_tenure"] // 12
+    assert abs(sum(row["principal"] for row in schedule) - dec_res["recommended_loan"]) < 1
+    assert schedule[-1]["balance"] < 1
@@ -0,0 +1,49 @@
+# test_decision_store.py
+import numpy as np
+
+from core.decision_store import DecisionStore, rescore
+from core.policy_rules import get_policy_rules
+
+
+def _state(loan_type="home", cibil=760, eligible=True, max_loan=None):
+    state = {
+        "name": "Asha", "loan_type": loan_type, "income_monthly": 90000.0, "cibil_score": cibil,
+        "monthly_debt": 10000.0, "asset_value": 6000000.0 if loan_type != "personal" else None,
+        "req_loan_amount": 2500000.0, "eligible": eligible, "DTI": 11.11,
+        "policy_info": {"interest_rate": 9.0, "max_dti": 50.0, "max_tenure": 240},
+    }
+    rules = get_policy_rules(loan_type)
+    state["max_loan"] = max_loan if max_loan is not None else rules.evaluate(
+        90000.0, cibil, 10000.0, state["asset_value"])["max_loan"]
+    return state
+
+
+def test_record_and_query(tmp_path):
+    store = DecisionStore(str(tmp_path / "decisions.sqlite"))
+    store.record("a1", _state("home"))
+    store.record("a2", _state("car", cibil=650, eligible=False))
+    store.record("a1", _state("home", max_loan=1.0))   # re-evaluation replaces the row
+
+    assert len(store) == 2
+    assert store.get("a1")["max_loan"] == 1.0
+    assert store.get("a1")["thresholds"]["interest_rate"] == 9.0
+    assert [d["application_id"] for d in store.query(eligible=False)] == ["a2"]
+    assert store.count(loan_type="home", since=0) == 1
+
+
+def test_rescore_flags_changed_decisions(tmp_path):
+    store = DecisionStore(str(tmp_path / "decisions.sqlite"))
+    store.record("same", _state("home"))
+    store.record("stale-loan", _state("home", max_loan=3500000.0))
+    store.record("stale-outcome", _state("personal", cibil=700, eligible=True))
+
+    chunks = list(rescore(store, chunk_size=2))
+    assert [len(c["changed"]) for c in chunks] == [2, 1]
+    results = {a: (c, e) for chunk in chunks
+               for a, c, e in zip(chunk["application_id"], chunk["changed"], chunk["eligible"])}
+    assert results["same"] == (False, True)
+    assert results["stale-loan"] == (True, True)
+    assert results["stale-outcome"] == (True, False)   # personal rules require CIBIL 725
+
+    unchanged = next(rescore(store, loan_type="home"))
+    assert np.all(unchanged["recommended_emi"] > 0)
@@ -0,0 +1,43 @@
+# test_extraction_cache.py
+import asyncio
+import io
+from agents import document_agent
+from core import extraction_cache
+from core.cache_store import DiskCache, LRUCache
+from core.extraction_cache import extraction_key
+from tests.test_preprocess import text_pdf
+
+
+def test_key_ignores_names_and_order():
+    a = {"salary_slips": {"x.pdf": b"one", "y.pdf": b"two"}, "cibil_pdf": {"c.pdf": b"c"}, "asset_docs": {}}
+    b = {"salary_slips": {"b.pdf": io.BytesIO(b"two"), "a.pdf": b"one"}, "cibil_pdf": {"d.pdf": b"c"}, "asset_docs": {}}
+    assert extraction_key(a, "1") == extraction_key(b, "1")
+    assert extraction_key(a, "1") != extraction_key(a, "2")
+    swapped = {"salary_slips": {"c.pdf": b"c"}, "cibil_pdf": {"x.pdf": b"one", "y.pdf": b"two"}, "asset_docs": {}}
+    assert extraction_key(a, "1") != extraction_key(swapped, "1")
+
+
+def test_resubmission_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "_store", DiskCache(str(tmp_path / "x.sqlite")))
+    monkeypatch.setattr(extraction_cache, "_memory", LRUCache(8))
+    calls = []
+    monkeypatch.setattr(document_agent, "_prepare", lambda *docs: calls.append(1) or ({"salary_slips": [], "cibil_pdf": [], "asset_docs": []}, []))
+    monkeypatch.setattr(document_agent, "_fast_path", lambda prepared, asset_docs: {
+        f: {"value": 1.0, "confidence": 1.0, "source": "test"} for f in document_agent.FIELD_SOURCES
+    })
+    documents = ({"slip.pdf": text_pdf(["Net salary: INR 80000"])}, {"cibil.pdf": b"report"}, {})
+
+    first = document_agent.document_processing_agent(*documents)
+    second = document_agent.document_processing_agent(*documents)
+    assert len(calls) == 1
+    assert first["extraction"]["cached"] is False and second["extraction"]["cached"] is True
+    assert second["income_monthly"] == first["income_monthly"]
+
+    # the async agent shares the cache
+    third = asyncio.run(document_agent.adocument_processing_agent(*documents))
+    assert len(calls) == 1 and third["extraction"]["cached"] is True
+
+    # a stricter confidence threshold could have sent fields to the LLM: not a hit
+    monkeypatch.setattr(document_agent, "EXTRACTOR_MIN_CONFIDENCE", 0.95)
+    assert document_agent.document_processing_agent(*documents)["extraction"]["cached"] is False
+    assert len(calls) == 2
@@ -0,0 +1,41 @@
+# test_extractors.py
+from agents import document_agent
+from core.extractors import extract_field
+from tests.test_preprocess import text_pdf
+
+
+def test_amounts_and_scores():
+    assert extract_field("income_monthly", "Gross salary: 1,20,000\nNet pay: Rs. 95,400.50")["value"] == 95400.5
+    assert extract_field("asset_value", "Market value of property: 1.2 crore")["value"] == 12000000
+    assert extract_field("cibil_score", "CIBIL TransUnion Score: 782")["value"] == 782
+    assert extract_field("cibil_score", "CIBIL score: 1200") is None
+
+
+def test_years_and_dates_are_not_amounts():
+    assert extract_field("income_monthly", "Net Pay for March 2025: 85,000")["value"] == 85000
+    assert extract_field("income_monthly", "Net pay credited on 31/03/2025: Rs. 85,000")["value"] == 85000
+    assert extract_field("income_monthly", "Net pay for FY 2024-25 month 03: INR 72,500")["value"] == 72500
+    assert extract_field("income_monthly", "Net Pay for March 2025") is None
+
+
+def test_gross_alone_is_not_confident():
+    found = extract_field("income_monthly", "Gross earnings INR 120000")
+    assert found["confidence"] < document_agent.EXTRACTOR_MIN_CONFIDENCE
+
+
+def test_confident_documents_skip_llm(monkeypatch):
+    def fail():
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(document_agent, "get_gemini_llm", fail)
+    monkeypatch.setattr(document_agent, "EXTRACTION_CACHE_ENABLED", False)
+    result = document_agent.document_processing_agent(
+        {"march.pdf": text_pdf(["Payslip for the month of March 2025", "Net salary: INR 80000"]),
+         "april.pdf": text_pdf(["Payslip for the month of April 2025", "Net salary: INR 90000"])},
+        {"cibil.pdf": text_pdf(["Consumer credit information report 2025", "CIBIL Score: 765"])},
+        {},
+    )
+    assert result["income_monthly"] == 85000
+    assert result["cibil_score"] == 765
+    assert result["asset_value"] == 0.0
+    assert result["extraction"]["llm_called"] is False
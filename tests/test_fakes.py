@@ -0,0 +1,39 @@
+# test_fakes.py
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from agents.schemas import DocumentExtraction
+from core import gemini_client
+from core.fakes import FakeChatModel, FakeEmbeddings, FaultInjector
+from pipeline_benchmark import compare
+
+
+def test_structured_output_is_deterministic():
+    result = FakeChatModel().with_structured_output(DocumentExtraction).invoke("extract")
+    assert result == DocumentExtraction(income_monthly=85000.0, cibil_score=760, asset_value=6000000.0)
+
+
+def test_injected_failures_are_retried(monkeypatch):
+    monkeypatch.setattr(gemini_client, "LIMITER", gemini_client.TokenBucket(0, 1))
+    monkeypatch.setattr(gemini_client, "backoff_delay", lambda attempt: 0)
+    faults = FaultInjector("llm", latency=0, failure_rate=0.5, seed=1)
+    llm = FakeChatModel(faults=faults)
+    before = gemini_client.gemini_client_stats()["retries"]
+    for _ in range(10):
+        assert llm.invoke("hello").content
+    assert gemini_client.gemini_client_stats()["retries"] > before
+
+
+def test_embeddings_are_stable_and_fail_on_demand():
+    embeddings = FakeEmbeddings()
+    home, home_again, car = embeddings.embed_documents(["home loan cibil", "home loan cibil", "car tenure"])
+    assert home == home_again and home != car
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        FakeEmbeddings(faults=FaultInjector("embedding", latency=0, failure_rate=1.0)).embed_query("x")
+
+
+def test_compare_flags_slower_latency_and_lower_throughput():
+    baseline = {"endpoint": {"p95_ms": 100.0, "throughput_per_second": 10.0, "runs": 60}}
+    current = {"endpoint": {"p95_ms": 130.0, "throughput_per_second": 9.0, "runs": 60}}
+    assert [r["metric"] for r in compare(current, baseline, tolerance=0.25)] == ["endpoint.p95_ms"]
+    assert compare(current, baseline, tolerance=0.5) == []
@@ -0,0 +1,95 @@
+# test_gemini_client.py
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from core import gemini_client
+from core.gemini_client import TokenBucket, call_with_resilience
+
+
+@pytest.fixture(autouse=True)
+def no_limits(monkeypatch):
+    monkeypatch.setattr(gemini_client, "LIMITER", TokenBucket(0, 1))
+    monkeypatch.setattr(gemini_client, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(gemini_client, "_latencies", type(gemini_client._latencies)(maxlen=500))
+
+
+def test_token_bucket_reserves_in_order():
+    bucket = TokenBucket(rate_per_second=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_quota_errors_are_retried():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+    before = gemini_client.gemini_client_stats()
+    assert call_with_resilience(flaky) == "ok"
+    after = gemini_client.gemini_client_stats()
+    assert after["retries"] - before["retries"] == 2
+    assert after["quota_errors"] - before["quota_errors"] == 2
+
+
+def test_bad_requests_are_not_retried():
+    calls = []
+
+    def invalid():
+        calls.append(1)
+        raise google_exceptions.InvalidArgument("bad prompt")
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        call_with_resilience(invalid)
+    assert len(calls) == 1
+
+
+def test_slow_call_is_hedged(monkeypatch):
+    monkeypatch.setattr(gemini_client, "GEMINI_HEDGE_ENABLED", True)
+    monkeypatch.setattr(gemini_client, "GEMINI_HEDGE_MIN_SAMPLES", 5)
+    gemini_client._latencies.extend([0.01] * 10)
+    calls = []
+
+    def first_slow():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    before = gemini_client.gemini_client_stats()["hedge_wins"]
+    assert call_with_resilience(first_slow) == "hedge"
+    assert gemini_client.gemini_client_stats()["hedge_wins"] == before + 1
+
+
+class QuotaExhaustedClient:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, **kwargs):
+        self.calls += 1
+        raise google_exceptions.ResourceExhausted("quota")
+
+    stream_generate_content = generate_content
+
+
+@pytest.mark.parametrize("method", ["invoke", "stream"])
+def test_only_our_retries_reach_gemini(method):
+    llm = gemini_client.PooledChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key="test-key")
+    llm.client = QuotaExhaustedClient()
+    before = gemini_client.gemini_client_stats()
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        if method == "invoke":
+            llm.invoke("hello")
+        else:
+            list(llm.stream("hello"))
+    # one request per attempt of our policy; the library's own retry stays off
+    requests = gemini_client.gemini_client_stats()["requests"] - before["requests"]
+    assert llm.client.calls == gemini_client.GEMINI_MAX_RETRIES + 1 == requests
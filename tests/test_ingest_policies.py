@@ -0,0 +1,58 @@
+# test_ingest_policies.py
+import shutil
+from langchain_core.embeddings import DeterministicFakeEmbedding
+import ingest_policies
+from core.local_index import LocalVectorIndex
+from core.lexical_index import LexicalIndex
+
+
+def test_incremental_local_ingest(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_policies, "make_gemini_embedder", lambda **kwargs: DeterministicFakeEmbedding(size=8))
+    folder = tmp_path / "policies"
+    shutil.copytree("policies", folder)
+    kwargs = dict(manifest_path=str(tmp_path / "manifest.json"), local_index_dir=str(tmp_path / "index"),
+                  lexical_index_dir=str(tmp_path / "lexical"))
+
+    first = ingest_policies.ingest(str(folder), "local", **kwargs)
+    assert first["embedded"] == first["total"] == 3
+
+    again = ingest_policies.ingest(str(folder), "local", **kwargs)
+    assert again["embedded"] == 0 and again["unchanged"] == 3
+
+    (folder / "car_loan_policy.txt").write_text("Car Loan Policy\n- CIBIL requirement: >= 710\n")
+    (folder / "personal_loan_policy.txt").unlink()
+    changed = ingest_policies.ingest(str(folder), "local", **kwargs)
+    assert (changed["embedded"], changed["unchanged"], changed["deleted"]) == (1, 1, 2)
+    assert sorted(m["loan_type"] for m in LocalVectorIndex(str(tmp_path / "index")).metadatas) == ["car", "home"]
+    assert sorted(m["loan_type"] for m in LexicalIndex.load(str(tmp_path / "lexical")).metadatas) == ["car", "home"]
+
+
+class FakePineconeIndex:
+    def __init__(self, ids):
+        self.ids = set(ids)
+
+    def list(self):
+        ids = sorted(self.ids)
+        for i in range(0, len(ids), 2):
+            yield ids[i:i + 2]
+
+    def upsert(self, vectors):
+        self.ids.update(cid for cid, _, _ in vectors)
+
+    def delete(self, ids):
+        self.ids.difference_update(ids)
+
+
+def test_pinecone_ingest_removes_vectors_the_manifest_never_saw(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_policies, "make_gemini_embedder", lambda **kwargs: DeterministicFakeEmbedding(size=8))
+    # vectors left behind by an earlier uuid-keyed ingest, with no manifest on disk
+    index = FakePineconeIndex(["3f1c0b2e-uuid-1", "3f1c0b2e-uuid-2", "3f1c0b2e-uuid-3"])
+    monkeypatch.setattr(ingest_policies, "_pinecone_index", lambda: index)
+    kwargs = dict(manifest_path=str(tmp_path / "manifest.json"), lexical_index_dir=str(tmp_path / "lexical"))
+
+    first = ingest_policies.ingest("policies", "pinecone", **kwargs)
+    assert (first["embedded"], first["deleted"]) == (3, 3)
+    assert len(index.ids) == 3 and not any("uuid" in cid for cid in index.ids)
+
+    full = ingest_policies.ingest("policies", "pinecone", full=True, **kwargs)
+    assert (full["embedded"], full["deleted"]) == (3, 0) and len(index.ids) == 3
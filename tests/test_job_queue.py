@@ -0,0 +1,73 @@
+# test_job_queue.py
+import asyncio
+import io
+from contextlib import ExitStack
+
+import pytest
+
+from core.job_queue import JobQueue, JobWorkerPool, QueueFull
+
+
+def _application(loan_type):
+    return {"name": "Asha", "loan_type": loan_type, "monthly_debt": 0.0, "req_loan_amount": 1000000.0}
+
+
+def _documents():
+    return {"salary_slips": {"slip.pdf": io.BytesIO(b"%PDF slip")}, "cibil_pdf": {"cibil.pdf": io.BytesIO(b"%PDF")}}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), str(tmp_path / "jobs"), max_depth=3)
+
+
+def test_priority_and_idempotent_submit(queue):
+    home, _ = queue.submit(_application("home"), _documents(), "a1")
+    personal, _ = queue.submit(_application("personal"), _documents(), "a2")
+    again, created = queue.submit(_application("home"), _documents(), "a1")
+    assert not created and again["job_id"] == home["job_id"]
+    assert queue.get(home["job_id"])["position"] == 1
+
+    # personal loans are served first by default, whatever the arrival order
+    assert queue.claim("w")["job_id"] == personal["job_id"]
+    claimed = queue.claim("w")
+    assert claimed["job_id"] == home["job_id"] and queue.claim("w") is None
+    with ExitStack() as files:
+        assert list(queue.open_documents(home["job_id"], files)["salary_slips"]) == ["slip.pdf"]
+    assert queue.depth()["running"] == 2
+
+
+def test_queue_full(queue):
+    for i in range(3):
+        queue.submit(_application("car"), _documents(), f"c{i}")
+    with pytest.raises(QueueFull):
+        queue.submit(_application("car"), _documents(), "c3")
+
+
+def test_expired_lease_is_retried(queue):
+    queue.submit(_application("car"), _documents(), "c1")
+    queue.claim("dead-worker")
+    # the worker died and its lease ran out: the job is handed out again
+    queue._conn().execute("UPDATE jobs SET lease_until = 0")
+    assert queue.claim("w2")["attempts"] == 2
+
+
+def test_pool_runs_jobs_and_enforces_timeouts(queue):
+    async def handler(job):
+        if job["application_id"] == "slow":
+            await asyncio.sleep(5)
+        return {"loan_type": job["loan_type"]}
+
+    async def run():
+        pool = JobWorkerPool(queue, handler, workers=2, poll_seconds=0.05)
+        pool.start()
+        fast, _ = queue.submit(_application("home"), _documents(), "fast")
+        slow, _ = queue.submit(_application("home"), _documents(), "slow", timeout_seconds=0.1)
+        pool.notify()
+        results = [await pool.wait(fast["job_id"], 5), await pool.wait(slow["job_id"], 5)]
+        await pool.stop()
+        return results
+
+    fast, slow = asyncio.run(run())
+    assert fast["status"] == "done" and fast["result"] == {"loan_type": "home"}
+    assert slow["status"] == "timed_out" and slow["result"] is None
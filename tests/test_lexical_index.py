@@ -0,0 +1,38 @@
+# test_lexical_index.py
+from langchain_core.documents import Document
+from core import rag, resources
+from core.lexical_index import LexicalIndex, write_lexical_index
+from tests.test_rag import CountingEmbeddings
+
+TEXTS = [
+    "Home loan: CIBIL 725 or above, DTI up to 50%",
+    "Home loan: LTV 80% for loans between 30 and 75 lakh",
+    "Car loan: tenure up to 84 months, CIBIL 700",
+    "Personal loan: DTI up to 40%, no collateral",
+]
+METADATAS = [{"loan_type": "home"}, {"loan_type": "home"}, {"loan_type": "car"}, {"loan_type": "personal"}]
+
+
+def test_bm25_ranks_exact_terms(tmp_path):
+    write_lexical_index(str(tmp_path), TEXTS, METADATAS)
+    index = LexicalIndex.load(str(tmp_path))
+    assert [d.page_content for d, _ in index.search("What LTV applies?", k=4)] == [TEXTS[1]]
+    hits = index.search("CIBIL score", k=4)
+    assert {d.metadata["loan_type"] for d, _ in hits} == {"home", "car"}
+    assert [d.metadata["loan_type"] for d, _ in index.search("DTI limit", k=4, filter={"loan_type": "personal"})] \
+        == ["personal"]
+
+
+def test_lexical_mode_makes_no_embedding_call(monkeypatch):
+    embeddings = CountingEmbeddings()
+    monkeypatch.setitem(resources._instances, "embedder", embeddings)
+    monkeypatch.setitem(resources._instances, "lexical_index", LexicalIndex(TEXTS, METADATAS))
+    docs = rag.get_retriever(k=2, loan_type="car", mode="lexical").invoke("car loan tenure")
+    assert [d.page_content for d in docs] == [TEXTS[2]]
+    assert embeddings.calls == 0
+
+
+def test_rank_fusion_favours_chunks_both_sides_agree_on():
+    a, b, c = (Document(page_content=t) for t in "abc")
+    fused = rag.reciprocal_rank_fusion([[a, b], [b, c]])
+    assert [d.page_content for d in fused] == ["b", "a", "c"]
@@ -0,0 +1,25 @@
+# test_local_index.py
+import numpy as np
+from core.local_index import LocalVectorIndex, write_local_index
+
+
+def _build_index(tmp_path):
+    texts = ["home cibil 725", "home ltv 80", "car tenure 84", "personal dti 50"]
+    metadatas = [{"loan_type": "home"}, {"loan_type": "home"}, {"loan_type": "car"}, {"loan_type": "personal"}]
+    vectors = np.eye(4, dtype=np.float32) * 3
+    write_local_index(str(tmp_path), texts, metadatas, vectors)
+    return LocalVectorIndex(str(tmp_path))
+
+
+def test_top_k_cosine(tmp_path):
+    index = _build_index(tmp_path)
+    hits = index.search([0.1, 0.9, 0.0, 0.0], k=2)
+    assert [d.page_content for d, _ in hits] == ["home ltv 80", "home cibil 725"]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_loan_type_filter(tmp_path):
+    index = _build_index(tmp_path)
+    hits = index.search([0.0, 0.9, 0.5, 0.0], k=4, filter={"loan_type": "car"})
+    assert [d.page_content for d, _ in hits] == ["car tenure 84"]
+    assert hits[0][0].metadata["loan_type"] == "car"
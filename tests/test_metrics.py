@@ -0,0 +1,46 @@
+# test_metrics.py
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from prometheus_client import REGISTRY
+
+from core.metrics import instrument_agent, render_metrics
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@instrument_agent("test_agent")
+def _agent(prompt: str) -> str:
+    return FakeListChatModel(responses=["ok"]).invoke(prompt).content
+
+
+def test_llm_calls_are_attributed_to_the_agent():
+    before = _sample("loan_llm_latency_seconds_count", agent="test_agent", model="unknown", cache="miss")
+    agent_before = _sample("loan_agent_latency_seconds_count", agent="test_agent")
+    assert _agent("hello") == "ok"
+    assert _sample("loan_llm_latency_seconds_count", agent="test_agent", model="unknown", cache="miss") == before + 1
+    assert _sample("loan_agent_latency_seconds_count", agent="test_agent") == agent_before + 1
+
+
+def test_graph_nodes_are_timed():
+    from langgraph.graph import StateGraph, START, END
+    from typing import TypedDict
+
+    class State(TypedDict):
+        value: int
+
+    graph = StateGraph(State)
+    graph.add_node("double_node", RunnableLambda(lambda s: {"value": s["value"] * 2}, name="double_node"))
+    graph.add_edge(START, "double_node")
+    graph.add_edge("double_node", END)
+
+    before = _sample("loan_node_latency_seconds_count", node="double_node")
+    assert graph.compile().invoke({"value": 2})["value"] == 4
+    assert _sample("loan_node_latency_seconds_count", node="double_node") == before + 1
+
+
+def test_exposition_includes_gemini_client_counters():
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b"loan_gemini_requests_total" in body
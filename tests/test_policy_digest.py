@@ -0,0 +1,78 @@
+# test_policy_digest.py
+import threading
+
+import pytest
+from core import policy_digest
+
+
+@pytest.fixture
+def digest_env(tmp_path, monkeypatch):
+    policy_dir = tmp_path / "policies"
+    policy_dir.mkdir()
+    (policy_dir / "home_loan_policy.txt").write_text("CIBIL >= 725")
+    (policy_dir / "rules").mkdir()
+    (policy_dir / "rules" / "home.yaml").write_text("min_cibil: 725\n")
+    monkeypatch.setattr(policy_digest, "POLICY_DIR", str(policy_dir))
+    monkeypatch.setattr(policy_digest, "POLICY_RULES_DIR", str(policy_dir / "rules"))
+    monkeypatch.setattr(policy_digest, "DIGEST_PATH", str(tmp_path / "digest.json"))
+    monkeypatch.setattr(policy_digest, "_store", {"fingerprint": None, "digests": {}})
+    monkeypatch.setattr(policy_digest, "_fingerprint_cache", {"stats": None, "fingerprint": None})
+
+    builds = []
+
+    def fake_build(loan_type):
+        builds.append(loan_type)
+        return {"loan_type": loan_type, "thresholds": {"interest_rate": 8.5}, "policy_summary": "", "sources": []}
+
+    monkeypatch.setattr(policy_digest, "_build_digest", fake_build)
+    return policy_dir, builds
+
+
+def test_digest_built_once_and_persisted(digest_env, monkeypatch):
+    _, builds = digest_env
+    assert policy_digest.get_policy_digest("home")["thresholds"]["interest_rate"] == 8.5
+    policy_digest.get_policy_digest("home")
+    assert builds == ["home"]
+
+    # a fresh process reloads from disk without rebuilding
+    monkeypatch.setattr(policy_digest, "_store", {"fingerprint": None, "digests": {}})
+    policy_digest.get_policy_digest("home")
+    assert builds == ["home"]
+
+
+def test_policy_change_invalidates_digest(digest_env):
+    policy_dir, builds = digest_env
+    policy_digest.get_policy_digest("home")
+    (policy_dir / "home_loan_policy.txt").write_text("CIBIL >= 750, updated")
+    policy_digest.get_policy_digest("home")
+    assert builds == ["home", "home"]
+
+
+def test_rules_change_changes_fingerprint(digest_env):
+    policy_dir, _ = digest_env
+    before = policy_digest.policy_fingerprint()
+    (policy_dir / "rules" / "home.yaml").write_text("min_cibil: 750  # raised\n")
+    assert policy_digest.policy_fingerprint() != before
+
+
+def test_builds_do_not_block_other_loan_types(digest_env, monkeypatch):
+    car_built = threading.Event()
+    builds = []
+
+    def slow_build(loan_type):
+        builds.append(loan_type)
+        if loan_type == "home":
+            # the home build waits on the car build, which a global build lock would deadlock
+            assert car_built.wait(5)
+        else:
+            car_built.set()
+        return {"loan_type": loan_type, "thresholds": {}, "policy_summary": "", "sources": []}
+
+    monkeypatch.setattr(policy_digest, "_build_digest", slow_build)
+    threads = [threading.Thread(target=policy_digest.get_policy_digest, args=(t,)) for t in ("home", "home", "car")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert car_built.is_set() and sorted(builds) == ["car", "home"]
+    assert set(policy_digest._store["digests"]) == {"car", "home"}
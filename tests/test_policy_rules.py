@@ -0,0 +1,61 @@
+# test_policy_rules.py
+import numpy as np
+import pytest
+
+from core.policy_rules import CHECKS, PolicyRules, get_policy_rules
+
+HOME = {
+    "loan_type": "home",
+    "cibil": {"min": 725},
+    "dti": {"max": 50},
+    "income": {"min_monthly": 30000},
+    "tenure": {"min_months": 12, "max_months": 240},
+    "loan_cap": {"asset": "property", "ltv_tiers": [
+        {"up_to": 3000000, "ratio": 0.9}, {"up_to": 7500000, "ratio": 0.8}, {"ratio": 0.75},
+    ]},
+}
+
+
+@pytest.mark.parametrize("value, loan", [
+    (2000000, 1800000),     # 90% tier
+    (4000000, 3200000),     # 80% beats the 30 lakh ceiling of the 90% tier
+    (3500000, 3000000),     # 80% (28 lakh) falls below its tier, 90% is capped at 30 lakh
+    (12000000, 9000000),    # 75% tier
+])
+def test_ltv_tiers(value, loan):
+    assert PolicyRules(HOME).evaluate(80000, 760, 10000, value)["max_loan"] == loan
+
+
+def test_reasons_for_every_failed_check():
+    result = PolicyRules(HOME).evaluate(20000, 700, 15000, 0)
+    assert not result["eligible"] and result["max_loan"] == 0
+    assert [r.split()[0] for r in result["reasons"]] == ["CIBIL", "DTI", "No", "Monthly"]
+
+
+def test_batch_matches_single_evaluation():
+    rules = PolicyRules(HOME)
+    rng = np.random.default_rng(0)
+    income = rng.uniform(10000, 200000, 500)
+    cibil = rng.integers(600, 850, 500)
+    debt = rng.uniform(0, 60000, 500)
+    value = rng.uniform(0, 20000000, 500)
+
+    batch = rules.evaluate_batch(income, cibil, debt, value)
+    assert batch["failed"].shape == (500, len(CHECKS))
+    for i in range(0, 500, 37):
+        single = rules.evaluate(income[i], int(cibil[i]), debt[i], value[i])
+        assert single["eligible"] == batch["eligible"][i]
+        assert single["max_loan"] == pytest.approx(batch["max_loan"][i])
+
+
+def test_shipped_rules_compile():
+    for loan_type in ("home", "car", "personal"):
+        thresholds = get_policy_rules(loan_type).thresholds()
+        assert thresholds["min_tenure"] <= thresholds["max_tenure"]
+    assert get_policy_rules("personal").evaluate(100000, 760)["max_loan"] == 240000
+
+
+def test_invalid_tiers_rejected():
+    spec = dict(HOME, loan_cap={"asset": "property", "ltv_tiers": [{"up_to": 3000000, "ratio": 0.9}]})
+    with pytest.raises(ValueError, match="unbounded"):
+        PolicyRules(spec)
@@ -0,0 +1,56 @@
+# test_preprocess.py
+import io
+from PIL import Image
+from core.preprocess import preprocess_document
+
+
+def text_pdf(lines) -> bytes:
+    """Single-page PDF with a real text layer."""
+    content = "BT /F1 12 Tf 72 720 Td " + " ".join(f"({line}) Tj 0 -16 Td" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode()
+
+
+def _png(size, noisy=True) -> bytes:
+    image = Image.new("RGB", size, (255, 255, 255))
+    if noisy:
+        image = Image.effect_noise(size, 64).convert("RGB")
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_pdf_text_layer_replaces_file():
+    part, stats = preprocess_document(text_pdf(["Payslip March 2025", "Net salary: INR 85000 per month"]), "slip.pdf")
+    assert part["type"] == "text" and "85000" in part["text"]
+    assert stats["mode"] == "text"
+
+
+def test_large_image_is_downscaled_and_blank_image_dropped():
+    part, stats = preprocess_document(_png((3000, 2000)), "photo.png")
+    assert stats["mode"] == "downscaled" and part["mime_type"] == "image/jpeg"
+    assert stats["sent_bytes"] < stats["original_bytes"]
+    assert stats["estimated_tokens_saved"] > 0
+
+    part, stats = preprocess_document(_png((800, 800), noisy=False), "blank.png")
+    assert part is None and stats["mode"] == "dropped"
+
+
+def test_unreadable_pdf_is_sent_as_is():
+    part, stats = preprocess_document(b"not a pdf", "scan.pdf")
+    assert part is None and stats["mode"] == "original"
@@ -0,0 +1,28 @@
+# test_progress.py
+from langchain_core.messages import AIMessageChunk
+from agents.progress import ProgressTracker
+
+
+def _chunk(text, node="decision_node"):
+    return AIMessageChunk(content=text, id="run-1"), {"langgraph_node": node}
+
+
+def test_summary_tokens_are_streamed_as_field_deltas():
+    tracker = ProgressTracker({"name": "Asha"})
+    events = []
+    for piece in ['{"summary": "Eligible', ' for the loan', '.", "recommendation": "Sub', 'mit KYC"}']:
+        events += tracker.feed("messages", _chunk(piece))
+    summary = "".join(d["delta"] for e, d in events if d["field"] == "summary")
+    recommendation = "".join(d["delta"] for e, d in events if d["field"] == "recommendation")
+    assert summary == "Eligible for the loan." and recommendation == "Submit KYC"
+    assert tracker.feed("messages", _chunk('{"income_monthly": 1', node="document_node")) == []
+
+
+def test_node_updates_accumulate_state():
+    tracker = ProgressTracker({"name": "Asha"})
+    digest = {"loan_type": "home", "thresholds": {"min_cibil": 700}, "policy_summary": "long text", "sources": []}
+    events = tracker.feed("updates", {"policy_node": {"policy_digest": digest, "node_timings": {"policy_node": {}}}})
+    assert events[0][1]["update"]["policy_digest"] == {"loan_type": "home", "thresholds": {"min_cibil": 700}}
+    tracker.feed("updates", {"document_node": {"income_monthly": 1.0, "node_timings": {"document_node": {}}}})
+    assert tracker.state["policy_digest"] is digest
+    assert set(tracker.state["node_timings"]) == {"policy_node", "document_node"}
@@ -0,0 +1,45 @@
+# test_rag.py
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake import FakeListLLM
+from core import rag, resources
+from core.local_index import LocalVectorIndex, write_local_index
+from core.lexical_index import LexicalIndex
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [1.0, 0.0]
+
+
+@pytest.fixture
+def local_backend(tmp_path, monkeypatch):
+    texts, metadatas = ["home: CIBIL 725", "car: CIBIL 700"], [{"loan_type": "home"}, {"loan_type": "car"}]
+    write_local_index(str(tmp_path), texts, metadatas, np.array([[1.0, 0.0], [0.9, 0.1]]))
+    embeddings = CountingEmbeddings()
+    monkeypatch.setattr(rag, "VECTOR_BACKEND", "local")
+    monkeypatch.setitem(resources._instances, "vector_store", LocalVectorIndex(str(tmp_path)))
+    monkeypatch.setitem(resources._instances, "embedder", embeddings)
+    monkeypatch.setitem(resources._instances, "lexical_index", LexicalIndex(texts, metadatas))
+    return embeddings
+
+
+def test_retrieval_context_retrieves_and_answers_once(local_backend):
+    llm = FakeListLLM(responses=["home policy answer", "second answer"])
+    context = rag.RetrievalContext(llm, loan_type="home")
+
+    assert context.answer("home policy?") == "home policy answer"
+    assert context.answer("home policy?") == "home policy answer"
+    context.documents("another question")
+    context.answer("follow-up?")
+
+    assert local_backend.calls == 1
+    assert [s["metadata"]["loan_type"] for s in context.sources] == ["home"]
@@ -0,0 +1,92 @@
+# test_reevaluate.py
+import asyncio
+
+import pytest
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from agents import document_agent, workflow as loan_workflow
+from agents.workflow import areevaluate, compile_workflow, run_config, submission_state
+from core import gemini_client, llm, policy_digest, rag
+from core.resources import reset_resources
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    # the fake Gemini/embedding/vector backends from core/fakes, with no caches shared with other runs
+    monkeypatch.setattr(llm, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(llm, "EMBEDDING_BACKEND", "fake")
+    monkeypatch.setattr(llm, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm, "_llm_pool", {})
+    monkeypatch.setattr(document_agent, "EXTRACTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(rag, "VECTOR_BACKEND", "fake")
+    monkeypatch.setattr(rag, "RETRIEVAL_MODE", "dense")
+    monkeypatch.setattr(policy_digest, "DIGEST_PATH", str(tmp_path / "digest.json"))
+    monkeypatch.setattr(policy_digest, "_store", {"fingerprint": None, "digests": {}})
+    monkeypatch.setattr(gemini_client, "LIMITER", gemini_client.TokenBucket(0, 1))
+    reset_resources()
+    yield tmp_path
+    reset_resources()
+
+
+def _count_calls(monkeypatch, name, calls):
+    original = getattr(loan_workflow, name)
+
+    async def counted(*args, **kwargs):
+        calls.append(name)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(loan_workflow, name, counted)
+
+
+def test_reevaluate_reruns_only_eligibility_and_decision(offline, monkeypatch):
+    calls = []
+    _count_calls(monkeypatch, "adocument_processing_agent", calls)
+    _count_calls(monkeypatch, "aget_policy_digest", calls)
+    application = {"name": "Asha", "loan_type": "home", "req_loan_amount": 4000000.0, "monthly_debt": 5000.0}
+    documents = {"salary_slips": {"slip.pdf": b"%PDF salary slip"}, "cibil_pdf": {"cibil.pdf": b"%PDF cibil"},
+                 "asset_docs": {"deed.pdf": b"%PDF sale deed"}}
+
+    async def run():
+        async with AsyncSqliteSaver.from_conn_string(str(offline / "checkpoints.sqlite")) as checkpointer:
+            app_workflow = compile_workflow(checkpointer)
+            first = await app_workflow.ainvoke(application, run_config(**documents, thread_id="a1"))
+            second = await areevaluate(app_workflow, "a1", {"monthly_debt": 60000.0})
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert calls == ["adocument_processing_agent", "aget_policy_digest"]
+
+    timings = first["node_timings"]
+    assert second["node_timings"]["document_node"] == timings["document_node"]
+    assert second["node_timings"]["policy_node"] == timings["policy_node"]
+    assert second["node_timings"]["eligibility_node"]["start"] > timings["decision_node"]["end"]
+    assert second["node_timings"]["decision_node"]["start"] > timings["decision_node"]["end"]
+
+    # extracted income (fake 85,000/month) is reused; only the debt changed
+    assert second["income_monthly"] == first["income_monthly"]
+    assert first["DTI"] < second["DTI"] == pytest.approx(60000.0 / first["income_monthly"] * 100, abs=0.01)
+    assert first["eligible"] and not second["eligible"]
+    assert second["recommended_loan"] != first["recommended_loan"]
+
+
+def test_resubmitted_application_keeps_no_stale_outputs(offline):
+    documents = {"salary_slips": {"slip.pdf": b"%PDF salary slip"}, "cibil_pdf": {"cibil.pdf": b"%PDF cibil"},
+                 "asset_docs": {"deed.pdf": b"%PDF sale deed"}}
+
+    def submission(monthly_debt):
+        return submission_state(name="Asha", loan_type="home", req_loan_amount=4000000.0, monthly_debt=monthly_debt)
+
+    async def run():
+        async with AsyncSqliteSaver.from_conn_string(str(offline / "checkpoints.sqlite")) as checkpointer:
+            app_workflow = compile_workflow(checkpointer)
+            config = run_config(**documents, thread_id="a1")
+            # the same application id submitted three times, flipping the outcome each time
+            return [await app_workflow.ainvoke(submission(debt), config) for debt in (5000.0, 60000.0, 5000.0)]
+
+    eligible, ineligible, eligible_again = asyncio.run(run())
+    assert eligible["eligible"] and eligible["recommended_loan"] and eligible["tenure_options"]
+    assert not ineligible["eligible"] and ineligible["reasons"]
+    assert ineligible["recommended_loan"] is None and ineligible["recommended_emi"] is None
+    assert ineligible["tenure_options"] is None and ineligible["amortization_schedule"] is None
+    assert eligible_again["eligible"] and eligible_again["reasons"] is None
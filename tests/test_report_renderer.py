@@ -0,0 +1,33 @@
+# test_report_renderer.py
+from concurrent.futures import ThreadPoolExecutor
+from core import report_renderer, resources
+from core.cache_store import DiskCache
+from core.report_generator import generate_html_report, generate_markdown_report
+
+DECISION = {
+    "loan_type": "home", "eligible": True, "summary": "ok", "recommended_loan": 1500000.0,
+    "recommended_emi": 13495.5, "policy_info": {"max_tenure": 240}, "updated_DTI": 32.5,
+    "applicable_rules": ["Interest Rate: 8.5%"], "next_steps": ["Sign loan agreement"],
+    "tenure_options": [{"tenure_months": 120, "loan": 1000000.0, "emi": 12398.0}],
+    "amortization_schedule": [{"year": 1, "interest": 126000.0, "principal": 35946.0, "balance": 1464054.0}],
+}
+
+
+def test_templates_render_report():
+    md = generate_markdown_report("Asha", DECISION)
+    assert "₹1,500,000.00" in md and "32.50%" in md and "| 120 |" in md and "₹1,464,054.00" in md
+    html = generate_html_report("Asha", DECISION)
+    assert "<table>" in html and "🏦" not in html
+
+
+def test_reports_are_rendered_once_per_decision(tmp_path, monkeypatch):
+    renders = []
+    monkeypatch.setattr(report_renderer, "_store", DiskCache(str(tmp_path / "reports.sqlite")))
+    monkeypatch.setattr(report_renderer, "_render_pdf", lambda name, d: renders.append(name) or b"%PDF-fake")
+    monkeypatch.setitem(resources._instances, "report_renderer", ThreadPoolExecutor(max_workers=1))
+
+    assert report_renderer.render_report("Asha", DECISION, timeout=5) == b"%PDF-fake"
+    rid = report_renderer.submit_report("Asha", {**DECISION, "node_timings": {"x": 1}})
+    assert report_renderer.get_report(rid) == b"%PDF-fake"
+    assert renders == ["Asha"]
+    assert report_renderer.report_id("Ravi", DECISION) != rid
@@ -0,0 +1,28 @@
+# test_uploads.py
+import asyncio
+import io
+import os
+from base64 import b64encode
+import pytest
+from starlette.datastructures import UploadFile
+from core.uploads import UploadBudget, UploadTooLarge, b64encode_stream, spool_upload
+
+
+def test_stream_encoding_matches_b64encode():
+    data = os.urandom(2 * 1024 * 1024 + 7)
+    assert b64encode_stream(io.BytesIO(data)) == b64encode(data).decode()
+    assert b64encode_stream(data) == b64encode(data).decode()
+
+
+def test_spool_enforces_limits():
+    data = b"x" * 5000
+    spooled = asyncio.run(spool_upload(UploadFile(io.BytesIO(data), filename="a.pdf"), UploadBudget(10000)))
+    assert spooled.read() == data
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(UploadFile(io.BytesIO(data), filename="a.pdf"), UploadBudget(10000), max_file_bytes=4000))
+
+    budget = UploadBudget(8000)
+    asyncio.run(spool_upload(UploadFile(io.BytesIO(data), filename="a.pdf"), budget))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(UploadFile(io.BytesIO(data), filename="b.pdf"), budget))
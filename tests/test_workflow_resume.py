@@ -0,0 +1,23 @@
+# test_workflow_resume.py
+import pytest
+from agents.workflow import resume_update
+
+
+def test_debt_change_resumes_at_eligibility():
+    values, as_node = resume_update({"monthly_debt": 12000})
+    assert as_node == "document_node"
+    assert values["monthly_debt"] == 12000
+    assert values["eligible"] is None and values["recommended_loan"] is None
+
+
+def test_loan_amount_change_keeps_eligibility():
+    values, as_node = resume_update({"req_loan_amount": 500000})
+    assert as_node == "eligibility_node"
+    assert "eligible" not in values and values["summary"] is None
+
+
+def test_document_fields_need_resubmission():
+    with pytest.raises(ValueError):
+        resume_update({"loan_type": "car"})
+    with pytest.raises(ValueError):
+        resume_update({})
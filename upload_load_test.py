@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import tracemalloc
+from base64 import b64encode
+
+from starlette.datastructures import UploadFile
+
+from agents.document_agent import encode_file
+from core.uploads import UploadBudget, spool_upload
+
+
+def _make_uploads(folder: str, files: int, size_mb: float) -> list:
+    # incompressible content so nothing downstream can shrink it
+    paths = []
+    for i in range(files):
+        path = os.path.join(folder, f"scan_{i}.pdf")
+        with open(path, "wb") as f:
+            f.write(os.urandom(int(size_mb * 1024 * 1024)))
+        paths.append(path)
+    return paths
+
+
+async def _buffered_request(paths: list, hold: float):
+    # previous handling: every upload read whole, then base64-encoded from bytes
+    uploads = [UploadFile(open(p, "rb"), filename=os.path.basename(p)) for p in paths]
+    data = {u.filename: await u.read() for u in uploads}
+    parts = [
+        {"type": "file", "data": b64encode(raw).decode()}
+        for raw in data.values()
+    ]
+    await asyncio.sleep(hold)  # the Gemini call keeps the message alive
+    for u in uploads:
+        await u.close()
+    return len(parts)
+
+
+async def _streamed_request(paths: list, hold: float):
+    uploads = [UploadFile(open(p, "rb"), filename=os.path.basename(p)) for p in paths]
+    budget = UploadBudget(limit=1 << 40)
+    spooled = {u.filename: await spool_upload(u, budget, max_file_bytes=1 << 40) for u in uploads}
+    parts = [encode_file(f, name) for name, f in spooled.items()]
+    await asyncio.sleep(hold)
+    for f in spooled.values():
+        f.close()
+    for u in uploads:
+        await u.close()
+    return len(parts)
+
+
+def measure(handler, paths: list, concurrency: int, hold: float) -> dict:
+    """
+    Peak traced Python memory while `concurrency` requests are in flight.
+    """
+    async def run():
+        await asyncio.gather(*(handler(paths, hold) for _ in range(concurrency)))
+
+    tracemalloc.start()
+    asyncio.run(run())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "peak_mb_per_request": round(peak / 1024 / 1024 / concurrency, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak memory per in-flight /process_loan/ upload set")
+    parser.add_argument("--files", type=int, default=4, help="uploads per request")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="size of each upload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hold", type=float, default=0.2, help="seconds a request waits on the LLM")
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = _make_uploads(folder, args.files, args.size_mb)
+        report = {
+            "uploads_mb_per_request": round(args.files * args.size_mb, 2),
+            "concurrency": args.concurrency,
+            "buffered": measure(_buffered_request, paths, args.concurrency, args.hold),
+            "streamed": measure(_streamed_request, paths, args.concurrency, args.hold),
+        }
+
+    print(f"{report['uploads_mb_per_request']} MB of uploads per request, {args.concurrency} in flight")
+    for mode in ("buffered", "streamed"):
+        print(f"{mode:>9}: peak {report[mode]['peak_mb']:>8} MB, {report[mode]['peak_mb_per_request']:>7} MB/request")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()